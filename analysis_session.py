@@ -0,0 +1,144 @@
+"""
+Shared Analysis Session
+=======================
+
+One place for the statistics the visualization scripts have in common:
+the parsed Paper B frame, the variability categories, the contingency
+tables between YSO_CLASS / LCType / Variability, their chi-square tests and
+effect sizes, and the correlation matrix of the numeric metrics.
+
+Everything is computed lazily on first use and memoized, and get_session()
+hands out one session per process, so running several figure scripts
+(see generate_all_visualizations.py) costs one parse and one set of
+statistics instead of one per script.
+"""
+
+from functools import cached_property
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from yso_utils import load_cached_table, categorize_variability, compute_correlation_matrix
+from contingency_stats import (
+    encode_categories, contingency_from_codes, table_effect_sizes,
+    pairwise_effect_sizes, cramers_v_bootstrap
+)
+
+PAPER_B_FILE = '/Users/marcus/Desktop/YSO/paper_data_files/apjsadc397t2_mrt.txt'
+
+CATEGORICAL_VARS = ['YSO_CLASS', 'LCType', 'Variability']
+NUMERIC_COLS = ['W2magMean', 'sig_W2Flux', 'delW2mag', 'Period', 'slope', 'r_value', 'FLP_LSP_BOOT']
+
+# The three pairs every script tabulates
+PAIRS = {
+    'yso_var': ('YSO_CLASS', 'Variability'),
+    'lc_var': ('LCType', 'Variability'),
+    'yso_lc': ('YSO_CLASS', 'LCType'),
+}
+
+
+class AnalysisSession:
+    """
+    Lazily computed, memoized Paper B statistics.
+
+    Args:
+        paper_b_file: Paper B MRT table
+        cache_dir: catalog cache directory passed to load_cached_table
+    """
+
+    def __init__(self, paper_b_file=PAPER_B_FILE, cache_dir=None):
+        self.paper_b_file = paper_b_file
+        self.cache_dir = cache_dir
+        self._tables = {}
+        self._stats = {}
+        self._cramers_ci = {}
+
+    @cached_property
+    def frame(self) -> pd.DataFrame:
+        """Paper B with the Variability category column added."""
+        df = load_cached_table(self.paper_b_file, cache_dir=self.cache_dir)
+        df['Variability'] = categorize_variability(df, 'delW2mag')
+        return df
+
+    @cached_property
+    def categoricals(self) -> Dict[str, tuple]:
+        """(codes, categories) for each categorical variable, factorized once."""
+        return {var: encode_categories(self.frame[var]) for var in CATEGORICAL_VARS}
+
+    def contingency(self, row: str, col: str) -> pd.DataFrame:
+        """Contingency table of two categorical variables, same layout as pd.crosstab."""
+        key = (row, col)
+        if key not in self._tables:
+            row_codes, row_cats = self._encoded(row)
+            col_codes, col_cats = self._encoded(col)
+            counts = contingency_from_codes(row_codes, col_codes, len(row_cats), len(col_cats))
+            table = pd.DataFrame(counts, index=pd.Index(row_cats, name=row),
+                                 columns=pd.Index(col_cats, name=col))
+            # pd.crosstab leaves out categories with no (non-missing) pairs
+            self._tables[key] = table.loc[table.sum(axis=1) > 0, table.sum(axis=0) > 0]
+        return self._tables[key]
+
+    def statistics(self, row: str, col: str) -> Dict[str, float]:
+        """chi2, p, dof, cramers_v, phi and cramers_v_corrected of one pair."""
+        key = (row, col)
+        if key not in self._stats:
+            self._stats[key] = table_effect_sizes(self.contingency(row, col).to_numpy())
+        return self._stats[key]
+
+    def chi2(self, row: str, col: str) -> Tuple[float, float, int]:
+        """(chi2, p, dof) as returned by scipy's chi2_contingency."""
+        stats = self.statistics(row, col)
+        return stats['chi2'], stats['p'], stats['dof']
+
+    def category_pair_cramers_v(self, row: str, col: str) -> pd.DataFrame:
+        """
+        Cramér's V between `row` and `col` restricted to each pair of `row`
+        categories (the two-row slices of the contingency table), as a
+        categories x categories matrix with 1 on the diagonal.
+        """
+        key = ('category_pairs', row, col)
+        if key not in self._stats:
+            table = self.contingency(row, col)
+            counts = table.to_numpy()
+            n = len(table)
+            matrix = np.eye(n)
+            for i in range(n):
+                for j in range(i + 1, n):
+                    v = table_effect_sizes(counts[[i, j]])['cramers_v']
+                    matrix[i, j] = matrix[j, i] = v
+            self._stats[key] = pd.DataFrame(matrix, index=table.index, columns=table.index)
+        return self._stats[key]
+
+    def cramers_v_ci(self, row: str, col: str, confidence=0.95):
+        """Cramér's V with its bootstrap confidence interval."""
+        key = (row, col, confidence)
+        if key not in self._cramers_ci:
+            self._cramers_ci[key] = cramers_v_bootstrap(self.frame[row], self.frame[col],
+                                                         confidence=confidence)
+        return self._cramers_ci[key]
+
+    @cached_property
+    def correlation_matrix(self) -> pd.DataFrame:
+        """Standardized Pearson correlation of the numeric variability metrics."""
+        return compute_correlation_matrix(self.frame, NUMERIC_COLS, standardize=True)
+
+    @cached_property
+    def effect_sizes(self) -> Dict[str, pd.DataFrame]:
+        """Pairwise effect-size matrices of the categorical variables."""
+        return pairwise_effect_sizes(self.frame, CATEGORICAL_VARS)
+
+    def _encoded(self, var):
+        if var in self.categoricals:
+            return self.categoricals[var]
+        return encode_categories(self.frame[var])
+
+
+_session = None
+
+def get_session(paper_b_file=PAPER_B_FILE) -> AnalysisSession:
+    """The process-wide session (created on first call)."""
+    global _session
+    if _session is None or _session.paper_b_file != paper_b_file:
+        _session = AnalysisSession(paper_b_file)
+    return _session
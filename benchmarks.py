@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Pipeline Benchmarks
+===================
+
+Times the main stages at several multiples of the Paper B row count:
+1. parse_mrt_file on a copy of Paper B with its data rows replicated
+2. categorize_variability, compute_correlation_matrix and the bootstrapped
+   Cramér's V (cramers_v_bootstrap) on the parsed table
+3. ZTFAnalyzer.analyze_sources on synthetic light curves (scale x
+   --ztf-sources sources, since a light curve is far more work than a row)
+4. Contingency heatmap and chord diagram rendering (Agg)
+
+Each stage reports its best time, throughput and peak traced memory (from
+a separate tracemalloc run, so tracing does not skew the timings). Results
+can be saved as a baseline and later runs compared against it:
+
+    python benchmarks.py --scales 1,10 --save-baseline
+    python benchmarks.py --scales 1,10            # compares with the baseline
+"""
+
+import argparse
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+
+from yso_utils import read_mrt_header, read_mrt_table, parse_mrt_file, categorize_variability, compute_correlation_matrix
+from contingency_stats import cramers_v_bootstrap
+from analysis_session import PAPER_B_FILE, NUMERIC_COLS
+from ztf_analysis import ZTFAnalyzer
+from generate_comprehensive_visualizations import create_heatmap_with_contingency, create_matplotlib_chord
+
+DEFAULT_BASELINE = Path('.benchmarks') / 'baseline.json'
+DEFAULT_SCALES = (1, 10, 100)
+ZTF_SOURCES_PER_SCALE = 1000
+
+
+def replicate_mrt(source, scale, target):
+    """Write `source` with its data rows repeated `scale` times to `target`."""
+    _, data_offset = read_mrt_header(source)
+    raw = Path(source).read_bytes()
+    data = raw[data_offset:]
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    with open(target, 'wb') as f:
+        f.write(raw[:data_offset])
+        for _ in range(scale):
+            f.write(data)
+    return target
+
+
+def _stage_ztf(sources):
+    return ZTFAnalyzer(use_synthetic_only=True).analyze_sources(sources)
+
+
+def _stage_render(kind, df, out_dir):
+    table = pd.crosstab(df['YSO_CLASS'], df['Variability'])
+    filename = str(Path(out_dir) / f'bench_{kind}.png')
+    try:
+        if kind == 'heatmap':
+            create_heatmap_with_contingency(table, 'YSO Class vs Variability', filename)
+        else:
+            create_matplotlib_chord(table, 'YSO Class vs Variability', filename)
+    finally:
+        plt.close('all')
+
+
+def measure(func, repeat):
+    """
+    (best seconds over `repeat` runs, peak traced MB, result).
+
+    The traced run goes first and doubles as the warm-up, so one-time
+    costs (imports, caches, font loading) stay out of the timings.
+    """
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    best = np.inf
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, peak / 2**20, result
+
+
+def run_benchmarks(paper_b_file=PAPER_B_FILE, scales=DEFAULT_SCALES, repeat=3,
+                   ztf_sources=ZTF_SOURCES_PER_SCALE, report=True):
+    """
+    Time every stage at every scale.
+
+    Returns:
+        list of result dicts: stage, scale, items, seconds, items_per_s, peak_mb
+    """
+    results = []
+    base_rows = len(read_mrt_table(paper_b_file, ['Objname']))
+    with tempfile.TemporaryDirectory() as tmp:
+        for scale in scales:
+            path = replicate_mrt(paper_b_file, scale, Path(tmp) / f'paper_b_x{scale}.txt')
+            n_rows = scale * base_rows
+
+            def record(stage, func, items):
+                seconds, peak_mb, result = measure(func, repeat)
+                row = {'stage': stage, 'scale': scale, 'items': int(items), 'seconds': seconds,
+                       'items_per_s': items / seconds if seconds > 0 else np.inf, 'peak_mb': peak_mb}
+                results.append(row)
+                if report:
+                    print(f"   {stage:<26} x{scale:<4} {seconds:8.3f} s  "
+                          f"{row['items_per_s']:12,.0f} /s  {peak_mb:8.1f} MB")
+                return result
+
+            df = record('parse_mrt_file', lambda: parse_mrt_file(str(path)), n_rows)
+
+            df['Variability'] = record('categorize_variability',
+                                       lambda: categorize_variability(df, 'delW2mag'), n_rows)
+            record('compute_correlation_matrix',
+                   lambda: compute_correlation_matrix(df, NUMERIC_COLS, standardize=True), n_rows)
+            record('cramers_v_bootstrap',
+                   lambda: cramers_v_bootstrap(df['YSO_CLASS'], df['Variability']), n_rows)
+
+            n_sources = scale * ztf_sources
+            sources = df.head(n_sources)[['Objname', 'RAdeg', 'DEdeg', 'YSO_CLASS', 'W2magMean']]
+            # Replicated rows share names (and so light curves); make them distinct
+            sources = sources.assign(Objname=sources['Objname'] + '_' + np.arange(len(sources)).astype(str))
+            sources = sources.to_dict('records')
+            record('ztf_analyze_sources', lambda: _stage_ztf(sources), len(sources))
+
+            record('render_heatmap', lambda: _stage_render('heatmap', df, tmp), n_rows)
+            record('render_chord', lambda: _stage_render('chord', df, tmp), n_rows)
+
+            path.unlink()
+    return results
+
+
+def environment():
+    return {
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'machine': platform.machine(),
+        'platform': platform.platform(),
+        'date': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+
+
+def save_baseline(results, path=DEFAULT_BASELINE):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump({'environment': environment(), 'results': results}, f, indent=1)
+
+
+def compare_with_baseline(results, baseline, tolerance=0.25, min_seconds=0.01):
+    """
+    Print each stage's time and peak memory relative to the baseline.
+
+    A stage regresses when it is more than `tolerance` (fractional) slower
+    or larger than its baseline entry; slowdowns under `min_seconds` are
+    treated as timer noise.
+
+    Returns:
+        list of (stage, scale, metric, ratio) regressions
+    """
+    previous = {(r['stage'], r['scale']): r for r in baseline['results']}
+    regressions = []
+    print(f"\n   {'stage':<26} {'scale':>6} {'time':>9} {'vs base':>8} {'memory':>9} {'vs base':>8}")
+    for row in results:
+        base = previous.get((row['stage'], row['scale']))
+        if base is None:
+            print(f"   {row['stage']:<26} {'x' + str(row['scale']):>6} {row['seconds']:8.3f}s {'new':>8}")
+            continue
+        time_ratio = row['seconds'] / base['seconds'] if base['seconds'] > 0 else np.inf
+        mem_ratio = row['peak_mb'] / base['peak_mb'] if base['peak_mb'] > 0 else np.inf
+        flags = ''
+        if time_ratio > 1 + tolerance and row['seconds'] - base['seconds'] > min_seconds:
+            regressions.append((row['stage'], row['scale'], 'seconds', time_ratio))
+            flags += '  SLOWER'
+        if mem_ratio > 1 + tolerance:
+            regressions.append((row['stage'], row['scale'], 'peak_mb', mem_ratio))
+            flags += '  MORE MEMORY'
+        print(f"   {row['stage']:<26} {'x' + str(row['scale']):>6} {row['seconds']:8.3f}s {time_ratio:7.2f}x "
+              f"{row['peak_mb']:8.1f}M {mem_ratio:7.2f}x{flags}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the YSO pipeline stages')
+    parser.add_argument('--paper-b', default=PAPER_B_FILE, help='Paper B MRT file to replicate')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='comma-separated multiples of the Paper B row count (default: 1,10,100)')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per stage; the best is kept')
+    parser.add_argument('--ztf-sources', type=int, default=ZTF_SOURCES_PER_SCALE,
+                        help='synthetic ZTF sources per unit of scale')
+    parser.add_argument('--baseline', default=str(DEFAULT_BASELINE), help='baseline JSON file')
+    parser.add_argument('--save-baseline', action='store_true', help='store this run as the baseline')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='fractional slowdown / memory growth reported as a regression')
+    args = parser.parse_args()
+
+    if not Path(args.paper_b).exists():
+        print(f"ERROR: Paper B table not found: {args.paper_b}")
+        return 1
+
+    scales = [int(s) for s in args.scales.split(',')]
+    print("="*70)
+    print(f"BENCHMARKS (scales {scales}, best of {args.repeat})")
+    print("="*70)
+    results = run_benchmarks(args.paper_b, scales, args.repeat, args.ztf_sources)
+
+    if args.save_baseline:
+        save_baseline(results, args.baseline)
+        print(f"\n✓ Saved baseline: {args.baseline}")
+        return 0
+
+    try:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        print(f"\nNo baseline at {args.baseline} (run with --save-baseline to create one)")
+        return 0
+
+    print(f"\nCompared with baseline from {baseline['environment']['date']}:")
+    regressions = compare_with_baseline(results, baseline, args.tolerance)
+    if regressions:
+        print(f"\n✗ {len(regressions)} regression{'s' if len(regressions) != 1 else ''} "
+              f"beyond {args.tolerance:.0%}")
+        return 1
+    print("\n✓ No regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
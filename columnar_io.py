@@ -0,0 +1,286 @@
+"""
+Columnar Stage Output
+=====================
+
+A compact binary interchange format for the tables handed between pipeline
+stages (culled paper subsets, filtered_sources, spectroscopy_candidates, ...),
+so downstream stages skip re-parsing float text and repeated strings:
+1. One file: a magic line, a JSON schema header, then one 64-byte aligned
+   buffer per column
+2. String / object columns are dictionary-encoded: the distinct values go in
+   the header, the column is stored as the smallest integer codes that fit
+3. Float64 columns are stored as float32 when every value survives the
+   round trip through float32's shortest decimal form (catalog values
+   published to <= 7 significant digits, e.g. W2magMean 8.45); such columns
+   can be widened back to the exact float64 values on read
+4. Nullable integer, float and boolean columns are stored as their values
+   plus an NA mask, and come back with the same pandas dtype
+5. Datetime and timedelta columns are stored as int64 ticks in their own
+   unit; time-zone-aware columns as UTC ticks, with the zone kept in the
+   schema
+6. Readers memory-map the file; numeric columns and category codes are
+   zero-copy views of the mapping
+
+CSV stays the human-readable format: save_table writes either or both.
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+MAGIC = b'YSOCOL1\n'
+SUFFIX = '.ycol'
+ALIGNMENT = 64
+FORMAT_VERSION = 1
+
+# pandas' nullable dtypes (Int*, UInt*, Float*, boolean): stored as the values
+# plus an NA mask
+MASKED_ARRAYS = (pd.arrays.IntegerArray, pd.arrays.FloatingArray, pd.arrays.BooleanArray)
+
+
+def _aligned(offset: int) -> int:
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _json_value(value):
+    """Category value as a JSON scalar (numpy scalars become Python ones)."""
+    return value.item() if isinstance(value, np.generic) else value
+
+
+def _smallest_code_dtype(n_categories: int):
+    for dtype in (np.int8, np.int16, np.int32):
+        if n_categories < np.iinfo(dtype).max:
+            return np.dtype(dtype)
+    return np.dtype(np.int64)
+
+
+def exact_float64(values) -> np.ndarray:
+    """
+    The float64 values a narrowed float32 column was written from: each
+    float32 prints as its shortest decimal, which is the original value.
+    """
+    return np.asarray(values).astype(str).astype(np.float64)
+
+
+def _decimal_exact_float32(values: np.ndarray) -> Optional[np.ndarray]:
+    """values as float32 if that loses no decimal digit of any value, else None."""
+    narrowed = values.astype(np.float32)
+    with np.errstate(over='ignore'):
+        restored = exact_float64(narrowed)
+    if np.array_equal(restored, values, equal_nan=True):
+        return narrowed
+    return None
+
+
+def _encode_column(series: pd.Series, narrow_floats: bool):
+    """(schema entry, list of buffers) for one column."""
+    dtype = series.dtype
+    entry = {'name': str(series.name), 'pandas_dtype': str(dtype)}
+
+    if isinstance(dtype, pd.CategoricalDtype):
+        categories = dtype.categories
+        codes = series.cat.codes.to_numpy()
+        entry.update(kind='dictionary', ordered=bool(dtype.ordered))
+    elif isinstance(series.array, MASKED_ARRAYS):
+        entry.update(kind='masked')
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=False if dtype.kind == 'b' else 0)
+        return entry, [values, mask]
+    elif dtype.kind in 'mM':
+        if isinstance(dtype, pd.DatetimeTZDtype):
+            series = series.dt.tz_convert(None)
+        values = series.to_numpy()
+        entry.update(kind='datetime', numpy_dtype=values.dtype.str)
+        return entry, [values.view(np.int64)]
+    elif pd.api.types.is_bool_dtype(dtype) or (pd.api.types.is_numeric_dtype(dtype)
+                                               and not pd.api.types.is_complex_dtype(dtype)):
+        values = series.to_numpy()
+        entry.update(kind='numeric', narrowed=False)
+        if narrow_floats and values.dtype == np.float64:
+            narrowed = _decimal_exact_float32(values)
+            if narrowed is not None:
+                values = narrowed
+                entry['narrowed'] = True
+        return entry, [np.ascontiguousarray(values)]
+    else:
+        codes, categories = pd.factorize(series, sort=False)
+        entry.update(kind='dictionary', ordered=False)
+
+    code_dtype = _smallest_code_dtype(len(categories))
+    entry['categories'] = [_json_value(c) for c in categories]
+    unsupported = {type(c).__name__ for c in entry['categories']
+                   if c is not None and not isinstance(c, (str, int, float, bool))}
+    if unsupported:
+        raise TypeError(f"Column {entry['name']!r} holds {', '.join(sorted(unsupported))} values; "
+                        f"only strings and numbers can be dictionary-encoded")
+    return entry, [codes.astype(code_dtype)]
+
+
+def write_columnar(df: pd.DataFrame, path, narrow_floats: bool = True):
+    """
+    Write df to a columnar file (atomically).
+
+    Args:
+        df: table to store; the index is not stored
+        path: output file
+        narrow_floats: store decimal-exact float64 columns as float32
+    """
+    columns = []
+    buffers = []
+    for name in df.columns:
+        entry, column_buffers = _encode_column(df[name], narrow_floats)
+        entry['buffers'] = [{'dtype': b.dtype.str, 'nbytes': b.nbytes} for b in column_buffers]
+        columns.append(entry)
+        buffers.extend(column_buffers)
+
+    # Offsets are relative to the start of the data section
+    offset = 0
+    for buffer_spec in (spec for entry in columns for spec in entry['buffers']):
+        buffer_spec['offset'] = offset
+        offset = _aligned(offset + buffer_spec['nbytes'])
+
+    header = json.dumps({'version': FORMAT_VERSION, 'n_rows': len(df), 'columns': columns}).encode()
+    prefix = MAGIC + len(header).to_bytes(8, 'little') + header
+    data_start = _aligned(len(prefix))
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix='.' + path.name)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(prefix.ljust(data_start, b'\0'))
+        for buffer in buffers:
+            f.write(buffer.tobytes())
+            f.write(b'\0' * (_aligned(buffer.nbytes) - buffer.nbytes))
+    os.replace(tmp, path)
+
+
+def _read_header(f):
+    if f.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{getattr(f, 'name', 'file')} is not a columnar table")
+    length = int.from_bytes(f.read(8), 'little')
+    header = json.loads(f.read(length))
+    if header['version'] != FORMAT_VERSION:
+        raise ValueError(f"Unsupported columnar format version {header['version']}")
+    header['data_start'] = _aligned(len(MAGIC) + 8 + length)
+    return header
+
+
+def read_schema(path) -> dict:
+    """The schema header of a columnar file (column names, kinds, dtypes, row count)."""
+    with open(path, 'rb') as f:
+        return _read_header(f)
+
+
+def read_columnar(path, columns: Optional[List[str]] = None, mmap: bool = True,
+                  categorical: bool = True, float64: bool = False) -> pd.DataFrame:
+    """
+    Load a columnar file.
+
+    Args:
+        path: file written by write_columnar
+        columns: subset of columns to load (default: all)
+        mmap: memory-map the file, so numeric columns and category codes are
+              views of the mapping rather than copies
+        categorical: return dictionary-encoded columns as pandas Categoricals
+                     (zero-copy codes); False decodes them back to values
+        float64: widen columns stored as float32 back to the exact float64
+                 values that were written (a copy), e.g. to reproduce what
+                 reading the CSV gives
+
+    Returns:
+        DataFrame with a RangeIndex
+    """
+    with open(path, 'rb') as f:
+        header = _read_header(f)
+        if mmap:
+            # Plain ndarray view of the mapping, so frames don't carry np.memmap
+            data = np.memmap(f, dtype=np.uint8, mode='r').view(np.ndarray)
+        else:
+            f.seek(0)
+            data = np.frombuffer(f.read(), dtype=np.uint8)
+
+    start = header['data_start']
+
+    def buffer(spec):
+        offset = start + spec['offset']
+        return data[offset:offset + spec['nbytes']].view(np.dtype(spec['dtype']))
+
+    wanted = None if columns is None else set(columns)
+    result = {}
+    for entry in header['columns']:
+        if wanted is not None and entry['name'] not in wanted:
+            continue
+        buffers = [buffer(spec) for spec in entry['buffers']]
+        if entry['kind'] == 'numeric':
+            values = buffers[0]
+            if float64 and entry['narrowed']:
+                values = exact_float64(values)
+        elif entry['kind'] == 'datetime':
+            values = buffers[0].view(entry['numpy_dtype'])
+            dtype = pd.api.types.pandas_dtype(entry['pandas_dtype'])
+            if isinstance(dtype, pd.DatetimeTZDtype):
+                values = pd.DatetimeIndex(values).tz_localize('UTC').tz_convert(dtype.tz)
+        elif entry['kind'] == 'masked':
+            dtype = pd.api.types.pandas_dtype(entry['pandas_dtype'])
+            values = dtype.construct_array_type()(buffers[0].astype(dtype.numpy_dtype, copy=False),
+                                                  buffers[1])
+        else:
+            categories = entry['categories']
+            if categorical or entry['pandas_dtype'] == 'category':
+                values = pd.Categorical.from_codes(buffers[0], categories=categories,
+                                                   ordered=entry['ordered'], validate=False)
+            else:
+                lookup = np.array(categories + [None], dtype=object)
+                values = pd.Series(lookup[buffers[0]]).astype(entry['pandas_dtype'])
+        result[entry['name']] = values
+
+    order = [entry['name'] for entry in header['columns'] if entry['name'] in result]
+    if columns is not None:
+        order = [name for name in columns if name in result]
+    return pd.DataFrame({name: result[name] for name in order},
+                        index=pd.RangeIndex(header['n_rows']), copy=False)
+
+
+def save_table(df: pd.DataFrame, path, formats: Iterable[str] = ('csv',)) -> List[Path]:
+    """
+    Save a stage output as CSV (for humans) and/or the columnar format.
+
+    Args:
+        df: table to save
+        path: output path; its suffix is replaced per format
+        formats: any of 'csv' and 'ycol'
+
+    Returns:
+        paths written
+    """
+    path = Path(path)
+    written = []
+    for fmt in formats:
+        if fmt == 'csv':
+            target = path.with_suffix('.csv')
+            df.to_csv(target, index=False)
+        elif fmt == 'ycol':
+            target = path.with_suffix(SUFFIX)
+            write_columnar(df, target)
+        else:
+            raise ValueError(f"Unknown table format {fmt!r}; expected 'csv' or 'ycol'")
+        written.append(target)
+    return written
+
+
+def load_table(path, **kwargs) -> pd.DataFrame:
+    """
+    Load a stage output written by save_table, preferring a columnar copy next
+    to the CSV when it is at least as new. kwargs go to read_columnar.
+    """
+    path = Path(path)
+    binary = path.with_suffix(SUFFIX)
+    csv = path.with_suffix('.csv')
+    if binary.exists() and (not csv.exists() or binary.stat().st_mtime_ns >= csv.stat().st_mtime_ns):
+        return read_columnar(binary, **kwargs)
+    return pd.read_csv(csv)
@@ -0,0 +1,161 @@
+import numpy as np
+import pandas as pd
+from scipy.stats import chi2 as chi2_dist
+from typing import Dict, List, Tuple
+
+def encode_categories(x) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Integer-code a categorical column once.
+
+    Returns:
+        (codes, categories): codes index into the sorted categories,
+        missing values get -1
+    """
+    codes, categories = pd.factorize(pd.Series(x), sort=True)
+    return codes.astype(np.int64), np.asarray(categories)
+
+def contingency_from_codes(x_codes: np.ndarray, y_codes: np.ndarray, n_x: int, n_y: int) -> np.ndarray:
+    """
+    Contingency table of two code arrays with one bincount on combined codes.
+    Rows where either code is missing (-1) are skipped, as in pd.crosstab.
+    """
+    valid = (x_codes >= 0) & (y_codes >= 0)
+    combined = x_codes[valid] * n_y + y_codes[valid]
+    return np.bincount(combined, minlength=n_x * n_y).reshape(n_x, n_y)
+
+def chi2_statistic(tables: np.ndarray, correction: bool = True) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pearson chi-square for one table or a stack of tables (..., R, C).
+
+    Matches scipy.stats.chi2_contingency on each table after dropping its
+    all-zero rows and columns (what pd.crosstab would have produced),
+    including Yates' correction when that reduced table has dof == 1.
+
+    Returns:
+        (chi2, dof) arrays with the tables' leading shape
+    """
+    observed = np.asarray(tables, dtype=np.float64)
+    n = observed.sum(axis=(-2, -1), keepdims=True)
+    row_sums = observed.sum(axis=-1, keepdims=True)
+    col_sums = observed.sum(axis=-2, keepdims=True)
+    expected = row_sums * col_sums / np.where(n > 0, n, 1)
+
+    dof = ((row_sums[..., 0] > 0).sum(axis=-1) - 1) * ((col_sums[..., 0, :] > 0).sum(axis=-1) - 1)
+    dof = np.maximum(dof, 0)
+
+    diff = observed - expected
+    if correction:
+        yates = (dof == 1)[..., None, None]
+        diff = np.where(yates, np.sign(diff) * np.maximum(np.abs(diff) - 0.5, 0), diff)
+
+    # Empty rows/columns have expected == 0 and contribute nothing
+    with np.errstate(invalid='ignore', divide='ignore'):
+        terms = np.where(expected > 0, diff * diff / expected, 0.0)
+    return terms.sum(axis=(-2, -1)), dof
+
+def cramers_v_bootstrap(x, y, n_boot: int = 1000, confidence: float = 0.95,
+                        seed: int = 42) -> Tuple[float, Tuple[float, float]]:
+    """
+    Cramér's V with a percentile bootstrap confidence interval.
+
+    Resampling n rows with replacement is the same as drawing the cell
+    counts from a multinomial over the observed table, so all replicate
+    tables come from one rng.multinomial call and V is computed for all of
+    them at once.
+
+    Args:
+        x, y: categorical columns of equal length
+        n_boot: number of bootstrap replicates
+        confidence: two-sided confidence level
+        seed: seed for the bootstrap generator
+
+    Returns:
+        (v, (ci_lower, ci_upper))
+    """
+    x_codes, x_cats = encode_categories(x)
+    y_codes, y_cats = encode_categories(y)
+    table = contingency_from_codes(x_codes, y_codes, len(x_cats), len(y_cats))
+    table = table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+
+    n = int(table.sum())
+    min_dim = min(table.shape) - 1
+    if min_dim <= 0 or n == 0:
+        return 0, (0, 0)
+
+    chi2_obs, _ = chi2_statistic(table)
+    v = np.sqrt(chi2_obs / (n * min_dim))
+
+    rng = np.random.default_rng(seed)
+    replicates = rng.multinomial(n, table.ravel() / n, size=n_boot).reshape(n_boot, *table.shape)
+    chi2_boot, _ = chi2_statistic(replicates)
+    v_bootstrap = np.sqrt(chi2_boot / (n * min_dim))
+
+    alpha = (1 - confidence) / 2
+    ci_lower = np.percentile(v_bootstrap, alpha * 100)
+    ci_upper = np.percentile(v_bootstrap, (1 - alpha) * 100)
+    return float(v), (ci_lower, ci_upper)
+
+EFFECT_SIZE_METRICS = ('chi2', 'p', 'dof', 'cramers_v', 'phi', 'cramers_v_corrected')
+
+def pairwise_effect_sizes(df: pd.DataFrame, variables: List[str]) -> Dict[str, pd.DataFrame]:
+    """
+    Chi-square and effect sizes for every pair of categorical columns.
+
+    Each column is factorized once and each unordered pair gets a single
+    bincount contingency table; the upper triangle is computed and mirrored.
+    Missing values are dropped pairwise, as pd.crosstab does.
+
+    Args:
+        df: DataFrame holding the categorical columns
+        variables: column names
+
+    Returns:
+        dict of variables x variables DataFrames keyed by metric:
+        chi2, p, dof, cramers_v, phi, cramers_v_corrected (Bergsma's
+        bias-corrected V). Effect sizes are 1 on the diagonal; chi2, p and
+        dof are NaN there.
+    """
+    encoded = [encode_categories(df[var]) for var in variables]
+    n_vars = len(variables)
+    results = {metric: np.full((n_vars, n_vars), np.nan) for metric in EFFECT_SIZE_METRICS}
+    for metric in ('cramers_v', 'phi', 'cramers_v_corrected'):
+        np.fill_diagonal(results[metric], 1.0)
+
+    for i in range(n_vars):
+        x_codes, x_cats = encoded[i]
+        for j in range(i + 1, n_vars):
+            y_codes, y_cats = encoded[j]
+            table = contingency_from_codes(x_codes, y_codes, len(x_cats), len(y_cats))
+            stats = table_effect_sizes(table)
+            for metric, value in stats.items():
+                results[metric][i, j] = results[metric][j, i] = value
+
+    return {metric: pd.DataFrame(matrix, index=variables, columns=variables)
+            for metric, matrix in results.items()}
+
+def table_effect_sizes(table: np.ndarray) -> Dict[str, float]:
+    """chi2, p, dof, V, Phi and bias-corrected V of one contingency table."""
+    n = table.sum()
+    r = int((table.sum(axis=1) > 0).sum())
+    k = int((table.sum(axis=0) > 0).sum())
+    if n == 0 or min(r, k) < 2:
+        return {'chi2': 0.0, 'p': 1.0, 'dof': 0, 'cramers_v': 0.0, 'phi': 0.0, 'cramers_v_corrected': 0.0}
+
+    chi2_stat, dof = chi2_statistic(table)
+    chi2_stat, dof = float(chi2_stat), int(dof)
+    phi2 = chi2_stat / n
+
+    # Bergsma (2013) bias correction
+    phi2_corr = max(0.0, phi2 - (k - 1) * (r - 1) / (n - 1))
+    r_corr = r - (r - 1) ** 2 / (n - 1)
+    k_corr = k - (k - 1) ** 2 / (n - 1)
+    corr_dim = min(k_corr - 1, r_corr - 1)
+
+    return {
+        'chi2': chi2_stat,
+        'p': float(chi2_dist.sf(chi2_stat, dof)),
+        'dof': dof,
+        'cramers_v': np.sqrt(phi2 / (min(r, k) - 1)),
+        'phi': np.sqrt(phi2),
+        'cramers_v_corrected': np.sqrt(phi2_corr / corr_dim) if corr_dim > 0 else 0.0
+    }
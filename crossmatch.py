@@ -0,0 +1,163 @@
+"""
+Positional Crossmatch
+=====================
+
+Links catalogs by sky position (Paper A/B/C CSVs, LAMOST candidates, cached
+ZTF positions) without an O(N*M) angular-distance loop:
+1. RA/Dec are converted to unit vectors on the sphere
+2. A KD-tree (scipy cKDTree) indexes one catalog
+3. An angular radius becomes a chord length, 2 sin(r/2), so "within r
+   degrees" is a Euclidean ball query on the unit vectors
+4. Matches come back as flat index arrays plus separations in degrees
+
+All angles are in degrees, like the RAdeg/DEdeg columns.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+ZTF_MATCH_RADIUS = 0.0014  # degrees, the ZTF light-curve search radius
+
+
+def radec_to_unit(ra, dec):
+    """(N, 3) unit vectors for RA/Dec in degrees."""
+    ra = np.radians(np.asarray(ra, dtype=np.float64))
+    dec = np.radians(np.asarray(dec, dtype=np.float64))
+    cos_dec = np.cos(dec)
+    return np.column_stack((cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)))
+
+
+def chord_length(radius_deg):
+    """Straight-line distance between unit vectors separated by radius_deg."""
+    return 2 * np.sin(np.radians(radius_deg) / 2)
+
+
+def chord_to_degrees(chord):
+    return np.degrees(2 * np.arcsin(np.clip(chord / 2, 0, 1)))
+
+
+class SkyIndex:
+    """
+    KD-tree over the positions of one catalog.
+
+    Rows with a missing RA or Dec are left out of the index but keep their
+    original row numbers in the results.
+
+    Args:
+        ra, dec: positions in degrees
+    """
+
+    def __init__(self, ra, dec):
+        ra = np.asarray(ra, dtype=np.float64)
+        dec = np.asarray(dec, dtype=np.float64)
+        self.rows = np.flatnonzero(np.isfinite(ra) & np.isfinite(dec))
+        self.tree = cKDTree(radec_to_unit(ra[self.rows], dec[self.rows]))
+
+    def __len__(self):
+        return len(self.rows)
+
+    def query_radius(self, ra, dec, radius=ZTF_MATCH_RADIUS):
+        """
+        All (query, index) pairs closer than `radius` degrees.
+
+        Returns:
+            (query_rows, index_rows, separation_deg) arrays, sorted by query
+            row and then by separation
+        """
+        ra = np.asarray(ra, dtype=np.float64)
+        dec = np.asarray(dec, dtype=np.float64)
+        query_rows = np.flatnonzero(np.isfinite(ra) & np.isfinite(dec))
+        query_tree = cKDTree(radec_to_unit(ra[query_rows], dec[query_rows]))
+
+        pairs = query_tree.sparse_distance_matrix(self.tree, chord_length(radius), output_type='ndarray')
+        q = query_rows[pairs['i']]
+        idx = self.rows[pairs['j']]
+        sep = chord_to_degrees(pairs['v'])
+
+        order = np.lexsort((sep, q))
+        return q[order], idx[order], sep[order]
+
+    def nearest(self, ra, dec, radius=ZTF_MATCH_RADIUS):
+        """
+        Nearest indexed source for each query position.
+
+        Returns:
+            (index_rows, separation_deg): -1 and NaN where nothing lies
+            within `radius` degrees (or the query position is missing)
+        """
+        ra = np.asarray(ra, dtype=np.float64)
+        dec = np.asarray(dec, dtype=np.float64)
+        index_rows = np.full(len(ra), -1, dtype=np.int64)
+        sep = np.full(len(ra), np.nan)
+        query_rows = np.flatnonzero(np.isfinite(ra) & np.isfinite(dec))
+        if len(query_rows) == 0 or len(self.rows) == 0:
+            return index_rows, sep
+
+        chord, j = self.tree.query(radec_to_unit(ra[query_rows], dec[query_rows]),
+                                   distance_upper_bound=chord_length(radius))
+        found = np.isfinite(chord)
+        index_rows[query_rows[found]] = self.rows[j[found]]
+        sep[query_rows[found]] = chord_to_degrees(chord[found])
+        return index_rows, sep
+
+
+def crossmatch(ra1, dec1, ra2, dec2, radius=ZTF_MATCH_RADIUS):
+    """
+    All pairs of positions from two catalogs within `radius` degrees.
+
+    Returns:
+        DataFrame with idx1, idx2 (row numbers into each catalog) and
+        sep_deg, sorted by idx1 and separation
+    """
+    idx1, idx2, sep = SkyIndex(ra2, dec2).query_radius(ra1, dec1, radius)
+    return pd.DataFrame({'idx1': idx1, 'idx2': idx2, 'sep_deg': sep})
+
+
+def crossmatch_tables(df1, df2, radius=ZTF_MATCH_RADIUS, nearest_only=False,
+                      suffixes=('_1', '_2'), ra_col='RAdeg', dec_col='DEdeg'):
+    """
+    Join two source tables on sky position.
+
+    Args:
+        df1, df2: tables with RA/Dec columns in degrees
+        radius: match radius in degrees
+        nearest_only: keep only the closest df2 match for each df1 row
+        suffixes: appended to column names present in both tables
+
+    Returns:
+        matched rows of df1 and df2 side by side, plus sep_deg
+    """
+    matches = crossmatch(df1[ra_col], df1[dec_col], df2[ra_col], df2[dec_col], radius)
+    if nearest_only:
+        # Rows are sorted by separation within each idx1
+        matches = matches.drop_duplicates('idx1', keep='first')
+
+    left = df1.iloc[matches['idx1'].to_numpy()].reset_index(drop=True)
+    right = df2.iloc[matches['idx2'].to_numpy()].reset_index(drop=True)
+    shared = set(left.columns) & set(right.columns)
+    left = left.rename(columns={c: c + suffixes[0] for c in shared})
+    right = right.rename(columns={c: c + suffixes[1] for c in shared})
+
+    joined = pd.concat([left, right], axis=1)
+    joined['sep_deg'] = matches['sep_deg'].to_numpy()
+    return joined
+
+
+def match_cached_lightcurves(df, store, radius=ZTF_MATCH_RADIUS, ra_col='RAdeg', dec_col='DEdeg'):
+    """
+    Nearest cached ZTF cone search for each source.
+
+    Args:
+        df: source table with RA/Dec columns
+        store: ztf_store.LightCurveStore
+
+    Returns:
+        copy of df with ztf_key (None if unmatched) and ztf_sep_deg columns
+    """
+    keys, ra, dec, _ = store.positions()
+    rows, sep = SkyIndex(ra, dec).nearest(df[ra_col], df[dec_col], radius)
+    out = df.copy()
+    out['ztf_key'] = np.where(rows >= 0, keys[np.maximum(rows, 0)] if len(keys) else None, None)
+    out['ztf_sep_deg'] = sep
+    return out
@@ -0,0 +1,260 @@
+"""
+Figure Job Scheduler
+====================
+
+Renders independent figures in a process pool:
+1. Each figure is a FigureJob: a module-level plotting function plus the
+   inputs it needs (contingency tables, statistics, output path), so it can
+   be pickled to a worker and has no dependence on shared pyplot state
+2. Workers use the non-interactive Agg backend
+3. Every job is timed, and the timings are reported per figure
+4. Optional incremental builds: a FigureManifest keys each output on a hash
+   of the job's inputs, its parameters and the source of its plotting
+   function and the helpers it calls, and figures whose key has not changed
+   are not re-rendered
+
+Agg output depends only on the job's inputs and the plotting module's style
+settings (applied when the worker imports that module), so a figure renders
+to the same PNG serially or in any worker.
+"""
+
+import hashlib
+import inspect
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, List, NamedTuple, Optional, Tuple
+
+import matplotlib
+import numpy as np
+import pandas as pd
+
+
+class FigureJob(NamedTuple):
+    """One figure: func(*args, **kwargs) must draw and save it to `output`."""
+    name: str
+    func: Callable
+    args: tuple = ()
+    kwargs: Optional[dict] = None
+    output: Optional[str] = None  # file the job writes; jobs without one always render
+
+
+def _hash_value(h, value):
+    """Feed a job input into a hash in a canonical, process-independent form."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        h.update(type(value).__name__.encode())
+        h.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        labels = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        h.update(repr([str(c) for c in labels]).encode())
+    elif isinstance(value, np.ndarray):
+        h.update(f'ndarray{value.dtype.str}{value.shape}'.encode())
+        h.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        h.update(b'dict')
+        for key in sorted(value, key=repr):
+            _hash_value(h, key)
+            _hash_value(h, value[key])
+    elif isinstance(value, (list, tuple)):
+        h.update(f'{type(value).__name__}{len(value)}'.encode())
+        for item in value:
+            _hash_value(h, item)
+    else:
+        h.update(repr(value).encode())
+
+
+def _func_identity(func) -> str:
+    """
+    func's defining file and qualified name. Unlike __module__ this doesn't
+    change when the file runs as a script ('__main__') instead of an import.
+    """
+    try:
+        source_file = str(Path(inspect.getsourcefile(func)).resolve())
+    except TypeError:
+        source_file = func.__module__
+    return f'{source_file}:{func.__qualname__}'
+
+
+def _code_version(func) -> str:
+    """
+    Hash of func's own source plus that of every function it uses from the
+    same file (helpers such as draw_chord_diagram, followed transitively),
+    and the values of any plain constants it reads from module globals.
+
+    Other figures' functions and module-level style settings are not
+    covered, so editing one chart re-renders only the jobs that use it;
+    settings shared by several figures (dpi, colormap, thresholds) should
+    be job kwargs, which the manifest key hashes.
+    """
+    try:
+        source_file = inspect.getsourcefile(func)
+    except TypeError:
+        return hashlib.blake2b(_func_identity(func).encode(), digest_size=16).hexdigest()
+
+    parts = {}
+    pending = [func]
+    while pending:
+        current = pending.pop()
+        if current.__qualname__ in parts:
+            continue
+        try:
+            parts[current.__qualname__] = inspect.getsource(current)
+        except (OSError, TypeError):
+            parts[current.__qualname__] = _func_identity(current)
+
+        # Global names used by the function and any nested functions or lambdas
+        names, codes = set(), [current.__code__]
+        while codes:
+            code = codes.pop()
+            names.update(code.co_names)
+            codes.extend(const for const in code.co_consts if inspect.iscode(const))
+        for name in sorted(names):
+            value = current.__globals__.get(name)
+            if inspect.isfunction(value) and inspect.getsourcefile(value) == source_file:
+                pending.append(value)
+            elif isinstance(value, (bool, int, float, str, tuple)):
+                parts[f'{current.__qualname__}:{name}'] = repr(value)
+
+    h = hashlib.blake2b(digest_size=16)
+    for name in sorted(parts):
+        h.update(name.encode())
+        h.update(parts[name].encode())
+    return h.hexdigest()
+
+
+class FigureManifest:
+    """
+    Content-addressed record of rendered figures.
+
+    Maps each output path to the key it was rendered with; a job whose key
+    matches and whose output still exists is skipped.
+
+    Args:
+        path: JSON manifest file (usually next to the figures)
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        try:
+            self.entries = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            self.entries = {}
+
+    @staticmethod
+    def key(job: FigureJob) -> str:
+        """Hash of the job's inputs, parameters, code version and matplotlib version."""
+        h = hashlib.blake2b(digest_size=16)
+        h.update(_func_identity(job.func).encode())
+        h.update(_code_version(job.func).encode())
+        h.update(matplotlib.__version__.encode())
+        _hash_value(h, job.args)
+        _hash_value(h, job.kwargs or {})
+        return h.hexdigest()
+
+    def is_current(self, job: FigureJob, key: str) -> bool:
+        return (job.output is not None and self.entries.get(job.output) == key
+                and os.path.exists(job.output))
+
+    def record(self, job: FigureJob, key: str):
+        if job.output is not None:
+            self.entries[job.output] = key
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.path.parent, prefix='.manifest-')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(self.entries, f, indent=1, sort_keys=True)
+        os.replace(tmp, self.path)
+
+
+def _init_worker():
+    matplotlib.use('Agg', force=True)
+
+
+def _run_job(job: FigureJob) -> Tuple[str, float]:
+    import matplotlib.pyplot as plt
+    start = time.perf_counter()
+    try:
+        job.func(*job.args, **(job.kwargs or {}))
+    finally:
+        plt.close('all')
+    return job.name, time.perf_counter() - start
+
+
+def _record(manifest, job, keys):
+    if manifest is not None:
+        manifest.record(job, keys[job.name])
+
+
+def run_figure_jobs(jobs: List[FigureJob], workers: Optional[int] = None, report: bool = True,
+                    manifest: Optional[FigureManifest] = None,
+                    force: bool = False) -> List[Tuple[str, float]]:
+    """
+    Render figure jobs, in parallel when workers > 1.
+
+    Args:
+        jobs: figure jobs; their functions must be importable (module level)
+        workers: pool size (default: one per CPU, capped at the job count);
+                 1 renders in this process
+        report: print per-figure timings
+        manifest: if given, skip jobs whose output is current and record
+                  the keys of rendered jobs
+        force: render everything even if the manifest says it is current
+
+    Returns:
+        list of (job name, seconds) for the rendered jobs, in job order
+    """
+    keys = {}
+    skipped = []
+    if manifest is not None:
+        pending = []
+        for job in jobs:
+            keys[job.name] = manifest.key(job)
+            if not force and manifest.is_current(job, keys[job.name]):
+                skipped.append(job.name)
+            else:
+                pending.append(job)
+        jobs = pending
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(jobs)))
+
+    start = time.perf_counter()
+    timings = []
+    try:
+        if workers == 1:
+            for job in jobs:
+                timings.append(_run_job(job))
+                _record(manifest, job, keys)
+        else:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+                futures = [pool.submit(_run_job, job) for job in jobs]
+                for job, future in zip(jobs, futures):
+                    timings.append(future.result())
+                    _record(manifest, job, keys)
+    finally:
+        # Keep what did render even if a later job failed
+        if manifest is not None:
+            manifest.save()
+    wall = time.perf_counter() - start
+
+    if report:
+        print_job_timings(timings, wall, workers)
+        if skipped:
+            print(f"   {len(skipped)} unchanged figure{'s' if len(skipped) != 1 else ''} skipped: "
+                  + ', '.join(skipped))
+    return timings
+
+
+def print_job_timings(timings: List[Tuple[str, float]], wall: float, workers: int):
+    """Per-figure render times, plus total render time vs. wall time."""
+    width = max((len(name) for name, _ in timings), default=0)
+    for name, seconds in timings:
+        print(f"   ✓ {name:<{width}}  {seconds:6.2f} s")
+    total = sum(seconds for _, seconds in timings)
+    print(f"   {len(timings)} figures: {total:.1f} s of rendering in {wall:.1f} s wall time "
+          f"({workers} worker{'s' if workers != 1 else ''})")
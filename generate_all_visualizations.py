@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+"""
+Generate the Full Figure Set
+Runs every visualization script against one shared AnalysisSession, so Paper B
+is parsed once and the contingency tables / statistics are computed once.
+"""
+
+import importlib
+import time
+
+from analysis_session import get_session
+
+SCRIPTS = [
+    'generate_comprehensive_visualizations',
+    'generate_improved_visualizations',
+    'generate_fixed_visualizations',
+    'generate_cachai_effect_sizes',
+    'generate_chord_correlation_metrics',
+]
+
+
+def main():
+    session = get_session()
+
+    for name in SCRIPTS:
+        try:
+            module = importlib.import_module(name)
+        except ImportError as e:
+            print(f"Warning: skipping {name} ({e})")
+            continue
+
+        print("\n" + "#"*70)
+        print(f"# {name}")
+        print("#"*70)
+        start = time.perf_counter()
+        module.main(session)
+        print(f"\n✓ {name} finished in {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
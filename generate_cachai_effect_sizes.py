@@ -4,11 +4,8 @@ Generate Cachai Chord Diagrams for Effect Size Metrics
 Creates chord diagrams for Cramér's V and Phi coefficient matrices
 """
 
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.stats import chi2_contingency
 import cachai.chplot as chp
 import warnings
 
@@ -18,66 +15,32 @@ sns.set_palette("husl")
 
 import sys
 sys.path.insert(0, '/Users/marcus/Desktop/YSO')
-from yso_utils import parse_mrt_file, categorize_variability
+from analysis_session import get_session
 
 
-def cramers_v(x, y):
-    """Calculate Cramér's V statistic"""
-    confusion_matrix = pd.crosstab(x, y)
-    chi2 = chi2_contingency(confusion_matrix)[0]
-    n = confusion_matrix.sum().sum()
-    min_dim = min(confusion_matrix.shape) - 1
-    if min_dim == 0:
-        return 0
-    return np.sqrt(chi2 / (n * min_dim))
-
-
-def phi_coefficient(x, y):
-    """Calculate Phi coefficient"""
-    confusion_matrix = pd.crosstab(x, y)
-    chi2 = chi2_contingency(confusion_matrix)[0]
-    n = confusion_matrix.sum().sum()
-    return np.sqrt(chi2 / n)
-
-
-def build_effect_size_matrix(df, variables, effect_func):
-    """Build pairwise effect size matrix for categorical variables"""
-    n_vars = len(variables)
-    matrix = np.zeros((n_vars, n_vars))
-    
-    for i in range(n_vars):
-        for j in range(n_vars):
-            if i == j:
-                matrix[i, j] = 1.0
-            else:
-                matrix[i, j] = effect_func(df[variables[i]], df[variables[j]])
-    
-    return pd.DataFrame(matrix, index=variables, columns=variables)
-
-
-def main():
+def main(session=None):
     print("Loading YSO data...")
-    paper_b_file = '/Users/marcus/Desktop/YSO/paper_data_files/apjsadc397t2_mrt.txt'
-    df_b = parse_mrt_file(paper_b_file)
+    session = session or get_session()
+    df_b = session.frame
     
     print(f"Loaded {len(df_b)} sources\n")
-    df_b['Variability'] = categorize_variability(df_b, 'delW2mag')
-    
-    categorical_vars = ['YSO_CLASS', 'LCType', 'Variability']
     
     print("="*70)
     print("GENERATING EFFECT SIZE MATRICES")
     print("="*70)
     
+    # One pass over the variable pairs gives every metric
+    effect_sizes = session.effect_sizes
+    
     # Cramér's V Matrix
     print("\n1. Computing Cramér's V matrix...")
-    cramers_matrix = build_effect_size_matrix(df_b, categorical_vars, cramers_v)
+    cramers_matrix = effect_sizes['cramers_v']
     print("Cramér's V Matrix:")
     print(cramers_matrix.round(4))
     
     # Phi Coefficient Matrix
     print("\n2. Computing Phi Coefficient matrix...")
-    phi_matrix = build_effect_size_matrix(df_b, categorical_vars, phi_coefficient)
+    phi_matrix = effect_sizes['phi']
     print("Phi Coefficient Matrix:")
     print(phi_matrix.round(4))
     
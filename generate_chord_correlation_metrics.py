@@ -15,20 +15,18 @@ warnings.filterwarnings('ignore')
 
 import sys
 sys.path.insert(0, '/Users/marcus/Desktop/YSO')
-from yso_utils import parse_mrt_file, categorize_variability, compute_correlation_matrix
+from analysis_session import get_session
 
 
-def main():
+def main(session=None):
     print("Loading YSO data...")
-    paper_b_file = '/Users/marcus/Desktop/YSO/paper_data_files/apjsadc397t2_mrt.txt'
-    df_b = parse_mrt_file(paper_b_file)
+    session = session or get_session()
+    df_b = session.frame
     
     print(f"Loaded {len(df_b)} sources\n")
-    df_b['Variability'] = categorize_variability(df_b, 'delW2mag')
     
     print("Computing standardized correlation matrix...")
-    numeric_cols = ['W2magMean', 'sig_W2Flux', 'delW2mag', 'Period', 'slope', 'r_value', 'FLP_LSP_BOOT']
-    corr_matrix = compute_correlation_matrix(df_b, numeric_cols, standardize=True)
+    corr_matrix = session.correlation_matrix
     
     print("\nCorrelation Matrix (Standardized):")
     print(corr_matrix.round(3))
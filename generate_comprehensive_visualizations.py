@@ -5,12 +5,12 @@ Includes: contingency tables, effect sizes, confidence intervals, matplotlib cho
 """
 
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.stats import chi2_contingency, chi2
+from scipy.stats import chi2
 from matplotlib.patches import Wedge, FancyBboxPatch
 from matplotlib.patches import ConnectionPatch
+from matplotlib.collections import LineCollection
 import warnings
 
 warnings.filterwarnings('ignore')
@@ -19,53 +19,13 @@ sns.set_palette("husl")
 
 import sys
 sys.path.insert(0, '/Users/marcus/Desktop/YSO')
-from yso_utils import parse_mrt_file, categorize_variability, compute_correlation_matrix
+from analysis_session import get_session
+from figure_jobs import FigureJob, FigureManifest, run_figure_jobs
 
+CHORD_THRESHOLD = 0.001  # chords below this fraction of the largest cell are not drawn
 
-def cramers_v_with_ci(x, y, confidence=0.95):
-    """Calculate Cramér's V with bootstrap confidence interval"""
-    confusion_matrix = pd.crosstab(x, y)
-    chi2_stat = chi2_contingency(confusion_matrix)[0]
-    n = confusion_matrix.sum().sum()
-    min_dim = min(confusion_matrix.shape) - 1
-    
-    if min_dim == 0:
-        return 0, (0, 0)
-    
-    v = np.sqrt(chi2_stat / (n * min_dim))
-    
-    # Bootstrap CI
-    np.random.seed(42)
-    v_bootstrap = []
-    for _ in range(1000):
-        indices = np.random.choice(len(x), size=len(x), replace=True)
-        x_boot = x.iloc[indices].values
-        y_boot = y.iloc[indices].values
-        cm_boot = pd.crosstab(x_boot, y_boot)
-        chi2_boot = chi2_contingency(cm_boot)[0]
-        v_boot = np.sqrt(chi2_boot / (len(x) * min_dim)) if min_dim > 0 else 0
-        v_bootstrap.append(v_boot)
-    
-    v_bootstrap = np.array(v_bootstrap)
-    alpha = (1 - confidence) / 2
-    ci_lower = np.percentile(v_bootstrap, alpha * 100)
-    ci_upper = np.percentile(v_bootstrap, (1 - alpha) * 100)
-    
-    return v, (ci_lower, ci_upper)
 
-
-def phi_coefficient(x, y):
-    """Calculate Phi coefficient (effect size for 2x2 tables, approximation for larger)"""
-    confusion_matrix = pd.crosstab(x, y)
-    chi2_stat = chi2_contingency(confusion_matrix)[0]
-    n = confusion_matrix.sum().sum()
-    
-    # Phi is chi2/n
-    phi = np.sqrt(chi2_stat / n)
-    return phi
-
-
-def create_heatmap_with_contingency(contingency_table, title, filename, metric='pearson'):
+def create_heatmap_with_contingency(contingency_table, title, filename, metric='pearson', cmap='coolwarm', dpi=300):
     """Create heatmap with contingency table embedded"""
     if metric == 'pearson':
         data = contingency_table.astype(float).T.corr()
@@ -75,7 +35,7 @@ def create_heatmap_with_contingency(contingency_table, title, filename, metric='
     fig, ax = plt.subplots(figsize=(12, 10))
     
     # Create heatmap
-    sns.heatmap(data, annot=True, fmt='.2f', cmap='coolwarm', center=0,
+    sns.heatmap(data, annot=True, fmt='.2f', cmap=cmap, center=0,
                 square=True, linewidths=1.5, cbar_kws={"shrink": 0.8}, ax=ax,
                 annot_kws={'size': 10, 'weight': 'bold'})
     
@@ -87,11 +47,11 @@ def create_heatmap_with_contingency(contingency_table, title, filename, metric='
              bbox=dict(boxstyle='round', facecolor='wheat', alpha=0.3))
     
     plt.tight_layout()
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.savefig(filename, dpi=dpi, bbox_inches='tight')
     plt.close()
 
 
-def create_statistical_summary(stats_dict, filename):
+def create_statistical_summary(stats_dict, filename, dpi=300):
     """Create comprehensive statistical summary figure"""
     fig, axes = plt.subplots(2, 2, figsize=(14, 10))
     fig.suptitle('Statistical Summary: YSO Categorical Associations', 
@@ -164,79 +124,58 @@ def create_statistical_summary(stats_dict, filename):
             bbox=dict(boxstyle='round', facecolor='lightcoral', alpha=0.2))
     
     plt.tight_layout()
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.savefig(filename, dpi=dpi, bbox_inches='tight')
     plt.close()
 
 
-def create_matplotlib_chord(contingency_table, title, filename, threshold=0.001):
-    """Create a matplotlib-based chord diagram from contingency table"""
-    fig, ax = plt.subplots(figsize=(12, 12), subplot_kw=dict(projection='polar'))
-    
-    # Get categories
-    cats1 = list(contingency_table.index)
-    cats2 = list(contingency_table.columns)
-    all_cats = cats1 + cats2
-    n_cats = len(all_cats)
-    
-    # Normalize data
-    data = contingency_table.astype(float)
-    data_max = data.max().max()
-    if data_max > 0:
-        data_norm = data / data_max
-    else:
-        data_norm = data
-    
-    # Create angles for each category
-    angles = np.linspace(0, 2*np.pi, n_cats, endpoint=False)
-    
-    # Draw nodes (category segments)
-    colors1 = plt.cm.Set3(np.linspace(0, 1, len(cats1)))
-    colors2 = plt.cm.Set2(np.linspace(0, 1, len(cats2)))
-    
-    node_colors = np.concatenate([colors1, colors2])
-    node_sizes = []
-    
-    for i, cat in enumerate(all_cats):
-        if i < len(cats1):
-            size = contingency_table.iloc[i].sum()
-        else:
-            size = contingency_table.iloc[:, i-len(cats1)].sum()
-        node_sizes.append(size)
-    
-    # Normalize node sizes for visualization
-    node_sizes_norm = np.array(node_sizes) / max(node_sizes) * 0.3
-    
-    # Draw connections (chords)
-    for i, cat1 in enumerate(cats1):
-        for j, cat2 in enumerate(cats2):
-            value = data_norm.iloc[i, j]
-            
-            if value > threshold:
-                angle1 = angles[i]
-                angle2 = angles[len(cats1) + j]
-                
-                # Draw connection
-                theta = np.linspace(angle1, angle2, 100)
-                r = 0.8 + 0.1 * value
-                
-                x = r * np.cos(theta)
-                y = r * np.sin(theta)
-                
-                alpha = 0.3 + 0.4 * value
-                ax.plot(x, y, color=colors1[i], alpha=alpha, linewidth=2*value)
-    
-    # Draw node labels
-    for i, cat in enumerate(all_cats):
-        angle = angles[i]
-        x = 1.2 * np.cos(angle)
-        y = 1.2 * np.sin(angle)
-        
+def chord_segments(contingency_table, threshold=0.001, n_points=100):
+    """
+    Build every chord of a contingency table at once.
+    
+    Returns:
+        segments: (n_chords, n_points, 2) array of chord paths
+        colors: (n_chords, 4) RGBA, row-category color with alpha 0.3 + 0.4 * value
+        widths: (n_chords,) line widths, 2 * value
+    where value is the cell count normalized by the table maximum.
+    """
+    n_rows, n_cols = contingency_table.shape
+    angles = np.linspace(0, 2*np.pi, n_rows + n_cols, endpoint=False)
+    colors1 = plt.cm.Set3(np.linspace(0, 1, n_rows))
+    
+    data = contingency_table.to_numpy(dtype=float)
+    data_max = data.max() if data.size else 0
+    data_norm = data / data_max if data_max > 0 else data
+    
+    # Cells above threshold, in row-major order (the drawing order)
+    rows, cols = np.nonzero(data_norm > threshold)
+    values = data_norm[rows, cols]
+    
+    t = np.linspace(0, 1, n_points)
+    angle1 = angles[rows][:, None]
+    angle2 = angles[n_rows + cols][:, None]
+    theta = angle1 + (angle2 - angle1) * t
+    r = (0.8 + 0.1 * values)[:, None]
+    segments = np.stack([r * np.cos(theta), r * np.sin(theta)], axis=-1)
+    
+    colors = colors1[rows].copy()
+    colors[:, 3] = 0.3 + 0.4 * values
+    return segments, colors, 2 * values
+
+
+def draw_chord_diagram(ax, contingency_table, threshold=0.001, fontsize=10):
+    """Draw all chords of a table as one LineCollection, plus category labels, on a polar axis"""
+    segments, colors, widths = chord_segments(contingency_table, threshold)
+    ax.add_collection(LineCollection(segments, colors=colors, linewidths=widths, zorder=2))
+    
+    all_cats = list(contingency_table.index) + list(contingency_table.columns)
+    angles = np.linspace(0, 2*np.pi, len(all_cats), endpoint=False)
+    for angle, cat in zip(angles, all_cats):
         # Rotate text for readability
         rotation = np.degrees(angle)
         if angle > np.pi:
             rotation = rotation + 180
         
-        ax.text(angle, 1.35, cat, ha='center', va='center', fontsize=10,
+        ax.text(angle, 1.35, cat, ha='center', va='center', fontsize=fontsize,
                 rotation=rotation, weight='bold')
     
     ax.set_ylim(0, 2)
@@ -244,132 +183,80 @@ def create_matplotlib_chord(contingency_table, title, filename, threshold=0.001)
     ax.set_theta_direction(-1)
     ax.set_xticks([])
     ax.set_yticks([])
+
+
+def create_matplotlib_chord(contingency_table, title, filename, threshold=0.001, dpi=300):
+    """Create a matplotlib-based chord diagram from contingency table"""
+    fig, ax = plt.subplots(figsize=(12, 12), subplot_kw=dict(projection='polar'))
+    
+    draw_chord_diagram(ax, contingency_table, threshold, fontsize=10)
     
     ax.set_title(title, fontsize=14, fontweight='bold', pad=20)
     
     plt.tight_layout()
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.savefig(filename, dpi=dpi, bbox_inches='tight')
     plt.close()
 
 
-def create_zoomed_chord_rare_categories(contingency_table, title, filename):
+def create_zoomed_chord_rare_categories(contingency_table, title, filename, threshold=0.001, dpi=300):
     """Create chord diagrams focused on rare categories by filtering out dominant ones"""
-    fig, axes = plt.subplots(2, 2, figsize=(16, 16))
+    fig, axes = plt.subplots(2, 2, figsize=(16, 16), subplot_kw=dict(projection='polar'))
     fig.suptitle(f'{title} - Rare Categories Focus', fontsize=16, fontweight='bold')
     
     # Helper function to create focused chord
     def make_focused_chord(ct, ax, min_count=None):
-        cats1 = list(ct.index)
-        cats2 = list(ct.columns)
-        all_cats = cats1 + cats2
-        n_cats = len(all_cats)
-        
-        data = ct.astype(float)
-        data_max = data.max().max()
-        if data_max > 0:
-            data_norm = data / data_max
-        else:
-            data_norm = data
-        
-        angles = np.linspace(0, 2*np.pi, n_cats, endpoint=False)
-        colors1 = plt.cm.Set3(np.linspace(0, 1, len(cats1)))
-        colors2 = plt.cm.Set2(np.linspace(0, 1, len(cats2)))
-        node_colors = np.concatenate([colors1, colors2])
-        
-        for i, cat1 in enumerate(cats1):
-            for j, cat2 in enumerate(cats2):
-                value = data_norm.iloc[i, j]
-                
-                if value > 0.001:
-                    angle1 = angles[i]
-                    angle2 = angles[len(cats1) + j]
-                    
-                    theta = np.linspace(angle1, angle2, 100)
-                    r = 0.8 + 0.1 * value
-                    
-                    x = r * np.cos(theta)
-                    y = r * np.sin(theta)
-                    
-                    alpha = 0.3 + 0.4 * value
-                    ax.plot(x, y, color=colors1[i], alpha=alpha, linewidth=2*value)
-        
-        for i, cat in enumerate(all_cats):
-            angle = angles[i]
-            x = 1.2 * np.cos(angle)
-            y = 1.2 * np.sin(angle)
-            
-            rotation = np.degrees(angle)
-            if angle > np.pi:
-                rotation = rotation + 180
-            
-            ax.text(angle, 1.35, cat, ha='center', va='center', fontsize=9,
-                    rotation=rotation, weight='bold')
-        
-        ax.set_ylim(0, 2)
-        ax.set_theta_offset(np.pi / 2)
-        ax.set_theta_direction(-1)
-        ax.set_xticks([])
-        ax.set_yticks([])
+        draw_chord_diagram(ax, ct, threshold=threshold, fontsize=9)
         ax.set_title(f'Threshold: {min_count}', fontsize=10)
     
     # Panel 1: All data
-    ax = axes[0, 0]
-    ax.set_projection('polar')
-    make_focused_chord(contingency_table, ax, 'All data')
+    make_focused_chord(contingency_table, axes[0, 0], 'All data')
     
     # Panel 2: Only rows with count < median
     row_totals = contingency_table.sum(axis=1)
     median_row = row_totals.median()
     rare_rows = contingency_table[row_totals < median_row]
     if len(rare_rows) > 0:
-        ax = axes[0, 1]
-        ax.set_projection('polar')
-        make_focused_chord(rare_rows, ax, f'Row count < {median_row:.0f}')
+        make_focused_chord(rare_rows, axes[0, 1], f'Row count < {median_row:.0f}')
     
     # Panel 3: Only columns with count < median
     col_totals = contingency_table.sum(axis=0)
     median_col = col_totals.median()
     rare_cols = contingency_table[[c for c in contingency_table.columns if col_totals[c] < median_col]]
     if len(rare_cols.columns) > 0:
-        ax = axes[1, 0]
-        ax.set_projection('polar')
-        make_focused_chord(rare_cols, ax, f'Col count < {median_col:.0f}')
+        make_focused_chord(rare_cols, axes[1, 0], f'Col count < {median_col:.0f}')
     
     # Panel 4: Only rare in both dimensions
     rare_both = contingency_table.loc[rare_rows.index, rare_cols.columns]
     if len(rare_both) > 0 and len(rare_both.columns) > 0:
-        ax = axes[1, 1]
-        ax.set_projection('polar')
-        make_focused_chord(rare_both, ax, 'Both dimensions rare')
+        make_focused_chord(rare_both, axes[1, 1], 'Both dimensions rare')
     
     plt.tight_layout()
-    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    plt.savefig(filename, dpi=dpi, bbox_inches='tight')
     plt.close()
 
 
-def main():
+def main(session=None, workers=None, force=False):
     print("Loading YSO data...")
-    paper_b_file = '/Users/marcus/Desktop/YSO/paper_data_files/apjsadc397t2_mrt.txt'
-    df_b = parse_mrt_file(paper_b_file)
+    session = session or get_session()
+    df_b = session.frame
     
     print(f"Loaded {len(df_b)} sources\n")
-    df_b['Variability'] = categorize_variability(df_b, 'delW2mag')
     
     # ==================== CONTINGENCY TABLES ====================
     print("="*70)
     print("COMPUTING CONTINGENCY TABLES & STATISTICS")
     print("="*70)
     
-    ct_yso_var = pd.crosstab(df_b['YSO_CLASS'], df_b['Variability'])
-    ct_lc_var = pd.crosstab(df_b['LCType'], df_b['Variability'])
-    ct_yso_lc = pd.crosstab(df_b['YSO_CLASS'], df_b['LCType'])
+    ct_yso_var = session.contingency('YSO_CLASS', 'Variability')
+    ct_lc_var = session.contingency('LCType', 'Variability')
+    ct_yso_lc = session.contingency('YSO_CLASS', 'LCType')
     
     # ==================== STATISTICAL TESTS ====================
     print("\n1. Chi-Squared Tests")
     
-    chi2_1, p1, dof1, _ = chi2_contingency(ct_yso_var)
-    chi2_2, p2, dof2, _ = chi2_contingency(ct_lc_var)
-    chi2_3, p3, dof3, _ = chi2_contingency(ct_yso_lc)
+    chi2_1, p1, dof1 = session.chi2('YSO_CLASS', 'Variability')
+    chi2_2, p2, dof2 = session.chi2('LCType', 'Variability')
+    chi2_3, p3, dof3 = session.chi2('YSO_CLASS', 'LCType')
     
     print(f"   YSO vs Variability: χ² = {chi2_1:.2f}, p = {p1:.2e}")
     print(f"   LC vs Variability:  χ² = {chi2_2:.2f}, p = {p2:.2e}")
@@ -378,9 +265,9 @@ def main():
     # ==================== EFFECT SIZES ====================
     print("\n2. Cramér's V with Confidence Intervals (95%)")
     
-    v_yso_var, ci_yso_var = cramers_v_with_ci(df_b['YSO_CLASS'], df_b['Variability'])
-    v_lc_var, ci_lc_var = cramers_v_with_ci(df_b['LCType'], df_b['Variability'])
-    v_yso_lc, ci_yso_lc = cramers_v_with_ci(df_b['YSO_CLASS'], df_b['LCType'])
+    v_yso_var, ci_yso_var = session.cramers_v_ci('YSO_CLASS', 'Variability')
+    v_lc_var, ci_lc_var = session.cramers_v_ci('LCType', 'Variability')
+    v_yso_lc, ci_yso_lc = session.cramers_v_ci('YSO_CLASS', 'LCType')
     
     print(f"   YSO vs Variability: V = {v_yso_var:.4f} [{ci_yso_var[0]:.4f}, {ci_yso_var[1]:.4f}]")
     print(f"   LC vs Variability:  V = {v_lc_var:.4f} [{ci_lc_var[0]:.4f}, {ci_lc_var[1]:.4f}]")
@@ -389,9 +276,9 @@ def main():
     # ==================== PHI COEFFICIENTS ====================
     print("\n3. Phi Coefficients")
     
-    phi_yso_var = phi_coefficient(df_b['YSO_CLASS'], df_b['Variability'])
-    phi_lc_var = phi_coefficient(df_b['LCType'], df_b['Variability'])
-    phi_yso_lc = phi_coefficient(df_b['YSO_CLASS'], df_b['LCType'])
+    phi_yso_var = session.statistics('YSO_CLASS', 'Variability')['phi']
+    phi_lc_var = session.statistics('LCType', 'Variability')['phi']
+    phi_yso_lc = session.statistics('YSO_CLASS', 'LCType')['phi']
     
     print(f"   YSO vs Variability: φ = {phi_yso_var:.4f}")
     print(f"   LC vs Variability:  φ = {phi_lc_var:.4f}")
@@ -421,63 +308,6 @@ def main():
     print("GENERATING VISUALIZATIONS")
     print("="*70)
     
-    # 1. Heatmaps with embedded contingency tables
-    print("\n1. Creating heatmaps with contingency tables...")
-    
-    create_heatmap_with_contingency(ct_yso_var, 
-        'YSO Class vs Variability\n(With Contingency Table)',
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/heatmap_yso_var_contingency.png')
-    print("   ✓ heatmap_yso_var_contingency.png")
-    
-    create_heatmap_with_contingency(ct_lc_var,
-        'Light Curve Type vs Variability\n(With Contingency Table)',
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/heatmap_lc_var_contingency.png')
-    print("   ✓ heatmap_lc_var_contingency.png")
-    
-    create_heatmap_with_contingency(ct_yso_lc,
-        'YSO Class vs Light Curve Type\n(With Contingency Table)',
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/heatmap_yso_lc_contingency.png')
-    print("   ✓ heatmap_yso_lc_contingency.png")
-    
-    # 2. Matplotlib chord diagrams (full data)
-    print("\n2. Creating matplotlib chord diagrams (full data)...")
-    
-    create_matplotlib_chord(ct_yso_var,
-        'YSO Class vs Variability\n(Chord Diagram)',
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/matplotlib_chord_yso_var.png')
-    print("   ✓ matplotlib_chord_yso_var.png")
-    
-    create_matplotlib_chord(ct_lc_var,
-        'Light Curve Type vs Variability\n(Chord Diagram)',
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/matplotlib_chord_lc_var.png')
-    print("   ✓ matplotlib_chord_lc_var.png")
-    
-    create_matplotlib_chord(ct_yso_lc,
-        'YSO Class vs Light Curve Type\n(Chord Diagram)',
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/matplotlib_chord_yso_lc.png')
-    print("   ✓ matplotlib_chord_yso_lc.png")
-    
-    # 2b. Zoomed chord diagrams (rare categories)
-    print("\n2b. Creating zoomed chord diagrams (rare categories focus)...")
-    
-    create_zoomed_chord_rare_categories(ct_yso_var,
-        'YSO Class vs Variability',
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/matplotlib_chord_yso_var_zoomed.png')
-    print("   ✓ matplotlib_chord_yso_var_zoomed.png")
-    
-    create_zoomed_chord_rare_categories(ct_lc_var,
-        'Light Curve Type vs Variability',
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/matplotlib_chord_lc_var_zoomed.png')
-    print("   ✓ matplotlib_chord_lc_var_zoomed.png")
-    
-    create_zoomed_chord_rare_categories(ct_yso_lc,
-        'YSO Class vs Light Curve Type',
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/matplotlib_chord_yso_lc_zoomed.png')
-    print("   ✓ matplotlib_chord_yso_lc_zoomed.png")
-    
-    # 3. Statistical summary
-    print("\n3. Creating statistical summary figure...")
-    
     stats_dict = {
         'chi2_tests': {
             'YSO vs Variability': {'chi2': chi2_1, 'p_value': p1, 'dof': dof1},
@@ -501,9 +331,39 @@ def main():
         }
     }
     
-    create_statistical_summary(stats_dict,
-        '/Users/marcus/Desktop/YSO/plotting_tool_graphs/statistical_summary.png')
-    print("   ✓ statistical_summary.png")
+    out_dir = '/Users/marcus/Desktop/YSO/plotting_tool_graphs'
+    tables = [
+        ('yso_var', ct_yso_var, 'YSO Class vs Variability'),
+        ('lc_var', ct_lc_var, 'Light Curve Type vs Variability'),
+        ('yso_lc', ct_yso_lc, 'YSO Class vs Light Curve Type'),
+    ]
+    
+    # Settings shared by several figures are job kwargs, so the manifest
+    # re-renders every figure that uses one when it changes
+    dpi = 300
+    jobs = []
+    for key, table, label in tables:
+        output = f'{out_dir}/heatmap_{key}_contingency.png'
+        jobs.append(FigureJob(f'heatmap_{key}_contingency.png', create_heatmap_with_contingency,
+                              (table, f'{label}\n(With Contingency Table)', output),
+                              {'cmap': 'coolwarm', 'dpi': dpi}, output=output))
+    for key, table, label in tables:
+        output = f'{out_dir}/matplotlib_chord_{key}.png'
+        jobs.append(FigureJob(f'matplotlib_chord_{key}.png', create_matplotlib_chord,
+                              (table, f'{label}\n(Chord Diagram)', output),
+                              {'threshold': CHORD_THRESHOLD, 'dpi': dpi}, output=output))
+    for key, table, label in tables:
+        output = f'{out_dir}/matplotlib_chord_{key}_zoomed.png'
+        jobs.append(FigureJob(f'matplotlib_chord_{key}_zoomed.png', create_zoomed_chord_rare_categories,
+                              (table, label, output), {'threshold': CHORD_THRESHOLD, 'dpi': dpi}, output=output))
+    output = f'{out_dir}/statistical_summary.png'
+    jobs.append(FigureJob('statistical_summary.png', create_statistical_summary,
+                          (stats_dict, output), {'dpi': dpi}, output=output))
+    
+    print(f"\nRendering {len(jobs)} figures (heatmaps, chord diagrams, zoomed chords, summary)...")
+    # Figures whose data, parameters and plotting code are unchanged are skipped
+    run_figure_jobs(jobs, workers=workers, manifest=FigureManifest(f'{out_dir}/.figure_manifest.json'),
+                    force=force)
     
     # ==================== SUMMARY ====================
     print("\n" + "="*70)
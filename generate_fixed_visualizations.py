@@ -5,7 +5,6 @@ Addresses issues with normalization, label readability, and sign information
 """
 
 import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
 import cachai.chplot as chp
@@ -18,9 +17,7 @@ sns.set_palette("husl")
 
 import sys
 sys.path.insert(0, '/Users/marcus/Desktop/YSO')
-from yso_utils import (
-    parse_mrt_file, compute_correlation_matrix, categorize_variability
-)
+from analysis_session import get_session
 
 
 def improve_chord_labels(ax, n_labels, fontsize=11):
@@ -90,25 +87,19 @@ def validate_data(df):
         print(f"  {cls}: {count:5d} ({100*count/len(df):5.1f}%)")
 
 
-def main():
+def main(session=None):
     print("Loading YSO data...")
-    paper_b_file = '/Users/marcus/Desktop/YSO/paper_data_files/apjsadc397t2_mrt.txt'
-    df_b = parse_mrt_file(paper_b_file)
+    session = session or get_session()
+    df_b = session.frame
     
     print(f"Loaded {len(df_b)} sources")
     
-    # Add variability categorization
-    df_b['Variability'] = categorize_variability(df_b, 'delW2mag')
-    
     # Validate data
     validate_data(df_b)
     
-    # Select numeric columns for correlation
-    numeric_cols = ['W2magMean', 'sig_W2Flux', 'delW2mag', 'Period', 'slope', 'r_value', 'FLP_LSP_BOOT']
-    
-    # Compute correlation matrix with standardization
+    # Standardized correlation matrix of the numeric metrics
     print("\nComputing standardized correlation matrix...")
-    corr_matrix = compute_correlation_matrix(df_b, numeric_cols, standardize=True)
+    corr_matrix = session.correlation_matrix
     
     print("\nCorrelation Matrix (standardized):")
     print(corr_matrix.round(3))
@@ -214,7 +205,7 @@ def main():
     print("GRAPH 2: YSO Class vs Light Curve Type (Chord Diagram - Contingency Table)")
     print("="*70)
     
-    contingency_lc = pd.crosstab(df_b['YSO_CLASS'], df_b['LCType'])
+    contingency_lc = session.contingency('YSO_CLASS', 'LCType')
     print("\nContingency Table:")
     print(contingency_lc)
     print("✓ Skipping chord diagram due to library compatibility - see correlation matrix instead")
@@ -224,7 +215,7 @@ def main():
     print("GRAPH 3: YSO Class vs Variability (Chord Diagram - Contingency Table)")
     print("="*70)
     
-    contingency_var = pd.crosstab(df_b['YSO_CLASS'], df_b['Variability'])
+    contingency_var = session.contingency('YSO_CLASS', 'Variability')
     print("\nContingency Table:")
     print(contingency_var)
     print("✓ Skipping chord diagram due to library compatibility - see correlation matrix instead")
@@ -234,7 +225,7 @@ def main():
     print("GRAPH 4: Light Curve Type vs Variability (Chord Diagram - Contingency Table)")
     print("="*70)
     
-    contingency_lc_var = pd.crosstab(df_b['LCType'], df_b['Variability'])
+    contingency_lc_var = session.contingency('LCType', 'Variability')
     print("\nContingency Table:")
     print(contingency_lc_var)
     print("\nTable Details:")
@@ -4,11 +4,8 @@ Improved YSO Visualizations with Statistical Rigor
 Addresses: Categorical correlation metrics, significance tests, class imbalance warnings
 """
 
-import numpy as np
-import pandas as pd
 import matplotlib.pyplot as plt
 import seaborn as sns
-from scipy.stats import chi2_contingency
 import warnings
 from pathlib import Path
 
@@ -18,27 +15,7 @@ sns.set_palette("husl")
 
 import sys
 sys.path.insert(0, '/Users/marcus/Desktop/YSO')
-from yso_utils import (
-    parse_mrt_file, compute_correlation_matrix, categorize_variability
-)
-
-
-def cramers_v(x, y):
-    """Calculate Cramér's V statistic for categorical association strength"""
-    confusion_matrix = pd.crosstab(x, y)
-    chi2 = chi2_contingency(confusion_matrix)[0]
-    n = confusion_matrix.sum().sum()
-    min_dim = min(confusion_matrix.shape) - 1
-    if min_dim == 0:
-        return 0
-    return np.sqrt(chi2 / (n * min_dim))
-
-
-def chi2_test(x, y):
-    """Perform chi-squared test of independence"""
-    confusion_matrix = pd.crosstab(x, y)
-    chi2, p_value, dof, _ = chi2_contingency(confusion_matrix)
-    return chi2, p_value, dof
+from analysis_session import get_session
 
 
 def create_annotated_heatmap(matrix, title, filename, add_counts=None):
@@ -89,15 +66,13 @@ def check_class_imbalance(df):
     return imbalance_report
 
 
-def main():
+def main(session=None):
     print("Loading YSO data...")
-    paper_b_file = '/Users/marcus/Desktop/YSO/paper_data_files/apjsadc397t2_mrt.txt'
-    df_b = parse_mrt_file(paper_b_file)
+    session = session or get_session()
+    df_b = session.frame
     
     print(f"Loaded {len(df_b)} sources\n")
     
-    df_b['Variability'] = categorize_variability(df_b, 'delW2mag')
-    
     # ==================== DATA QUALITY REPORT ====================
     print("="*70)
     print("DATA QUALITY & STATISTICAL VALIDATION")
@@ -128,9 +103,9 @@ def main():
     print("CONTINGENCY TABLES")
     print("="*70)
     
-    ct_yso_var = pd.crosstab(df_b['YSO_CLASS'], df_b['Variability'])
-    ct_lc_var = pd.crosstab(df_b['LCType'], df_b['Variability'])
-    ct_yso_lc = pd.crosstab(df_b['YSO_CLASS'], df_b['LCType'])
+    ct_yso_var = session.contingency('YSO_CLASS', 'Variability')
+    ct_lc_var = session.contingency('LCType', 'Variability')
+    ct_yso_lc = session.contingency('YSO_CLASS', 'LCType')
     
     print("\n1. YSO Class vs Variability:")
     print(ct_yso_var)
@@ -147,17 +122,17 @@ def main():
     print("="*70)
     
     print("\n1. YSO Class vs Variability:")
-    chi2_1, p1, dof1 = chi2_test(df_b['YSO_CLASS'], df_b['Variability'])
+    chi2_1, p1, dof1 = session.chi2('YSO_CLASS', 'Variability')
     print(f"   χ² = {chi2_1:.2f}, p-value = {p1:.2e}, DOF = {dof1}")
     print(f"   Result: {'✅ HIGHLY SIGNIFICANT' if p1 < 0.001 else '❌ NOT SIGNIFICANT'}")
     
     print("\n2. Light Curve Type vs Variability:")
-    chi2_2, p2, dof2 = chi2_test(df_b['LCType'], df_b['Variability'])
+    chi2_2, p2, dof2 = session.chi2('LCType', 'Variability')
     print(f"   χ² = {chi2_2:.2f}, p-value = {p2:.2e}, DOF = {dof2}")
     print(f"   Result: {'✅ HIGHLY SIGNIFICANT' if p2 < 0.001 else '❌ NOT SIGNIFICANT'}")
     
     print("\n3. YSO Class vs Light Curve Type:")
-    chi2_3, p3, dof3 = chi2_test(df_b['YSO_CLASS'], df_b['LCType'])
+    chi2_3, p3, dof3 = session.chi2('YSO_CLASS', 'LCType')
     print(f"   χ² = {chi2_3:.2f}, p-value = {p3:.2e}, DOF = {dof3}")
     print(f"   Result: {'✅ HIGHLY SIGNIFICANT' if p3 < 0.001 else '❌ NOT SIGNIFICANT'}")
     
@@ -167,9 +142,9 @@ def main():
     print("="*70)
     print("Interpretation: 0-0.1=negligible, 0.1-0.3=weak, 0.3-0.5=moderate, >0.5=strong")
     
-    v_yso_var = cramers_v(df_b['YSO_CLASS'], df_b['Variability'])
-    v_lc_var = cramers_v(df_b['LCType'], df_b['Variability'])
-    v_yso_lc = cramers_v(df_b['YSO_CLASS'], df_b['LCType'])
+    v_yso_var = session.statistics('YSO_CLASS', 'Variability')['cramers_v']
+    v_lc_var = session.statistics('LCType', 'Variability')['cramers_v']
+    v_yso_lc = session.statistics('YSO_CLASS', 'LCType')['cramers_v']
     
     def interpret_v(v):
         if v < 0.1:
@@ -190,8 +165,7 @@ def main():
     print("NUMERIC VARIABILITY METRICS (Pearson Correlation)")
     print("="*70)
     
-    numeric_cols = ['W2magMean', 'sig_W2Flux', 'delW2mag', 'Period', 'slope', 'r_value', 'FLP_LSP_BOOT']
-    corr_matrix = compute_correlation_matrix(df_b, numeric_cols, standardize=True)
+    corr_matrix = session.correlation_matrix
     print("\nCorrelation Matrix:")
     print(corr_matrix.round(3))
     
@@ -221,20 +195,8 @@ def main():
     print("✓ Saved correlation_heatmap_variability_metrics.png")
     
     # Heatmap 2: Cramér's V for YSO vs Variability
-    ct_yso_var_float = ct_yso_var.astype(float)
-    cramers_matrix_yso_var = pd.DataFrame(np.zeros((len(ct_yso_var), len(ct_yso_var))),
-                                          index=ct_yso_var.index, columns=ct_yso_var.index)
-    for i in ct_yso_var.index:
-        for j in ct_yso_var.index:
-            if i == j:
-                cramers_matrix_yso_var.loc[i, j] = 1.0
-            else:
-                # Calculate Cramér's V between pairs
-                mask = (df_b['YSO_CLASS'] == i) | (df_b['YSO_CLASS'] == j)
-                df_subset = df_b[mask].copy()
-                if len(df_subset) > 0:
-                    v = cramers_v(df_subset['YSO_CLASS'], df_subset['Variability'])
-                    cramers_matrix_yso_var.loc[i, j] = v
+    # V of Variability within each pair of YSO classes, from the shared contingency table
+    cramers_matrix_yso_var = session.category_pair_cramers_v('YSO_CLASS', 'Variability')
     
     fig, ax = plt.subplots(figsize=(10, 8))
     sns.heatmap(cramers_matrix_yso_var, annot=True, fmt='.2f', cmap='YlOrRd',
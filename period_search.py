@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""
+Batched Lomb-Scargle Period Search
+==================================
+
+Recovers periods (and bootstrap false-alarm probabilities, comparable to
+Paper B's Period / FLP_LSP_BOOT) for many light curves at once:
+1. All sources share one frequency grid
+2. Sources are grouped by epoch count and padded into (source, epoch)
+   blocks; each block's cos/sin(2 pi f t) matrices are built once per
+   frequency chunk
+3. The periodogram is the least-squares sinusoid fit at each frequency,
+   from the sums Y.C, Y.S, C.C, S.S and C.S (equivalent to Scargle's
+   tau-shifted form), normalized by the total sum of squares, so power
+   is in [0, 1] ("standard" normalization)
+4. Bootstrap by permutation: shuffling the magnitudes over fixed epochs
+   leaves C.C, S.S and C.S unchanged, so the observed curve and all of its
+   permutations are one batched matmul, (B+1, n) @ (n, F), per source
+5. FAP = (1 + #permutations whose peak power >= the observed peak) / (B + 1)
+
+Permutations are drawn per source from (seed, source index), so results do
+not depend on how sources are grouped.
+"""
+
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from ztf_batch import RaggedLightCurves
+
+MIN_OBS = 5
+DEFAULT_BLOCK_MB = 128
+
+
+def frequency_grid(baseline_days, min_period=1.0, max_period=None, oversample=5):
+    """
+    Evenly spaced frequencies (1/day) from 1/max_period to 1/min_period.
+
+    The spacing is 1 / (oversample * baseline), i.e. `oversample` points
+    per periodogram peak width.
+    """
+    max_period = max_period or baseline_days
+    step = 1.0 / (oversample * baseline_days)
+    return np.arange(1.0 / max_period, 1.0 / min_period + step / 2, step)
+
+
+def _padded_block(times, values, offsets, rows):
+    """(t, y, valid) (source, epoch) arrays for the given sources, zero-padded."""
+    starts = offsets[rows]
+    counts = offsets[rows + 1] - starts
+    width = int(counts.max())
+    column = np.arange(width)
+    valid = column[None, :] < counts[:, None]
+    index = np.where(valid, starts[:, None] + column[None, :], 0)
+    t = np.where(valid, times[index], 0.0)
+    y = np.where(valid, values[index], 0.0)
+    # Shift each source to its first epoch (power is shift invariant) for precision
+    t = np.where(valid, t - t[:, :1], 0.0)
+    y_mean = (y.sum(axis=1) / counts)[:, None]
+    y = np.where(valid, y - y_mean, 0.0)
+    return t, y, valid, counts
+
+
+def lomb_scargle_batch(times, values, offsets, frequencies, n_bootstrap=0, seed=0,
+                       min_obs=MIN_OBS, block_mb=DEFAULT_BLOCK_MB):
+    """
+    Peak Lomb-Scargle period of every source in a ragged array.
+
+    Args:
+        times, values: concatenated epochs and magnitudes (or fluxes)
+        offsets: source boundaries, length n_sources + 1
+        frequencies: shared frequency grid (1/day)
+        n_bootstrap: permutations per source for the FAP (0 = no FAP)
+        seed: permutation seed
+        min_obs: sources with fewer epochs get NaN
+        block_mb: approximate memory budget of one (source, epoch, frequency) block
+
+    Returns:
+        DataFrame with n_obs, period, frequency, power and fap (NaN without
+        bootstrap), one row per source
+    """
+    times = np.asarray(times, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    frequencies = np.asarray(frequencies, dtype=np.float64)
+    n_sources = len(offsets) - 1
+    n_obs = np.diff(offsets)
+
+    best_power = np.full(n_sources, np.nan)
+    best_freq = np.full(n_sources, np.nan)
+    fap = np.full(n_sources, np.nan)
+
+    usable = np.flatnonzero(n_obs >= min_obs)
+    # Similar epoch counts share a block, which keeps padding small
+    usable = usable[np.argsort(n_obs[usable], kind='stable')]
+
+    n_rows = n_bootstrap + 1
+    n_freq = len(frequencies)
+    freq_chunk = min(n_freq, 256)
+    omega = 2 * np.pi * frequencies
+    budget = block_mb * 2**20
+
+    widths = n_obs[usable]
+    start = 0
+    while start < len(usable):
+        # Largest group whose block (set by its widest, i.e. last, source) fits
+        # the budget: phase/cos/sin per epoch plus the (rows, freq) products
+        sizes = np.arange(1, len(usable) - start + 1)
+        cost = sizes * 8 * freq_chunk * (3 * widths[start:] + 4 * n_rows)
+        stop = start + max(1, int(np.searchsorted(cost, budget, side='right')))
+        rows = usable[start:stop]
+        start = stop
+
+        t, y, valid, counts = _padded_block(times, values, offsets, rows)
+        total_ss = (y * y).sum(axis=1)
+
+        # Row 0 is the observed curve, rows 1.. its permutations
+        stacked = np.zeros((len(rows), n_rows, t.shape[1]))
+        stacked[:, 0] = y
+        for k, (source, n) in enumerate(zip(rows, counts)):
+            if n_bootstrap:
+                rng = np.random.default_rng([seed, int(source)])
+                order = rng.permuted(np.broadcast_to(np.arange(n), (n_bootstrap, n)), axis=1)
+                stacked[k, 1:, :n] = y[k, order]
+
+        peak = np.full((len(rows), n_rows), -np.inf)
+        peak_freq = np.zeros(len(rows))
+        for f0 in range(0, n_freq, freq_chunk):
+            w = omega[f0:f0 + freq_chunk]
+            phase = t[:, :, None] * w[None, None, :]
+            c = np.cos(phase) * valid[:, :, None]
+            s = np.sin(phase) * valid[:, :, None]
+            cc = np.einsum('gnf,gnf->gf', c, c)
+            ss = np.einsum('gnf,gnf->gf', s, s)
+            cs = np.einsum('gnf,gnf->gf', c, s)
+            yc = np.matmul(stacked, c)
+            ys = np.matmul(stacked, s)
+
+            det = cc * ss - cs * cs
+            # Degenerate frequencies (all phases aligned) have no two-term fit
+            fit = (det > 1e-10 * cc * ss)[:, None, :]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                power = (ss[:, None, :] * yc * yc - 2 * cs[:, None, :] * yc * ys
+                         + cc[:, None, :] * ys * ys) / det[:, None, :] / total_ss[:, None, None]
+            power = np.where(fit, power, 0.0)
+
+            chunk_peak = power.max(axis=2)
+            improved = chunk_peak[:, 0] > peak[:, 0]
+            peak_freq[improved] = frequencies[f0:f0 + freq_chunk][power[improved, 0].argmax(axis=1)]
+            peak = np.maximum(peak, chunk_peak)
+
+        best_power[rows] = peak[:, 0]
+        best_freq[rows] = peak_freq
+        if n_bootstrap:
+            exceed = (peak[:, 1:] >= peak[:, :1]).sum(axis=1)
+            fap[rows] = (1 + exceed) / (n_bootstrap + 1)
+
+    with np.errstate(divide='ignore'):
+        period = 1.0 / best_freq
+    return pd.DataFrame({'n_obs': n_obs, 'period': period, 'frequency': best_freq,
+                         'power': best_power, 'fap': fap})
+
+
+def period_search(lightcurves, band='r', frequencies=None, n_bootstrap=0, seed=0, **kwargs):
+    """
+    lomb_scargle_batch on one band of ZTF light curves.
+
+    Args:
+        lightcurves: RaggedLightCurves or a list of light-curve dicts
+        band: 'g' or 'r'
+        frequencies: shared grid (default: frequency_grid over the longest baseline)
+    """
+    if not isinstance(lightcurves, RaggedLightCurves):
+        lightcurves = RaggedLightCurves.from_dicts(lightcurves)
+    times = lightcurves.times[band]
+    offsets = lightcurves.offsets[band]
+    if frequencies is None:
+        counts = np.diff(offsets)
+        nonempty = counts > 0
+        spans = times[offsets[1:][nonempty] - 1] - times[offsets[:-1][nonempty]]
+        frequencies = frequency_grid(spans.max() if len(spans) else 1.0)
+    return lomb_scargle_batch(times, lightcurves.mags[band], offsets, frequencies,
+                              n_bootstrap=n_bootstrap, seed=seed, **kwargs)
+
+
+def main():
+    from ztf_synthetic import generate_survey, survey_periods
+
+    parser = argparse.ArgumentParser(description='Lomb-Scargle period search on synthetic ZTF light curves')
+    parser.add_argument('--sources', type=int, default=1000, help='number of synthetic sources')
+    parser.add_argument('--bootstrap', type=int, default=100, help='permutations per source for the FAP')
+    parser.add_argument('--min-period', type=float, default=5.0, help='shortest period searched (days)')
+    args = parser.parse_args()
+
+    names = [f'SYN{i:06d}' for i in range(args.sources)]
+    lcs = generate_survey(names)
+    frequencies = frequency_grid(1000.0, min_period=args.min_period)
+
+    print(f"Searching {args.sources} sources x {len(frequencies)} frequencies, "
+          f"{args.bootstrap} permutations each...")
+    start = time.perf_counter()
+    result = period_search(lcs, 'r', frequencies, n_bootstrap=args.bootstrap)
+    elapsed = time.perf_counter() - start
+
+    true_period = survey_periods(names)['r']
+    recovered = np.abs(result['period'] / true_period - 1) < 0.02
+    print(f"✓ {elapsed:.1f} s ({args.sources / elapsed:.0f} sources/s)")
+    print(f"  Injected r-band period recovered within 2%: {recovered.mean():.1%}")
+    print(f"  Median FAP: {result['fap'].median():.3f}  (FAP < 0.01: {(result['fap'] < 0.01).mean():.1%})")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,121 +1,85 @@
+import argparse
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+from yso_utils import read_mrt_table, parse_mrt_file, iter_mrt_batches, PAPER_B_COLUMNS
+from source_filters import FilterPipeline, dec_above, isin
+
+# ZTF cannot observe south of -30°; each paper's subsets share that cut
+PAPER_A_PIPELINE = (FilterPipeline(dec_above(-30))
+                    .subset('PaperA_LinearPlus', isin('LCType', ['Linear(+)']))
+                    .subset('PaperA_LinearMinus', isin('LCType', ['Linear(-)'])))
+PAPER_B_PIPELINE = (FilterPipeline(dec_above(-30))
+                    .subset('PaperB_Linear', isin('LCType', ['Linear'])))
+# Paper C is kept whole
+PAPER_C_PIPELINE = FilterPipeline().subset('PaperC_AllSources')
+
+PAPER_A_COLUMNS = ['SPICY', 'Class', 'VarClass1', 'RAh', 'RAm', 'RAs', 'DE-', 'DEd', 'DEm', 'DEs']
+PAPER_C_COLUMNS = ['OBSID', 'f_OBSID', 'Design', 'RAdeg', 'DEdeg']
+
 def parse_paper_a(filepath):
     """Parse Paper A (apjadd25ft1_mrt.txt) - SPICY linear YSOs"""
-    data = []
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-    
-    for line in lines[39:]:
-        if not line.strip() or line.startswith('---'):
-            continue
-        try:
-            parts = line.split()
-            if len(parts) < 26:
-                continue
-            
-            spicy_id = int(parts[0])
-            yso_class = parts[1]
-            
-            lc_class = parts[18]
-            
-            rah = int(parts[20])
-            ram = int(parts[21])
-            ras = float(parts[22])
-            ra_deg = rah * 15 + ram * 15/60 + ras * 15/3600
-            
-            de_str = parts[23]
-            de_sign = -1 if de_str.startswith('-') else 1
-            ded = int(de_str.lstrip('-'))
-            dem = int(parts[24])
-            des = float(parts[25])
-            de_deg = de_sign * (ded + dem/60 + des/3600)
-            
-            lc_type = 'Linear(+)' if 'linear(+)' in lc_class.lower() else 'Linear(-)' if 'linear(-)' in lc_class.lower() else 'Unknown'
-            
-            data.append({
-                'SPICY_ID': spicy_id,
-                'Objname': f'SPICY_{spicy_id}',
-                'RAdeg': ra_deg,
-                'DEdeg': de_deg,
-                'YSO_CLASS': yso_class,
-                'LCType': lc_type,
-                'VarClass1': lc_class
-            })
-        except (ValueError, IndexError) as e:
-            print(f"Error parsing line: {e}")
-            continue
-    
-    return pd.DataFrame(data)
+    return _paper_a_frame(read_mrt_table(filepath, PAPER_A_COLUMNS))
+
+def iter_paper_a(filepath, batch_size=10000):
+    """parse_paper_a in batches of at most batch_size sources."""
+    for raw in iter_mrt_batches(filepath, PAPER_A_COLUMNS, batch_size):
+        yield _paper_a_frame(raw)
+
+def _paper_a_frame(raw):
+    ra_deg = raw['RAh'].to_numpy() * 15 + raw['RAm'].to_numpy() * 15/60 + raw['RAs'].to_numpy() * 15/3600
+    de_sign = np.where(raw['DE-'].to_numpy() == '-', -1, 1)
+    de_deg = de_sign * (raw['DEd'].to_numpy() + raw['DEm'].to_numpy()/60 + raw['DEs'].to_numpy()/3600)
+    
+    # Only a handful of distinct VarClass1 values: classify each once
+    codes, lc_classes = pd.factorize(raw['VarClass1'])
+    lc_types = ['Linear(+)' if 'linear(+)' in c.lower() else 'Linear(-)' if 'linear(-)' in c.lower() else 'Unknown'
+                for c in lc_classes]
+    lc_type = np.array(lc_types + ['Unknown'], dtype=object)[codes]
+    
+    return pd.DataFrame({
+        'SPICY_ID': raw['SPICY'],
+        'Objname': 'SPICY_' + raw['SPICY'].astype(str),
+        'RAdeg': ra_deg,
+        'DEdeg': de_deg,
+        'YSO_CLASS': raw['Class'],
+        'LCType': lc_type,
+        'VarClass1': raw['VarClass1']
+    })
 
 def parse_paper_b(filepath):
     """Parse Paper B (apjsadc397t2_mrt.txt)"""
-    data = []
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-    
-    for line in lines:
-        if line.startswith('J') or line.startswith('L'):
-            parts = line.split()
-            if len(parts) >= 16:
-                try:
-                    data.append({
-                        'Objname': parts[0],
-                        'RAdeg': float(parts[1]),
-                        'DEdeg': float(parts[2]),
-                        'SED_SLOPE': float(parts[3]) if parts[3] != '?' else np.nan,
-                        'YSO_CLASS': parts[4],
-                        'Number': int(parts[5]),
-                        'W2magMean': float(parts[6]),
-                        'W2magMed': float(parts[7]),
-                        'sig_W2Flux': float(parts[8]),
-                        'err_W2Flux': float(parts[9]),
-                        'delW2mag': float(parts[10]),
-                        'Period': float(parts[11]),
-                        'FLP_LSP_BOOT': float(parts[12]),
-                        'slope': float(parts[13]),
-                        'e_slope': float(parts[14]),
-                        'r_value': float(parts[15]),
-                        'LCType': parts[-1] if len(parts) > 21 else 'Unknown'
-                    })
-                except (ValueError, IndexError):
-                    continue
-    
-    return pd.DataFrame(data)
+    return parse_mrt_file(filepath)
+
+def iter_paper_b(filepath, batch_size=10000):
+    """parse_paper_b in batches of at most batch_size sources."""
+    for df in iter_mrt_batches(filepath, PAPER_B_COLUMNS, batch_size):
+        if 'LCType' in df.columns:
+            df['LCType'] = df['LCType'].replace('', 'Unknown')
+        else:
+            df['LCType'] = 'Unknown'
+        yield df
 
 def parse_paper_c(filepath):
     """Parse Paper C (apjsadf4e6t4_mrt.txt) - LAMOST YSO candidates"""
-    data = []
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-    
-    for line in lines[30:]:
-        if not line.strip() or line.startswith('---'):
-            continue
-        try:
-            parts = line.split()
-            if len(parts) < 5:
-                continue
-            
-            obsid = parts[0]
-            design = parts[1]
-            ra_deg = float(parts[2])
-            de_deg = float(parts[3])
-            
-            data.append({
-                'OBSID': obsid,
-                'Objname': design,
-                'RAdeg': ra_deg,
-                'DEdeg': de_deg
-            })
-        except (ValueError, IndexError):
-            continue
-    
-    return pd.DataFrame(data)
+    return _paper_c_frame(read_mrt_table(filepath, PAPER_C_COLUMNS))
+
+def iter_paper_c(filepath, batch_size=10000):
+    """parse_paper_c in batches of at most batch_size sources."""
+    for raw in iter_mrt_batches(filepath, PAPER_C_COLUMNS, batch_size):
+        yield _paper_c_frame(raw)
+
+def _paper_c_frame(raw):
+    # OBSID keeps its '*'/'?' flag suffix, as in the published table
+    return pd.DataFrame({
+        'OBSID': raw['OBSID'].astype(str) + raw['f_OBSID'],
+        'Objname': raw['Design'],
+        'RAdeg': raw['RAdeg'],
+        'DEdeg': raw['DEdeg']
+    })
 
-def main():
+def main(formats=('csv',), batch_size=10000):
     output_dir = Path('/Users/marcus/Desktop/YSO/culled_csvs')
     output_dir.mkdir(exist_ok=True)
     
@@ -129,67 +93,52 @@ def main():
         'C': '/Users/marcus/Desktop/YSO/apjsadf4e6t4_mrt.txt'
     }
     
-    print("\n[PAPER A] Loading apjadd25ft1_mrt.txt...")
-    df_a = parse_paper_a(file_mapping['A'])
-    print(f"  Raw records: {len(df_a)}")
-    
-    df_a_filtered = df_a[df_a['DEdeg'] > -30].copy()
-    print(f"  After DEdeg > -30°: {len(df_a_filtered)}")
-    
-    df_a_linear_plus = df_a_filtered[df_a_filtered['LCType'] == 'Linear(+)'].copy()
-    df_a_linear_minus = df_a_filtered[df_a_filtered['LCType'] == 'Linear(-)'].copy()
-    
-    print(f"  Linear(+) sources: {len(df_a_linear_plus)}")
-    print(f"  Linear(-) sources: {len(df_a_linear_minus)}")
-    
-    output_a_plus = str(output_dir / 'PaperA_LinearPlus.csv')
-    output_a_minus = str(output_dir / 'PaperA_LinearMinus.csv')
-    
-    df_a_linear_plus.to_csv(output_a_plus, index=False)
-    df_a_linear_minus.to_csv(output_a_minus, index=False)
-    
-    print(f"  ✓ Saved: PaperA_LinearPlus.csv ({len(df_a_linear_plus)} sources)")
-    print(f"  ✓ Saved: PaperA_LinearMinus.csv ({len(df_a_linear_minus)} sources)")
-    
-    print("\n[PAPER B] Loading apjsadc397t2_mrt.txt...")
-    df_b = parse_paper_b(file_mapping['B'])
-    print(f"  Raw records: {len(df_b)}")
-    
-    df_b_filtered = df_b[df_b['DEdeg'] > -30].copy()
-    print(f"  After DEdeg > -30°: {len(df_b_filtered)}")
-    
-    df_b_linear = df_b_filtered[df_b_filtered['LCType'] == 'Linear'].copy()
-    print(f"  Linear sources: {len(df_b_linear)}")
-    
-    output_b_linear = str(output_dir / 'PaperB_Linear.csv')
-    df_b_linear.to_csv(output_b_linear, index=False)
-    print(f"  ✓ Saved: PaperB_Linear.csv ({len(df_b_linear)} sources)")
-    
-    print("\n[PAPER C] Loading apjsadf4e6t4_mrt.txt...")
-    df_c = parse_paper_c(file_mapping['C'])
-    print(f"  Raw records: {len(df_c)}")
-    
-    output_c_all = str(output_dir / 'PaperC_AllSources.csv')
-    df_c.to_csv(output_c_all, index=False)
-    print(f"  ✓ Saved: PaperC_AllSources.csv ({len(df_c)} sources)")
+    # Each paper is streamed in batches, so memory is bounded by one batch
+    print("\n[PAPER A] Streaming apjadd25ft1_mrt.txt...")
+    summary_a = PAPER_A_PIPELINE.write_batches(iter_paper_a(file_mapping['A'], batch_size), output_dir, formats)
+    print(f"  Raw records: {summary_a.rows}")
+    print(f"  After DEdeg > -30°: {summary_a.base}")
+    
+    n_a_linear_plus = summary_a.subsets['PaperA_LinearPlus']
+    n_a_linear_minus = summary_a.subsets['PaperA_LinearMinus']
+    print(f"  Linear(+) sources: {n_a_linear_plus}")
+    print(f"  Linear(-) sources: {n_a_linear_minus}")
+    print(f"  ✓ Saved: PaperA_LinearPlus.csv ({n_a_linear_plus} sources)")
+    print(f"  ✓ Saved: PaperA_LinearMinus.csv ({n_a_linear_minus} sources)")
+    
+    print("\n[PAPER B] Streaming apjsadc397t2_mrt.txt...")
+    summary_b = PAPER_B_PIPELINE.write_batches(iter_paper_b(file_mapping['B'], batch_size), output_dir, formats)
+    print(f"  Raw records: {summary_b.rows}")
+    print(f"  After DEdeg > -30°: {summary_b.base}")
+    
+    n_b_linear = summary_b.subsets['PaperB_Linear']
+    print(f"  Linear sources: {n_b_linear}")
+    print(f"  ✓ Saved: PaperB_Linear.csv ({n_b_linear} sources)")
+    
+    print("\n[PAPER C] Streaming apjsadf4e6t4_mrt.txt...")
+    summary_c = PAPER_C_PIPELINE.write_batches(iter_paper_c(file_mapping['C'], batch_size), output_dir, formats)
+    n_c = summary_c.subsets['PaperC_AllSources']
+    print(f"  Raw records: {summary_c.rows}")
+    print(f"  ✓ Saved: PaperC_AllSources.csv ({n_c} sources)")
     
     print("\n" + "=" * 80)
     print("SUMMARY")
     print("=" * 80)
     print(f"Output directory: {output_dir}")
     print("\nCSVs generated:")
-    print(f"  • PaperA_LinearPlus.csv: {len(df_a_linear_plus)} sources")
-    print(f"  • PaperA_LinearMinus.csv: {len(df_a_linear_minus)} sources")
-    print(f"  • PaperB_Linear.csv: {len(df_b_linear)} sources")
-    print(f"  • PaperC_AllSources.csv: {len(df_c)} sources")
-    print(f"\nTotal sources for ZTF analysis: {len(df_a_linear_plus) + len(df_a_linear_minus) + len(df_b_linear) + len(df_c)}")
+    print(f"  • PaperA_LinearPlus.csv: {n_a_linear_plus} sources")
+    print(f"  • PaperA_LinearMinus.csv: {n_a_linear_minus} sources")
+    print(f"  • PaperB_Linear.csv: {n_b_linear} sources")
+    print(f"  • PaperC_AllSources.csv: {n_c} sources")
+    print(f"\nTotal sources for ZTF analysis: {n_a_linear_plus + n_a_linear_minus + n_b_linear + n_c}")
     
-    return {
-        'PaperA_LinearPlus': df_a_linear_plus,
-        'PaperA_LinearMinus': df_a_linear_minus,
-        'PaperB_Linear': df_b_linear,
-        'PaperC_AllSources': df_c
-    }
+    return {**summary_a.subsets, **summary_b.subsets, **summary_c.subsets}
 
 if __name__ == '__main__':
-    dfs = main()
+    parser = argparse.ArgumentParser(description='Filter Papers A/B/C into the culled source CSVs')
+    parser.add_argument('--binary', action='store_true',
+                        help='also write each subset in the columnar .ycol format')
+    parser.add_argument('--batch-size', type=int, default=10000,
+                        help='rows read per batch while streaming each paper (default: 10000)')
+    args = parser.parse_args()
+    counts = main(formats=('csv', 'ycol') if args.binary else ('csv',), batch_size=args.batch_size)
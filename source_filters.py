@@ -0,0 +1,235 @@
+"""
+Source Filter Pipeline
+======================
+
+Declarative selections for the phase 2 source tables:
+1. Predicates (declination cut, LCType / YSO_CLASS membership, magnitude
+   ranges, spectroscopy priority tiers) are small objects combined with
+   & | ~; building them touches no data
+2. A FilterPipeline holds a base predicate plus named output subsets
+3. Evaluation is one pass over the table: each column is converted to a
+   numpy array once, each distinct predicate is evaluated once into a
+   boolean array, and every subset is base & its predicate
+4. Rows are only copied when an output subset is finally taken
+
+Example:
+    pipeline = (FilterPipeline(dec_above(-30))
+                .subset('PaperA_LinearPlus', isin('LCType', ['Linear(+)']))
+                .subset('PaperA_LinearMinus', isin('LCType', ['Linear(-)'])))
+    subsets = pipeline.apply(df)
+"""
+
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from columnar_io import SUFFIX, write_columnar
+
+# Spectroscopy feasibility tiers by mean r magnitude (see ZTFAnalyzer.analyze_brightness)
+PRIORITY_TIERS = {
+    'HIGH': (-np.inf, 15.5),
+    'MEDIUM': (15.5, 16.5),
+    'LOW': (16.5, 17.0),
+    'TOO_FAINT': (17.0, np.inf),
+}
+
+
+class _Evaluation:
+    """Per-table cache of column arrays and predicate masks for one pass."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.df = df
+        self.columns = {}
+        self.masks = {}
+
+    def column(self, name):
+        if name not in self.columns:
+            self.columns[name] = self.df[name].to_numpy()
+        return self.columns[name]
+
+    def mask(self, predicate):
+        if predicate.key not in self.masks:
+            self.masks[predicate.key] = predicate._evaluate(self)
+        return self.masks[predicate.key]
+
+
+class Predicate:
+    """
+    A lazily evaluated row selection.
+
+    Predicates are identified by a key describing what they test, so the
+    same test appearing in several subsets is only evaluated once per pass.
+    """
+
+    def __init__(self, key, func):
+        self.key = key
+        self._func = func
+
+    def _evaluate(self, ev: _Evaluation) -> np.ndarray:
+        return self._func(ev)
+
+    def mask(self, df: pd.DataFrame) -> np.ndarray:
+        """Boolean array of the rows of df this predicate selects."""
+        return _Evaluation(df).mask(self)
+
+    def __and__(self, other):
+        return Predicate(('and', self.key, other.key), lambda ev: ev.mask(self) & ev.mask(other))
+
+    def __or__(self, other):
+        return Predicate(('or', self.key, other.key), lambda ev: ev.mask(self) | ev.mask(other))
+
+    def __invert__(self):
+        return Predicate(('not', self.key), lambda ev: ~ev.mask(self))
+
+    def __repr__(self):
+        return f'Predicate{self.key!r}'
+
+
+ALL = Predicate(('all',), lambda ev: np.ones(len(ev.df), dtype=bool))
+
+
+def dec_above(limit: float, col: str = 'DEdeg') -> Predicate:
+    """Sources north of `limit` degrees (e.g. the ZTF -30° declination limit)."""
+    return Predicate(('dec_above', col, limit), lambda ev: ev.column(col) > limit)
+
+
+def isin(col: str, values: Iterable) -> Predicate:
+    """Rows whose `col` is one of `values` (LCType, YSO_CLASS, ...)."""
+    values = tuple(values)
+    return Predicate(('isin', col, values),
+                     lambda ev: pd.Series(ev.column(col)).isin(values).to_numpy())
+
+
+def in_range(col: str, lower: Optional[float] = None, upper: Optional[float] = None) -> Predicate:
+    """lower <= col < upper; either bound may be omitted. NaN is never in range."""
+    def func(ev):
+        values = ev.column(col).astype(np.float64, copy=False)
+        mask = ~np.isnan(values)
+        if lower is not None:
+            mask &= values >= lower
+        if upper is not None:
+            mask &= values < upper
+        return mask
+    return Predicate(('in_range', col, lower, upper), func)
+
+
+def priority_tier(*tiers: str, col: str = 'r_mean') -> Predicate:
+    """
+    Sources in the given spectroscopy priority tiers (HIGH, MEDIUM, LOW,
+    TOO_FAINT by mean r magnitude, UNKNOWN where it is missing).
+    """
+    unknown = [tier for tier in tiers if tier not in PRIORITY_TIERS and tier != 'UNKNOWN']
+    if unknown:
+        raise ValueError(f"Unknown priority tier(s) {unknown}; expected {list(PRIORITY_TIERS)} or UNKNOWN")
+
+    def func(ev):
+        values = ev.column(col).astype(np.float64, copy=False)
+        mask = np.zeros(len(values), dtype=bool)
+        for tier in tiers:
+            if tier == 'UNKNOWN':
+                mask |= np.isnan(values)
+            else:
+                lower, upper = PRIORITY_TIERS[tier]
+                mask |= (values >= lower) & (values < upper)
+        return mask
+    return Predicate(('priority_tier', col, tiers), func)
+
+
+class FilterPipeline:
+    """
+    A base selection fanned out into named output subsets.
+
+    Args:
+        base: predicate every output must satisfy (default: all rows)
+    """
+
+    def __init__(self, base: Predicate = ALL):
+        self.base = base
+        self.subsets: List[Tuple[str, Predicate]] = []
+
+    def subset(self, name: str, predicate: Predicate = ALL) -> 'FilterPipeline':
+        """Add an output subset (base & predicate); returns self for chaining."""
+        self.subsets.append((name, predicate))
+        return self
+
+    def evaluate(self, df: pd.DataFrame) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+        """
+        Evaluate every predicate in one pass.
+
+        Returns:
+            (base mask, {subset name: mask})
+        """
+        ev = _Evaluation(df)
+        base = ev.mask(self.base)
+        return base, {name: base & ev.mask(predicate) for name, predicate in self.subsets}
+
+    def apply(self, df: pd.DataFrame) -> Dict[str, pd.DataFrame]:
+        """The rows of each output subset (the only copies made)."""
+        _, masks = self.evaluate(df)
+        return {name: df[mask] for name, mask in masks.items()}
+
+    def write(self, df: pd.DataFrame, output_dir) -> Dict[str, pd.DataFrame]:
+        """apply() and save each subset to {output_dir}/{name}.csv."""
+        subsets = self.apply(df)
+        for name, subset in subsets.items():
+            subset.to_csv(Path(output_dir) / f'{name}.csv', index=False)
+        return subsets
+
+    def write_batches(self, batches: Iterable[pd.DataFrame], output_dir,
+                      formats: Iterable[str] = ('csv',)) -> 'BatchSummary':
+        """
+        Filter a stream of table batches (e.g. from iter_mrt_batches) into
+        {output_dir}/{name}.csv and/or .ycol.
+
+        CSV rows are appended as each batch arrives, so memory stays bounded
+        by one batch. The columnar format is written whole, so its subset rows
+        are collected and written after the last batch (memory bounded by the
+        subset rather than the source table). When the stream is empty, the
+        subsets' existing output files are removed rather than left stale.
+
+        Args:
+            batches: DataFrames with the same columns
+            output_dir: directory for the subset files
+            formats: any of 'csv' and 'ycol' (as for columnar_io.save_table)
+
+        Returns:
+            BatchSummary of rows read, rows passing the base predicate and
+            rows written per subset
+        """
+        formats = tuple(formats)
+        unknown = [fmt for fmt in formats if fmt not in ('csv', 'ycol')]
+        if unknown:
+            raise ValueError(f"Unknown table format(s) {unknown}; expected 'csv' or 'ycol'")
+        paths = {name: Path(output_dir) / f'{name}.csv' for name, _ in self.subsets}
+        counts = {name: 0 for name in paths}
+        collected = {name: [] for name in paths}
+        rows = base_rows = 0
+        for i, batch in enumerate(batches):
+            base, masks = self.evaluate(batch)
+            rows += len(batch)
+            base_rows += int(base.sum())
+            for name, mask in masks.items():
+                subset = batch[mask]
+                if 'csv' in formats:
+                    # The first batch (re)creates the file and writes the header
+                    subset.to_csv(paths[name], mode='w' if i == 0 else 'a', header=i == 0, index=False)
+                if 'ycol' in formats:
+                    collected[name].append(subset)
+                counts[name] += len(subset)
+
+        for name, path in paths.items():
+            if collected[name]:
+                write_columnar(pd.concat(collected[name], ignore_index=True), path.with_suffix(SUFFIX))
+            elif rows == 0:
+                for fmt in formats:
+                    path.with_suffix('.csv' if fmt == 'csv' else SUFFIX).unlink(missing_ok=True)
+        return BatchSummary(rows, base_rows, counts)
+
+
+class BatchSummary(NamedTuple):
+    """Row counts of one FilterPipeline.write_batches run."""
+    rows: int                 # rows read from the stream
+    base: int                 # rows passing the base predicate
+    subsets: Dict[str, int]   # rows written per subset
@@ -0,0 +1,99 @@
+"""
+Tests for the columnar stage-output format.
+
+    python -m pytest -q test_columnar_io.py
+"""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar_io import load_table, read_columnar, read_schema, save_table, write_columnar
+
+
+@pytest.mark.parametrize('dtype, values', [
+    ('boolean', [True, None, False]),
+    ('Float64', [1.5, None, 2.25]),
+    ('Float32', [0.1, None, 2.0]),
+    ('Int64', [1, None, -3]),
+    ('Int8', [1, None, -3]),
+    ('UInt16', [1, None, 3]),
+])
+@pytest.mark.parametrize('mmap', [True, False])
+def test_nullable_columns_round_trip(tmp_path, dtype, values, mmap):
+    df = pd.DataFrame({'with_na': pd.array(values, dtype=dtype),
+                       'without_na': pd.array([v for v in values if v is not None] * 2, dtype=dtype)[:3]})
+    write_columnar(df, tmp_path / 'table.ycol')
+    pd.testing.assert_frame_equal(read_columnar(tmp_path / 'table.ycol', mmap=mmap), df)
+
+
+@pytest.fixture
+def stage_table():
+    return pd.DataFrame({
+        'Objname': ['J0001', None, 'J0003', 'J0001'],
+        'YSO_CLASS': pd.Series(['ClassI', np.nan, 'Flat', 'ClassI'], dtype=object),
+        'W2magMean': [8.45, 10.123, np.nan, 12.0],
+        'r_value': [0.1 + 0.2, 1.0, 2.0, 3.0],  # 0.30000000000000004 must not narrow
+        'Number': [1, 2, 3, 4],
+    })
+
+
+def test_strings_round_trip_with_missing_values(tmp_path, stage_table):
+    write_columnar(stage_table, tmp_path / 'table.ycol')
+    decoded = read_columnar(tmp_path / 'table.ycol', categorical=False, float64=True)
+    pd.testing.assert_frame_equal(decoded, stage_table)
+
+    categorical = read_columnar(tmp_path / 'table.ycol', categorical=True)
+    for name in ('Objname', 'YSO_CLASS'):
+        assert isinstance(categorical[name].dtype, pd.CategoricalDtype)
+        assert categorical[name].isna().tolist() == [False, True, False, False]
+        present = stage_table[name].notna()
+        assert categorical[name][present].tolist() == stage_table[name][present].tolist()
+    assert list(categorical['Objname'].cat.categories) == ['J0001', 'J0003']
+
+
+def test_float_narrowing(tmp_path, stage_table):
+    write_columnar(stage_table, tmp_path / 'table.ycol')
+    schema = {entry['name']: entry for entry in read_schema(tmp_path / 'table.ycol')['columns']}
+    assert schema['W2magMean']['narrowed'] and schema['W2magMean']['buffers'][0]['dtype'] == '<f4'
+    assert not schema['r_value']['narrowed'] and schema['r_value']['buffers'][0]['dtype'] == '<f8'
+
+    stored = read_columnar(tmp_path / 'table.ycol')
+    assert stored['W2magMean'].dtype == np.float32
+    assert stored['r_value'].tolist() == stage_table['r_value'].tolist()
+    widened = read_columnar(tmp_path / 'table.ycol', float64=True)
+    assert widened['W2magMean'].dtype == np.float64
+    np.testing.assert_array_equal(widened['W2magMean'], stage_table['W2magMean'])
+
+    write_columnar(stage_table, tmp_path / 'wide.ycol', narrow_floats=False)
+    pd.testing.assert_frame_equal(read_columnar(tmp_path / 'wide.ycol', categorical=False), stage_table)
+
+
+@pytest.mark.parametrize('mmap', [True, False])
+def test_datetime_columns_round_trip(tmp_path, mmap):
+    df = pd.DataFrame({
+        'naive': pd.date_range('2020-01-01', periods=3, freq='h'),
+        'aware': pd.date_range('2020-03-07', periods=3, freq='D', tz='US/Pacific'),  # spans a DST change
+        'seconds': pd.to_timedelta([1, 2, 3], unit='s'),
+        'with_nat': pd.to_datetime(['2021-01-01', None, '2021-01-03']),
+    })
+    write_columnar(df, tmp_path / 'times.ycol')
+    pd.testing.assert_frame_equal(read_columnar(tmp_path / 'times.ycol', mmap=mmap), df)
+
+
+def test_load_table_prefers_the_newer_file(tmp_path, stage_table):
+    csv, binary = save_table(stage_table, tmp_path / 'filtered_sources.csv', formats=('csv', 'ycol'))
+    assert isinstance(load_table(csv)['Objname'].dtype, pd.CategoricalDtype)
+
+    # A CSV rewritten after the columnar copy wins
+    stat = binary.stat()
+    os.utime(csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert not isinstance(load_table(csv)['Objname'].dtype, pd.CategoricalDtype)
+
+    binary.unlink()
+    pd.testing.assert_frame_equal(load_table(csv), pd.read_csv(csv))
+    csv.unlink()
+    save_table(stage_table, tmp_path / 'filtered_sources.csv', formats=('ycol',))
+    assert len(load_table(tmp_path / 'filtered_sources.csv', categorical=False)) == len(stage_table)
@@ -0,0 +1,149 @@
+"""
+Tests for the vectorized contingency-table statistics.
+
+    python -m pytest -q test_contingency_stats.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import chi2_contingency
+
+from contingency_stats import chi2_statistic, cramers_v_bootstrap, pairwise_effect_sizes, table_effect_sizes
+
+
+def drop_empty(table):
+    """The table pd.crosstab would have built: no all-zero rows or columns."""
+    return table[table.sum(axis=1) > 0][:, table.sum(axis=0) > 0]
+
+
+def random_tables(n_tables=200, seed=0):
+    rng = np.random.default_rng(seed)
+    tables = []
+    for _ in range(n_tables):
+        shape = rng.integers(2, 6, size=2)
+        table = rng.poisson(rng.uniform(0.5, 30), size=shape)
+        # Empty a row or a column now and then
+        if rng.random() < 0.3:
+            table[rng.integers(shape[0])] = 0
+        if rng.random() < 0.3:
+            table[:, rng.integers(shape[1])] = 0
+        tables.append(table)
+    return tables
+
+
+@pytest.mark.parametrize('correction', [True, False])
+def test_chi2_matches_scipy(correction):
+    checked = 0
+    for table in random_tables():
+        reduced = drop_empty(table)
+        chi2, dof = chi2_statistic(table, correction=correction)
+        if min(reduced.shape) < 2:
+            assert dof == 0
+            continue
+        expected = chi2_contingency(reduced, correction=correction)
+        np.testing.assert_allclose(chi2, expected[0], rtol=1e-10, atol=1e-12)
+        assert dof == expected[2]
+        checked += 1
+    assert checked > 100
+
+
+def test_chi2_of_stacked_tables():
+    tables = np.stack([np.pad(t, ((0, 5 - t.shape[0]), (0, 5 - t.shape[1])))
+                       for t in random_tables(50, seed=1)])
+    chi2, dof = chi2_statistic(tables)
+    assert chi2.shape == dof.shape == (50,)
+    for k, table in enumerate(tables):
+        single_chi2, single_dof = chi2_statistic(table)
+        assert chi2[k] == pytest.approx(single_chi2)
+        assert dof[k] == single_dof
+
+
+def correlated_columns(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    x = rng.choice(['a', 'b', 'c'], size=n)
+    y = np.where(rng.random(n) < 0.6, x, rng.choice(['a', 'b', 'c'], size=n))
+    return pd.Series(x), pd.Series(y)
+
+
+def test_bootstrap_is_reproducible():
+    x, y = correlated_columns()
+    assert cramers_v_bootstrap(x, y, n_boot=200, seed=7) == cramers_v_bootstrap(x, y, n_boot=200, seed=7)
+    assert cramers_v_bootstrap(x, y, n_boot=200, seed=7)[1] != cramers_v_bootstrap(x, y, n_boot=200, seed=8)[1]
+
+
+def test_bootstrap_interval_brackets_v():
+    x, y = correlated_columns()
+    v, (lower, upper) = cramers_v_bootstrap(x, y, n_boot=500)
+    table = pd.crosstab(x, y).to_numpy()
+    expected_v = np.sqrt(chi2_contingency(table)[0] / (table.sum() * (min(table.shape) - 1)))
+    assert v == pytest.approx(expected_v)
+    assert 0 <= lower < v < upper <= 1
+
+    _, (narrow_lower, narrow_upper) = cramers_v_bootstrap(x, y, n_boot=500, confidence=0.5)
+    assert lower <= narrow_lower < narrow_upper <= upper
+
+
+def test_bootstrap_of_degenerate_table():
+    assert cramers_v_bootstrap(pd.Series(['a'] * 10), pd.Series(['x', 'y'] * 5)) == (0, (0, 0))
+
+
+def crosstab_effect_sizes(x, y):
+    """The per-pair crosstab + chi2_contingency formulas pairwise_effect_sizes replaced."""
+    confusion_matrix = pd.crosstab(x, y)
+    n = confusion_matrix.sum().sum()
+    min_dim = min(confusion_matrix.shape) - 1
+    if min_dim == 0:
+        return {'cramers_v': 0.0, 'phi': 0.0}
+    chi2, p, dof, _ = chi2_contingency(confusion_matrix)
+    return {'chi2': chi2, 'p': p, 'dof': dof,
+            'cramers_v': np.sqrt(chi2 / (n * min_dim)), 'phi': np.sqrt(chi2 / n)}
+
+
+@pytest.fixture
+def categorical_frame():
+    rng = np.random.default_rng(5)
+    n = 600
+    base = rng.choice(['a', 'b', 'c', 'd'], size=n)
+    df = pd.DataFrame({
+        'base': base,
+        'linked': np.where(rng.random(n) < 0.5, base, rng.choice(['a', 'b', 'c', 'd'], size=n)),
+        'binary': rng.choice(['yes', 'no'], size=n),
+        'sparse': rng.choice(['p', 'q', 'r'], size=n, p=[0.9, 0.08, 0.02]),
+        'constant': np.full(n, 'k'),
+    })
+    # Missing values are dropped pairwise
+    df.loc[rng.random(n) < 0.1, 'linked'] = np.nan
+    df.loc[rng.random(n) < 0.2, 'binary'] = None
+    return df
+
+
+def test_pairwise_effect_sizes_match_crosstab(categorical_frame):
+    variables = list(categorical_frame.columns)
+    matrices = pairwise_effect_sizes(categorical_frame, variables)
+    for i, a in enumerate(variables):
+        for j, b in enumerate(variables):
+            if i == j:
+                assert matrices['cramers_v'].loc[a, b] == matrices['phi'].loc[a, b] == 1.0
+                assert np.isnan(matrices['chi2'].loc[a, b])
+                continue
+            expected = crosstab_effect_sizes(categorical_frame[a], categorical_frame[b])
+            for metric, value in expected.items():
+                assert matrices[metric].loc[a, b] == pytest.approx(value, rel=1e-10, abs=1e-12), (a, b, metric)
+    for metric in matrices:
+        np.testing.assert_array_equal(matrices[metric].to_numpy(), matrices[metric].to_numpy().T)
+
+
+def test_table_effect_sizes_bias_correction():
+    table = np.array([[30, 10, 5], [8, 25, 12], [0, 0, 0]])
+    stats = table_effect_sizes(table)
+    reduced = drop_empty(table)
+    n, (r, k) = reduced.sum(), reduced.shape
+    chi2, p, dof, _ = chi2_contingency(reduced)
+    assert (stats['chi2'], stats['p'], stats['dof']) == (pytest.approx(chi2), pytest.approx(p), dof)
+
+    # Bergsma (2013)
+    phi2 = max(0.0, chi2 / n - (k - 1) * (r - 1) / (n - 1))
+    r_corr, k_corr = r - (r - 1) ** 2 / (n - 1), k - (k - 1) ** 2 / (n - 1)
+    assert stats['cramers_v_corrected'] == pytest.approx(np.sqrt(phi2 / min(r_corr - 1, k_corr - 1)))
+    assert stats['cramers_v_corrected'] < stats['cramers_v']
@@ -0,0 +1,107 @@
+"""
+Tests for the KD-tree positional crossmatch, against brute-force haversine.
+
+    python -m pytest -q test_crossmatch.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from crossmatch import SkyIndex, crossmatch, crossmatch_tables
+
+RADIUS = 0.01  # degrees
+
+
+def haversine(ra1, dec1, ra2, dec2):
+    """Angular separation in degrees."""
+    ra1, dec1, ra2, dec2 = map(np.radians, (ra1, dec1, ra2, dec2))
+    a = np.sin((dec2 - dec1) / 2) ** 2 + np.cos(dec1) * np.cos(dec2) * np.sin((ra2 - ra1) / 2) ** 2
+    return np.degrees(2 * np.arcsin(np.sqrt(a)))
+
+
+def brute_force(ra1, dec1, ra2, dec2, radius):
+    sep = haversine(np.asarray(ra1)[:, None], np.asarray(dec1)[:, None],
+                    np.asarray(ra2)[None, :], np.asarray(dec2)[None, :])
+    i, j = np.nonzero(sep < radius)  # NaN compares False
+    order = np.lexsort((sep[i, j], i))
+    return i[order], j[order], sep[i, j][order]
+
+
+def clustered_catalogs(seed=0):
+    """Two catalogs around RA 0/360, both poles and an ordinary field, with some NaNs."""
+    rng = np.random.default_rng(seed)
+    centers = [(0.0, 10.0), (359.999, -20.0), (123.0, 89.998), (45.0, -89.999), (200.0, 30.0)]
+
+    def catalog(n_per_center):
+        ra, dec = [], []
+        for center_ra, center_dec in centers:
+            ra.append((center_ra + rng.normal(0, 0.01, n_per_center)) % 360)
+            dec.append(np.clip(center_dec + rng.normal(0, 0.005, n_per_center), -90, 90))
+        ra, dec = np.concatenate(ra), np.concatenate(dec)
+        ra[rng.random(len(ra)) < 0.05] = np.nan
+        dec[rng.random(len(dec)) < 0.05] = np.nan
+        return ra, dec
+
+    return catalog(40), catalog(60)
+
+
+def test_crossmatch_matches_brute_force():
+    (ra1, dec1), (ra2, dec2) = clustered_catalogs()
+    matches = crossmatch(ra1, dec1, ra2, dec2, RADIUS)
+    i, j, sep = brute_force(ra1, dec1, ra2, dec2, RADIUS)
+    assert len(matches) == len(i) > 0
+    np.testing.assert_array_equal(matches['idx1'], i)
+    # Sorted by separation within each idx1; compare pairs in (idx1, idx2) order
+    # so near-equal separations cannot swap places
+    same_query = np.diff(matches['idx1']) == 0
+    assert (np.diff(matches['sep_deg'])[same_query] >= 0).all()
+    actual = matches.sort_values(['idx1', 'idx2'])
+    order = np.lexsort((j, i))
+    np.testing.assert_array_equal(actual['idx2'], j[order])
+    np.testing.assert_allclose(actual['sep_deg'], sep[order], rtol=1e-7, atol=1e-9)
+
+
+def test_matches_cross_ra_zero_and_poles():
+    # Neighbours on opposite sides of RA 0/360, and across the pole in RA
+    ra1, dec1 = np.array([359.999, 10.0]), np.array([0.0, 89.999])
+    ra2, dec2 = np.array([0.001, 190.0]), np.array([0.0, 89.999])
+    matches = crossmatch(ra1, dec1, ra2, dec2, RADIUS)
+    assert matches[['idx1', 'idx2']].values.tolist() == [[0, 0], [1, 1]]
+    np.testing.assert_allclose(matches['sep_deg'], [0.002, 0.002], rtol=1e-6)
+
+
+def test_nearest_matches_brute_force():
+    (ra1, dec1), (ra2, dec2) = clustered_catalogs(seed=1)
+    rows, sep = SkyIndex(ra2, dec2).nearest(ra1, dec1, RADIUS)
+    all_sep = haversine(ra1[:, None], dec1[:, None], ra2[None, :], dec2[None, :])
+    all_sep = np.where(np.isnan(all_sep), np.inf, all_sep)
+    expected = np.where(all_sep.min(axis=1) < RADIUS, all_sep.argmin(axis=1), -1)
+    np.testing.assert_array_equal(rows, expected)
+    assert np.isnan(sep[expected < 0]).all()
+    np.testing.assert_allclose(sep[expected >= 0], all_sep.min(axis=1)[expected >= 0], rtol=1e-7)
+
+
+def test_empty_and_missing_inputs():
+    empty = np.array([])
+    ra, dec = np.array([10.0, np.nan]), np.array([5.0, 5.0])
+    assert crossmatch(empty, empty, ra, dec).empty
+    assert crossmatch(ra, dec, empty, empty).empty
+    assert crossmatch(ra, dec, [np.nan], [np.nan]).empty
+    rows, sep = SkyIndex(empty, empty).nearest(ra, dec)
+    assert rows.tolist() == [-1, -1] and np.isnan(sep).all()
+    rows, _ = SkyIndex(ra, dec).nearest(ra, dec)
+    assert rows.tolist() == [0, -1]
+
+
+@pytest.mark.parametrize('nearest_only', [False, True])
+def test_crossmatch_tables(nearest_only):
+    left = pd.DataFrame({'Objname': ['a', 'b', 'c'], 'RAdeg': [359.9995, 100.0, np.nan],
+                         'DEdeg': [0.0, -30.0, 0.0], 'flux': [1.0, 2.0, 3.0]})
+    right = pd.DataFrame({'Objname': ['x', 'y', 'z'], 'RAdeg': [0.0002, 359.9990, 100.0],
+                          'DEdeg': [0.0, 0.0, -30.5]})
+    joined = crossmatch_tables(left, right, radius=0.001, nearest_only=nearest_only)
+    pairs = list(zip(joined['Objname_1'], joined['Objname_2']))
+    assert pairs == ([('a', 'y')] if nearest_only else [('a', 'y'), ('a', 'x')])
+    assert list(joined.columns) == ['Objname_1', 'RAdeg_1', 'DEdeg_1', 'flux',
+                                    'Objname_2', 'RAdeg_2', 'DEdeg_2', 'sep_deg']
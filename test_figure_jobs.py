@@ -0,0 +1,128 @@
+"""
+Tests for the figure job runner and its incremental-build manifest.
+
+    python -m pytest -q test_figure_jobs.py
+"""
+
+import importlib
+import sys
+import textwrap
+
+import pytest
+
+from figure_jobs import FigureJob, FigureManifest, run_figure_jobs
+
+PLOTS_SOURCE = '''
+SCALE = 2
+
+
+def helper(value):
+    return value * SCALE
+
+
+def first_chart(path, value):
+    with open(path, 'w') as f:
+        f.write(str(helper(value)))
+
+
+def second_chart(path, value):
+    with open(path, 'w') as f:
+        f.write(str(value + {offset}))
+'''
+
+
+@pytest.fixture
+def plots_module(tmp_path, monkeypatch):
+    """A plotting module on disk whose source the tests can edit."""
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.setattr(sys, 'dont_write_bytecode', True)
+    path = tmp_path / 'fake_plots.py'
+
+    def load(source=PLOTS_SOURCE.format(offset=1)):
+        path.write_text(textwrap.dedent(source))
+        importlib.invalidate_caches()
+        if 'fake_plots' in sys.modules:
+            return importlib.reload(sys.modules['fake_plots'])
+        return importlib.import_module('fake_plots')
+
+    yield load
+    sys.modules.pop('fake_plots', None)
+
+
+def plot_jobs(module, out_dir):
+    return [FigureJob('first', module.first_chart, (str(out_dir / 'first.txt'), 1), output=str(out_dir / 'first.txt')),
+            FigureJob('second', module.second_chart, (str(out_dir / 'second.txt'), 1),
+                      output=str(out_dir / 'second.txt'))]
+
+
+def test_editing_one_function_rerenders_only_its_figure(tmp_path, plots_module):
+    manifest_path = tmp_path / 'manifest.json'
+    module = plots_module()
+    run_figure_jobs(plot_jobs(module, tmp_path), workers=1, report=False, manifest=FigureManifest(manifest_path))
+
+    module = plots_module(PLOTS_SOURCE.format(offset=100))
+    rendered = run_figure_jobs(plot_jobs(module, tmp_path), workers=1, report=False,
+                               manifest=FigureManifest(manifest_path))
+    assert [name for name, _ in rendered] == ['second']
+    assert (tmp_path / 'second.txt').read_text() == '101'
+
+
+def test_editing_a_helper_or_constant_rerenders_its_users(tmp_path, plots_module):
+    manifest_path = tmp_path / 'manifest.json'
+    module = plots_module()
+    run_figure_jobs(plot_jobs(module, tmp_path), workers=1, report=False, manifest=FigureManifest(manifest_path))
+
+    module = plots_module(PLOTS_SOURCE.format(offset=1).replace('SCALE = 2', 'SCALE = 3'))
+    rendered = run_figure_jobs(plot_jobs(module, tmp_path), workers=1, report=False,
+                               manifest=FigureManifest(manifest_path))
+    assert [name for name, _ in rendered] == ['first']
+    assert (tmp_path / 'first.txt').read_text() == '3'
+
+
+def write_value(path, value):
+    with open(path, 'w') as f:
+        f.write(str(value))
+
+
+def value_jobs(out_dir, first=1, second=2):
+    return [FigureJob('a', write_value, (str(out_dir / 'a.txt'),), {'value': first}, output=str(out_dir / 'a.txt')),
+            FigureJob('b', write_value, (str(out_dir / 'b.txt'),), {'value': second}, output=str(out_dir / 'b.txt'))]
+
+
+def rendered_names(out_dir, manifest_path, **kwargs):
+    timings = run_figure_jobs(value_jobs(out_dir, **kwargs), workers=1, report=False,
+                              manifest=FigureManifest(manifest_path))
+    return [name for name, _ in timings]
+
+
+def test_manifest_skips_current_figures(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    assert rendered_names(tmp_path, manifest_path) == ['a', 'b']
+    assert rendered_names(tmp_path, manifest_path) == []
+
+    # Changed kwargs re-render only their job
+    assert rendered_names(tmp_path, manifest_path, second=5) == ['b']
+    assert (tmp_path / 'b.txt').read_text() == '5'
+
+    # A missing output is re-rendered
+    (tmp_path / 'a.txt').unlink()
+    assert rendered_names(tmp_path, manifest_path, second=5) == ['a']
+    assert (tmp_path / 'a.txt').read_text() == '1'
+
+
+def test_force_and_jobs_without_output(tmp_path):
+    manifest_path = tmp_path / 'manifest.json'
+    rendered_names(tmp_path, manifest_path)
+    timings = run_figure_jobs(value_jobs(tmp_path), workers=1, report=False,
+                              manifest=FigureManifest(manifest_path), force=True)
+    assert [name for name, _ in timings] == ['a', 'b']
+
+    unnamed = FigureJob('c', write_value, (str(tmp_path / 'c.txt'), 3))
+    for _ in range(2):
+        assert run_figure_jobs([unnamed], workers=1, report=False, manifest=FigureManifest(manifest_path))[0][0] == 'c'
+
+
+def test_pool_renders_every_job(tmp_path):
+    timings = run_figure_jobs(value_jobs(tmp_path, first=7, second=8), workers=2, report=False)
+    assert [name for name, _ in timings] == ['a', 'b']
+    assert (tmp_path / 'a.txt').read_text() == '7' and (tmp_path / 'b.txt').read_text() == '8'
@@ -0,0 +1,71 @@
+"""
+Tests for the batched Lomb-Scargle period search.
+
+    python -m pytest -q test_period_search.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from period_search import frequency_grid, lomb_scargle_batch, period_search
+from ztf_synthetic import generate_survey, survey_periods
+
+
+def ragged_noise(n_sources=300, n_obs=40, baseline=500.0, seed=0):
+    rng = np.random.default_rng(seed)
+    times = np.sort(rng.uniform(0, baseline, (n_sources, n_obs)), axis=1).ravel()
+    values = rng.normal(0, 1, times.size)
+    return times, values, np.arange(n_sources + 1) * n_obs
+
+
+def test_recovers_injected_periods():
+    names = [f'SYN{i:04d}' for i in range(100)]
+    n_bootstrap = 20
+    result = period_search(generate_survey(names), 'r', frequency_grid(1000.0, min_period=5.0),
+                           n_bootstrap=n_bootstrap)
+    recovered = np.abs(result['period'] / survey_periods(names)['r'] - 1) < 0.02
+    # Misses are mostly low-amplitude sources, swamped by the fade and noise
+    assert recovered.mean() > 0.6
+    # A real signal beats (nearly) every permutation
+    assert result['fap'][recovered].median() == 1 / (n_bootstrap + 1)
+    assert (result['power'][recovered] > 0.3).all()
+
+
+def test_power_is_the_least_squares_sinusoid_fit():
+    times, values, offsets = ragged_noise(n_sources=3, n_obs=25, seed=1)
+    frequencies = np.linspace(0.01, 0.2, 400)
+    result = lomb_scargle_batch(times, values, offsets, frequencies)
+    for k in range(3):
+        t, y = times[offsets[k]:offsets[k + 1]], values[offsets[k]:offsets[k + 1]]
+        y = y - y.mean()
+        powers = []
+        for f in frequencies:
+            design = np.column_stack((np.cos(2 * np.pi * f * t), np.sin(2 * np.pi * f * t)))
+            residual = y - design @ np.linalg.lstsq(design, y, rcond=None)[0]
+            powers.append(1 - (residual @ residual) / (y @ y))
+        assert result['power'][k] == pytest.approx(max(powers), rel=1e-8)
+        assert result['frequency'][k] == frequencies[int(np.argmax(powers))]
+
+
+def test_fap_is_uniform_for_noise():
+    times, values, offsets = ragged_noise()
+    result = lomb_scargle_batch(times, values, offsets, frequency_grid(500.0, min_period=5.0), n_bootstrap=49)
+    assert 0.05 <= (result['fap'] <= 0.1).mean() <= 0.17
+    assert 0.4 <= result['fap'].mean() <= 0.6
+
+
+def test_results_do_not_depend_on_blocking():
+    names = [f'SYN{i:04d}' for i in range(30)]
+    lcs = generate_survey(names, seed=2)
+    frequencies = frequency_grid(1000.0, min_period=5.0)
+    one_block = period_search(lcs, 'g', frequencies, n_bootstrap=10, seed=3)
+    many_blocks = period_search(lcs, 'g', frequencies, n_bootstrap=10, seed=3, block_mb=1)
+    pd.testing.assert_frame_equal(one_block, many_blocks, rtol=1e-10)
+
+
+def test_short_light_curves_get_nan():
+    times = np.arange(7, dtype=float)
+    result = lomb_scargle_batch(times, np.sin(times), np.array([0, 3, 7]), np.linspace(0.05, 0.4, 50))
+    assert result['n_obs'].tolist() == [3, 4]
+    assert result[['period', 'power', 'fap']].isna().all().all()
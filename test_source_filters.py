@@ -0,0 +1,52 @@
+"""
+Tests for the filter pipeline's batch writer.
+
+    python -m pytest -q test_source_filters.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar_io import read_columnar
+from source_filters import FilterPipeline, dec_above, isin
+
+
+@pytest.fixture
+def table():
+    rng = np.random.default_rng(0)
+    n = 50
+    return pd.DataFrame({'Objname': [f'S{i}' for i in range(n)],
+                         'DEdeg': rng.uniform(-60, 60, n),
+                         'LCType': rng.choice(['Linear', 'Burst', 'Unknown'], n)})
+
+
+PIPELINE = FilterPipeline(dec_above(-30)).subset('Linear', isin('LCType', ['Linear'])).subset('North')
+
+
+def batches(df, size):
+    return (df.iloc[start:start + size] for start in range(0, len(df), size))
+
+
+def test_write_batches_matches_whole_table(table, tmp_path):
+    summary = PIPELINE.write_batches(batches(table, 8), tmp_path, formats=('csv', 'ycol'))
+    expected = PIPELINE.apply(table)
+    assert summary.rows == len(table)
+    assert summary.base == int((table['DEdeg'] > -30).sum())
+    for name, subset in expected.items():
+        assert summary.subsets[name] == len(subset)
+        pd.testing.assert_frame_equal(pd.read_csv(tmp_path / f'{name}.csv'), subset.reset_index(drop=True))
+        pd.testing.assert_frame_equal(read_columnar(tmp_path / f'{name}.ycol', categorical=False, float64=True),
+                                      subset.reset_index(drop=True))
+
+
+def test_empty_stream_removes_stale_outputs(table, tmp_path):
+    PIPELINE.write_batches(batches(table, 8), tmp_path, formats=('csv', 'ycol'))
+    summary = PIPELINE.write_batches(iter([]), tmp_path, formats=('csv', 'ycol'))
+    assert summary.rows == 0 and summary.subsets == {'Linear': 0, 'North': 0}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_unknown_format_is_rejected(table, tmp_path):
+    with pytest.raises(ValueError, match='parquet'):
+        PIPELINE.write_batches(batches(table, 8), tmp_path, formats=('parquet',))
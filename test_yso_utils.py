@@ -0,0 +1,214 @@
+"""
+Tests for the MRT readers and catalog cache in yso_utils.
+
+    python -m pytest -q test_yso_utils.py
+"""
+
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from yso_utils import (
+    CorrelationAccumulator, categorize_variability, compute_correlation_matrix, iter_mrt_batches,
+    load_cached_table, read_mrt_table, streaming_correlation_matrix
+)
+
+MRT_HEADER = """Title: Test table
+================================================================================
+Byte-by-byte Description of file: test_mrt.txt
+--------------------------------------------------------------------------------
+   Bytes Format Units Label   Explanations
+--------------------------------------------------------------------------------
+   1-  5 I5     ---   ID      Identifier
+   7- 12 A6     ---   Name    ?=--- Source name
+  14- 20 F7.3   mag   W2mag   ?=-9.999 W2 magnitude
+  22- 24 A3     ---   Flag    Quality flag
+--------------------------------------------------------------------------------
+"""
+
+
+@pytest.fixture
+def mrt_file(tmp_path):
+    rows = []
+    for i in range(25):
+        name = '---' if i % 4 == 1 else f'S{i}'
+        mag = '-9.999' if i % 5 == 2 else f'{10 + i * 0.1:.3f}'
+        rows.append(f'{i:5d} {name:<6} {mag:>7} {"AB"[i % 2]:<3}')
+    path = tmp_path / 'test_mrt.txt'
+    path.write_text(MRT_HEADER + '\n'.join(rows) + '\n')
+    return path
+
+
+@pytest.mark.parametrize('mask_null_values', [False, True])
+def test_batches_match_full_read(mrt_file, mask_null_values):
+    full = read_mrt_table(mrt_file, mask_null_values=mask_null_values)
+    batches = list(iter_mrt_batches(mrt_file, batch_size=7, mask_null_values=mask_null_values))
+    assert [len(batch) for batch in batches] == [7, 7, 7, 4]
+    pd.testing.assert_frame_equal(pd.concat(batches), full)
+
+
+def test_ragged_lines_match_padded_lines(mrt_file, tmp_path):
+    # Right-trimmed, CRLF-terminated and blank lines decode like padded ones
+    header, _, data = mrt_file.read_text().rpartition('-' * 80 + '\n')
+    lines = [line.rstrip() for line in data.splitlines()]
+    ragged = tmp_path / 'ragged_mrt.txt'
+    ragged.write_bytes((header + '-' * 80 + '\n' + '\r\n'.join(lines[:10]) + '\r\n\n   \n'
+                        + '\n'.join(lines[10:])).encode())
+    pd.testing.assert_frame_equal(read_mrt_table(ragged, mask_null_values=True),
+                                  read_mrt_table(mrt_file, mask_null_values=True))
+
+
+def test_string_nulls_are_masked(mrt_file):
+    df = read_mrt_table(mrt_file, mask_null_values=True)
+    assert df['Name'].isna().tolist() == [i % 4 == 1 for i in range(25)]
+    assert df['W2mag'].isna().tolist() == [i % 5 == 2 for i in range(25)]
+    assert df.loc[0, 'Name'] == 'S0'
+
+
+def test_cache_round_trips_string_nulls(mrt_file, tmp_path):
+    parse = functools.partial(read_mrt_table, mask_null_values=True)
+    first = load_cached_table(mrt_file, parse, cache_dir=tmp_path / 'cache', cache_key='masked')
+    cached = load_cached_table(mrt_file, parse, cache_dir=tmp_path / 'cache', cache_key='masked')
+    pd.testing.assert_frame_equal(cached, first)
+    assert cached['Name'].isna().sum() == first['Name'].isna().sum() > 0
+
+
+def test_cache_keys_separate_parsers(mrt_file, tmp_path):
+    cache = tmp_path / 'cache'
+    full = load_cached_table(mrt_file, read_mrt_table, cache_dir=cache)
+    names = load_cached_table(mrt_file, lambda p: read_mrt_table(p, ['Name']), cache_dir=cache, cache_key='names')
+    ids = load_cached_table(mrt_file, lambda p: read_mrt_table(p, ['ID']), cache_dir=cache, cache_key='ids')
+    assert list(full.columns) == ['ID', 'Name', 'W2mag', 'Flag']
+    assert list(names.columns) == ['Name']
+    assert list(ids.columns) == ['ID']
+    assert list(load_cached_table(mrt_file, read_mrt_table, cache_dir=cache).columns) == list(full.columns)
+
+
+def test_cache_round_trips_nullable_columns(mrt_file, tmp_path):
+    def parse(path):
+        df = read_mrt_table(path, mask_null_values=True)
+        return df.assign(
+            Bright=(df['W2mag'] < 11).astype('boolean').mask(df['W2mag'].isna()),
+            Count=pd.array([None if i % 3 == 0 else i for i in range(len(df))], dtype='Int64'),
+            Score=df['W2mag'].astype('Float64'),
+        )
+
+    first = load_cached_table(mrt_file, parse, cache_dir=tmp_path / 'cache', cache_key='nullable')
+    cached = load_cached_table(mrt_file, parse, cache_dir=tmp_path / 'cache', cache_key='nullable')
+    pd.testing.assert_frame_equal(cached, first)
+    assert cached['Bright'].isna().sum() == 5 and cached['Count'].isna().sum() == 9
+
+
+def test_cache_rebuilds_when_source_changes(mrt_file, tmp_path):
+    calls = []
+
+    def parse(path):
+        calls.append(path)
+        return read_mrt_table(path)
+
+    def load():
+        return load_cached_table(mrt_file, parse, cache_dir=tmp_path / 'cache', cache_key='counted')
+
+    assert len(load()) == 25 and len(calls) == 1
+    load()
+    assert len(calls) == 1
+
+    # Same content, new mtime
+    stat = os.stat(mrt_file)
+    os.utime(mrt_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+    pd.testing.assert_frame_equal(load(), read_mrt_table(mrt_file))
+    assert len(calls) == 2
+
+    # New size
+    with open(mrt_file, 'a') as f:
+        f.write(f'{25:5d} {"S25":<6} {"12.000":>7} {"B":<3}\n')
+    assert len(load()) == 26 and len(calls) == 3
+    assert len(load()) == 26 and len(calls) == 3
+
+
+@pytest.mark.parametrize('parser', [lambda p: read_mrt_table(p), functools.partial(read_mrt_table)])
+def test_cache_rejects_unnamed_parsers(mrt_file, tmp_path, parser):
+    with pytest.raises(ValueError, match='cache_key'):
+        load_cached_table(mrt_file, parser, cache_dir=tmp_path / 'cache')
+
+
+@pytest.fixture
+def numeric_frame():
+    rng = np.random.default_rng(11)
+    n = 1000
+    a = rng.normal(1e6, 5, n)  # large offset, small spread
+    df = pd.DataFrame({
+        'a': a,
+        'b': 0.3 * (a - 1e6) + rng.normal(0, 2, n),
+        'c': rng.exponential(50, n),
+        'd': -0.01 * rng.normal(0, 1, n) + 1e-3 * (a - 1e6),
+    })
+    for column, fraction in [('a', 0.05), ('b', 0.1), ('c', 0.2)]:
+        df.loc[rng.random(n) < fraction, column] = np.nan
+    return df
+
+
+def chunks_of(df, sizes=(1, 0, 137, 2, 300)):
+    """Uneven row chunks (including empty and single-row ones) covering df."""
+    start, k = 0, 0
+    while start < len(df):
+        stop = start + sizes[k % len(sizes)]
+        yield df.iloc[start:stop]
+        start, k = stop, k + 1
+
+
+def test_streaming_correlation_matches_full_table(numeric_frame):
+    columns = list(numeric_frame.columns)
+    pd.testing.assert_frame_equal(
+        streaming_correlation_matrix(chunks_of(numeric_frame), columns),
+        compute_correlation_matrix(numeric_frame, columns, standardize=True), rtol=1e-9)
+    pd.testing.assert_frame_equal(
+        streaming_correlation_matrix(chunks_of(numeric_frame), columns, pairwise=True),
+        numeric_frame.corr(), rtol=1e-9)
+
+
+@pytest.mark.parametrize('pairwise', [False, True])
+def test_correlation_accumulators_merge(numeric_frame, pairwise):
+    columns = list(numeric_frame.columns)
+    serial = CorrelationAccumulator(columns, pairwise)
+    for chunk in chunks_of(numeric_frame):
+        serial.update(chunk)
+    shards = [CorrelationAccumulator(columns, pairwise) for _ in range(3)]
+    for k, chunk in enumerate(chunks_of(numeric_frame)):
+        shards[k % 3].update(chunk)
+    merged = shards[2].merge(shards[0]).merge(shards[1]).merge(CorrelationAccumulator(columns, pairwise))
+    np.testing.assert_array_equal(merged.n, serial.n)
+    pd.testing.assert_frame_equal(merged.correlation(), serial.correlation(), rtol=1e-9)
+
+
+def test_correlation_of_too_few_rows():
+    df = pd.DataFrame({'x': [1.0, np.nan, 3.0], 'y': [2.0, 5.0, np.nan]})
+    corr = streaming_correlation_matrix([df], ['x', 'y'], pairwise=True)
+    assert np.isnan(corr.loc['x', 'y'])
+    assert corr.loc['x', 'x'] == pytest.approx(1.0)
+
+
+def test_categorize_variability_bin_edges():
+    df = pd.DataFrame({'delW2mag': [0.0, 0.1999, 0.2, 0.4999, 0.5, 2.0, np.nan, -0.1]},
+                      index=list('abcdefgh'))
+    labels = categorize_variability(df)
+    assert labels.tolist() == ['Low', 'Low', 'Medium', 'Medium', 'High', 'High', 'Unknown', 'Low']
+    assert list(labels.index) == list(df.index)
+    # Alphabetical, like the plain string labels crosstabs used to get
+    assert list(labels.cat.categories) == ['High', 'Low', 'Medium', 'Unknown']
+    assert list(pd.crosstab(labels, labels).columns) == ['High', 'Low', 'Medium', 'Unknown']
+
+
+def test_categorize_variability_drops_unused_categories():
+    labels = categorize_variability(pd.DataFrame({'delW2mag': [0.6, 0.1, 0.7]}))
+    assert list(labels.cat.categories) == ['High', 'Low']
+
+
+def test_categorize_variability_per_group_edges():
+    df = pd.DataFrame({'delW2mag': [0.3, 0.3, 0.3, 0.3], 'YSO_CLASS': ['ClassI', 'ClassII', 'Flat', 'ClassIII']})
+    edges = {'ClassI': (0.4, 0.8), 'ClassII': (0.1, 0.2), 'Flat': (0.2, 0.5)}
+    labels = categorize_variability(df, edges=edges, by='YSO_CLASS')
+    assert labels.tolist() == ['Low', 'High', 'Medium', 'Unknown']
@@ -0,0 +1,126 @@
+"""
+Tests for the vectorized light-curve analytics, against ZTFAnalyzer's
+per-source methods.
+
+    python -m pytest -q test_ztf_batch.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ztf_analysis import ZTFAnalyzer
+from ztf_batch import RaggedLightCurves, analyze_batch, batch_brightness, batch_color_evolution, batch_fading
+from ztf_synthetic import generate_survey
+
+
+def make_sources(n):
+    return [{'Objname': f'SRC{i:03d}', 'RAdeg': 10.0 + i, 'DEdeg': -5.0 + i / 10, 'YSO_CLASS': 'ClassII',
+             'W2magMean': 9.0 + i / 100} for i in range(n)]
+
+
+def sample_lightcurves(n=80):
+    """Synthetic curves plus edge cases: empty bands, 0-2 epochs, short baselines, no data."""
+    lcs = generate_survey([f'SRC{i:03d}' for i in range(n)], seed=5)
+    curves = [{key: np.array(values) for key, values in lcs.lightcurve(i).items()} for i in range(n)]
+
+    def keep(lc, band, count):
+        lc[band], lc[f'times_{band}'] = lc[band][:count], lc[f'times_{band}'][:count]
+
+    keep(curves[0], 'g', 0)             # no g epochs
+    keep(curves[1], 'r', 0)             # no r epochs
+    keep(curves[2], 'r', 1)             # one r epoch
+    keep(curves[3], 'g', 1)             # one g epoch
+    keep(curves[4], 'r', 2)             # too few for a fading fit, enough for color
+    keep(curves[5], 'g', 2)             # too few for color
+    keep(curves[6], 'r', 4)             # just below the fading cut
+    keep(curves[7], 'r', 5)             # just at it
+    for band in ('g', 'r'):             # baseline under 100 days
+        short = curves[8][f'times_{band}'] < curves[8][f'times_{band}'][0] + 60
+        curves[8][band], curves[8][f'times_{band}'] = curves[8][band][short], curves[8][f'times_{band}'][short]
+    curves[9] = None                    # no light curve at all
+    # Unsorted epochs
+    order = np.random.default_rng(0).permutation(len(curves[10]['r']))
+    curves[10]['r'], curves[10]['times_r'] = curves[10]['r'][order], curves[10]['times_r'][order]
+
+    return make_sources(n), curves
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    return ZTFAnalyzer(output_dir=tmp_path, use_synthetic_only=True)
+
+
+def assert_columns_match(actual, expected):
+    assert list(actual.columns) == list(expected.columns)
+    for name in expected.columns:
+        a, e = actual[name].to_numpy(), expected[name].to_numpy()
+        if e.dtype.kind == 'f':
+            np.testing.assert_allclose(a, e, rtol=1e-9, atol=1e-10, equal_nan=True, err_msg=name)
+        else:
+            assert a.tolist() == e.tolist(), name
+
+
+def test_analyze_batch_matches_per_source_loop(analyzer):
+    sources, curves = sample_lightcurves()
+    expected = pd.DataFrame([analyzer.analyze_source(s, lc) for s, lc in zip(sources, curves) if lc])
+    result = analyze_batch(sources, curves)
+    assert len(result) == len(sources) - 1
+    assert_columns_match(result, expected)
+
+
+def test_batch_metrics_match_per_source_methods(analyzer):
+    _, curves = sample_lightcurves()
+    curves = [lc for lc in curves if lc]
+    lcs = RaggedLightCurves.from_dicts(curves)
+
+    brightness = batch_brightness(lcs)
+    expected = pd.DataFrame([analyzer.analyze_brightness(lc) for lc in curves])
+    assert_columns_match(brightness, expected)
+
+    fading = batch_fading(lcs)
+    for i, lc in enumerate(curves):
+        single = analyzer.analyze_fading(lc, '')
+        assert fading['valid'][i] == (single is not None)
+        if single is not None:
+            assert fading['slope_mag_per_day'][i] == pytest.approx(single['slope_mag_per_day'], rel=1e-9, abs=1e-14)
+            assert fading['status'][i] == single['status']
+            assert fading['is_fading'][i] == single['is_fading']
+
+    color = batch_color_evolution(lcs)
+    assert color['valid'].sum() > 50 and (~color['valid']).sum() >= 4
+    for i, lc in enumerate(curves):
+        single = analyzer.analyze_color_evolution(lc)
+        assert color['valid'][i] == (single is not None)
+        if single is not None:
+            for key in ('mean_color_gr', 'color_slope_per_day', 'baseline_days'):
+                assert color[key][i] == pytest.approx(single[key], rel=1e-9, abs=1e-12), key
+            assert color['status'][i] == single['status']
+
+
+@pytest.mark.parametrize('workers', [2, 3])
+def test_parallel_matches_serial_synthetic(analyzer, workers):
+    sources, _ = sample_lightcurves(25)
+    expected = analyzer.analyze_sources(sources)
+    result = analyzer.analyze_sources_parallel(sources, workers=workers)
+    assert result['Objname'].tolist() == [s['Objname'] for s in sources]
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_parallel_matches_serial_given_lightcurves(analyzer):
+    sources, curves = sample_lightcurves(25)
+    expected = analyzer.analyze_sources(sources, curves)
+    result = analyzer.analyze_sources_parallel(sources, workers=4, lightcurves=curves)
+    assert len(result) == len(sources) - 1
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_parallel_with_fewer_sources_than_workers(analyzer):
+    sources = make_sources(3)
+    pd.testing.assert_frame_equal(analyzer.analyze_sources_parallel(sources, workers=8),
+                                  analyzer.analyze_sources(sources))
+    _, curves = sample_lightcurves()
+    pd.testing.assert_frame_equal(analyzer.analyze_sources_parallel(sources, workers=8, lightcurves=curves[:3]),
+                                  analyzer.analyze_sources(sources, curves[:3]))
+    pd.testing.assert_frame_equal(analyzer.analyze_sources_parallel(sources[:1], workers=8),
+                                  analyzer.analyze_sources(sources[:1]))
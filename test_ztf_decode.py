@@ -0,0 +1,85 @@
+"""
+Tests for ZTF light-curve response decoding.
+
+    python -m pytest -q test_ztf_decode.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ztf_decode import (FIELDS, POSITION_FIELDS, decode_csv, decode_ipac, decode_json, decode_response,
+                        quality_mask, to_lightcurve)
+from ztf_stub import observation_table, render
+
+
+@pytest.fixture
+def table():
+    """Two objects' epochs, with flagged and missing-magnitude rows."""
+    df = pd.concat([observation_table(83.8, -5.4, object_id=0),
+                    observation_table(83.81, -5.39, object_id=1)], ignore_index=True)
+    df.loc[[3, 10], 'catflags'] = [32768, 4]
+    df.loc[[5, 11], 'mag'] = np.nan
+    df.loc[7, 'magerr'] = 0.5
+    return df
+
+
+def assert_same_observations(actual, expected):
+    for name, a, e in zip(actual._fields, actual, expected):
+        if e is None:
+            assert a is None, name
+        elif e.dtype.kind == 'f':
+            np.testing.assert_array_equal(a, e, err_msg=name)
+        else:
+            assert a.tolist() == e.tolist(), name
+
+
+@pytest.mark.parametrize('positions', [False, True])
+def test_formats_decode_to_identical_observations(table, positions):
+    decoded = {fmt: decode_response(render(table, fmt)[1], positions=positions)
+               for fmt in ('CSV', 'IPAC_TABLE', 'JSON')}
+    assert decoded['CSV'].n_epochs == len(table)
+    np.testing.assert_array_equal(decoded['CSV'].mjd, table['mjd'].to_numpy())
+    np.testing.assert_array_equal(decoded['CSV'].mag, table['mag'].to_numpy())
+    assert decoded['CSV'].catflags.tolist() == table['catflags'].tolist()
+    assert decoded['CSV'].filtercode.tolist() == table['filtercode'].tolist()
+    if positions:
+        assert decoded['CSV'].oid.tolist() == table['oid'].tolist()
+    assert_same_observations(decoded['IPAC_TABLE'], decoded['CSV'])
+    assert_same_observations(decoded['JSON'], decoded['CSV'])
+
+
+def test_explicit_decoders_match_detection(table):
+    assert_same_observations(decode_csv(render(table, 'CSV')[1]), decode_response(render(table, 'CSV')[1]))
+    assert_same_observations(decode_ipac(render(table, 'IPAC_TABLE')[1]),
+                             decode_response(render(table, 'IPAC_TABLE')[1], fmt='ipac'))
+    assert_same_observations(decode_json(table.to_dict('records')), decode_response(render(table, 'JSON')[1]))
+    columns = {name: table[name].to_numpy() for name in FIELDS + POSITION_FIELDS}
+    assert_same_observations(decode_json(columns, FIELDS), decode_json(table.to_dict('records')))
+
+
+def test_quality_mask_drops_flagged_and_missing_rows(table):
+    obs = decode_response(render(table, 'IPAC_TABLE')[1])
+    good = quality_mask(obs)
+    assert np.flatnonzero(~good).tolist() == [3, 5, 10, 11]
+    assert np.flatnonzero(~quality_mask(obs, bad_flags=0x8000)).tolist() == [3, 5, 11]
+    assert np.flatnonzero(~quality_mask(obs, max_magerr=0.1)).tolist() == [3, 5, 7, 10, 11]
+
+
+def test_to_lightcurve_splits_bands_sorted_by_time(table):
+    shuffled = table.sample(frac=1, random_state=1)
+    lc = to_lightcurve(decode_response(render(shuffled, 'CSV')[1]))
+    good = table.drop(index=[3, 5, 10, 11])
+    for band in ('g', 'r'):
+        rows = good[good['filtercode'] == f'z{band}'].sort_values('mjd', kind='stable')
+        np.testing.assert_array_equal(lc[f'times_{band}'], rows['mjd'].to_numpy())
+        np.testing.assert_array_equal(lc[band], rows['mag'].to_numpy())
+        assert np.all(np.diff(lc[f'times_{band}']) >= 0)
+
+
+def test_empty_and_all_flagged_responses():
+    empty = observation_table(83.8, -5.4).iloc[:0]
+    for fmt in ('CSV', 'IPAC_TABLE', 'JSON'):
+        assert decode_response(render(empty, fmt)[1]).n_epochs == 0
+    flagged = observation_table(83.8, -5.4).assign(catflags=1)
+    assert to_lightcurve(decode_response(render(flagged, 'JSON')[1])) is None
@@ -0,0 +1,88 @@
+"""
+Tests for the concurrent ZTF fetcher, against ztf_stub.
+
+    python -m pytest -q test_ztf_fetch.py
+"""
+
+import time
+
+from ztf_fetch import ZTFFetcher
+from ztf_stub import StubServer
+
+LATENCY = 0.01
+
+
+def test_fetch_many_bounds_concurrency():
+    with StubServer(latency=0.05) as server:
+        fetcher = ZTFFetcher('token', base_url=server.url, max_workers=4)
+        results = fetcher.fetch_many([(10.0 + i, 5.0) for i in range(20)], progress=None)
+    assert all(result is not None for result in results)
+    assert server.requests_served == 20
+    assert 1 < server.max_in_flight <= 4
+
+
+def test_fetch_many_results_follow_positions():
+    with StubServer(latency=LATENCY, jitter=0.02) as server:
+        fetcher = ZTFFetcher('token', base_url=server.url, max_workers=8)
+        positions = [(10.0 + i, 5.0) for i in range(12)]
+        results = fetcher.fetch_many(positions, progress=None)
+        expected = [fetcher.fetch(ra, dec) for ra, dec in positions]
+    assert results == expected
+
+
+def test_fetch_many_reports_progress():
+    calls = []
+    with StubServer(latency=LATENCY) as server:
+        fetcher = ZTFFetcher('token', base_url=server.url, max_workers=3)
+        fetcher.fetch_many([(10.0 + i, 5.0) for i in range(7)],
+                           progress=lambda done, total: calls.append((done, total)))
+    assert calls == [(done, 7) for done in range(1, 8)]
+
+
+def test_fetch_retries_retryable_statuses():
+    with StubServer(latency=LATENCY, errors=(503, 429, 500)) as server:
+        fetcher = ZTFFetcher('token', base_url=server.url, backoff=0.01)
+        body = fetcher.fetch(10.0, 5.0)
+        assert body is not None and body.startswith(b'oid,')
+        assert server.requests_served == 4
+
+
+def test_fetch_gives_up_on_other_statuses():
+    with StubServer(latency=LATENCY, errors=(404,)) as server:
+        fetcher = ZTFFetcher('token', base_url=server.url, backoff=0.01)
+        assert fetcher.fetch(10.0, 5.0) is None
+        assert server.requests_served == 1
+
+
+def test_fetch_many_survives_a_failing_source():
+    # One worker, so the first source receives every injected error
+    with StubServer(latency=LATENCY, errors=(503,) * 4) as server:
+        fetcher = ZTFFetcher('token', base_url=server.url, max_workers=1, max_retries=3, backoff=0.01)
+        results = fetcher.fetch_many([(10.0, 5.0), (11.0, 5.0), (12.0, 5.0)], progress=None)
+    assert results[0] is None
+    assert all(result is not None for result in results[1:])
+
+
+def test_fetch_returns_none_on_connection_errors():
+    server = StubServer(latency=LATENCY).start()
+    url = server.url
+    server.stop()
+    fetcher = ZTFFetcher('token', base_url=url, max_retries=1, backoff=0.01, timeout=1)
+    assert fetcher.fetch_many([(10.0, 5.0), (11.0, 5.0)], progress=None) == [None, None]
+
+
+def test_fetch_honors_retry_after():
+    with StubServer(latency=LATENCY, errors=(429,), retry_after=0.3) as server:
+        fetcher = ZTFFetcher('token', base_url=server.url, backoff=0.01)
+        start = time.perf_counter()
+        assert fetcher.fetch(10.0, 5.0) is not None
+        assert time.perf_counter() - start >= 0.3
+        assert server.requests_served == 2
+
+
+def test_retry_after_is_capped():
+    with StubServer(latency=LATENCY, errors=(503,), retry_after=3600) as server:
+        fetcher = ZTFFetcher('token', base_url=server.url, backoff=0.01, max_retry_after=0.05)
+        start = time.perf_counter()
+        assert fetcher.fetch(10.0, 5.0) is not None
+        assert time.perf_counter() - start < 2
@@ -0,0 +1,81 @@
+"""
+Tests for incremental light-curve trends.
+
+    python -m pytest -q test_ztf_incremental.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from ztf_batch import BANDS, RaggedLightCurves, batch_fading, batch_paired_color_evolution
+from ztf_incremental import IncrementalTrends
+from ztf_synthetic import generate_survey
+
+NAMES = [f'src{i}' for i in range(200)]
+
+
+def window(lcs, start, stop):
+    """The epochs of every source with start <= t < stop."""
+    times, mags, offsets = {}, {}, {}
+    for band in BANDS:
+        keep = (lcs.times[band] >= start) & (lcs.times[band] < stop)
+        times[band], mags[band] = lcs.times[band][keep], lcs.mags[band][keep]
+        ids = lcs.segment_ids(band)[keep]
+        offsets[band] = np.concatenate(([0], np.cumsum(np.bincount(ids, minlength=lcs.n_sources))))
+    return RaggedLightCurves(times, mags, offsets)
+
+
+def nightly_updates(lcs, cuts=(58000, 58333, 58666, 59001)):
+    return [window(lcs, start, stop) for start, stop in zip(cuts[:-1], cuts[1:])]
+
+
+def assert_frames_close(actual, expected, columns):
+    for name in columns:
+        a, e = np.asarray(actual[name]), np.asarray(expected[name])
+        if a.dtype.kind == 'f':
+            np.testing.assert_allclose(a, e, rtol=1e-9, atol=1e-12, equal_nan=True, err_msg=name)
+        else:
+            np.testing.assert_array_equal(a, e, err_msg=name)
+
+
+def test_updates_match_full_refit():
+    lcs = generate_survey(NAMES, seed=3)
+    trends = IncrementalTrends()
+    for update in nightly_updates(lcs):
+        trends.update(NAMES, update)
+
+    assert_frames_close(trends.fading(), batch_fading(lcs),
+                        ['slope_mag_per_day', 'mag_change_1yr', 'is_fading', 'status', 'n_observations'])
+    color = batch_paired_color_evolution(lcs)
+    assert color['valid'].sum() > 100
+    assert_frames_close(trends.color_evolution(), color,
+                        ['mean_color_gr', 'color_slope_per_day', 'color_change_1yr',
+                         'is_significant_evolution', 'status', 'baseline_days', 'valid'])
+
+    summary = trends.summary()
+    assert list(summary.index) == NAMES
+    np.testing.assert_array_equal(summary['color_status'], color['status'])
+
+
+def test_merge_and_save_round_trip(tmp_path):
+    lcs = generate_survey(NAMES, seed=4)
+    first, second = nightly_updates(lcs, cuts=(58000, 58500, 59001))
+    serial = IncrementalTrends().update(NAMES, first).update(NAMES, second)
+
+    merged = IncrementalTrends().update(NAMES, first).merge(IncrementalTrends().update(NAMES, second))
+    pd.testing.assert_frame_equal(merged.summary(), serial.summary(), rtol=1e-9)
+
+    path = tmp_path / 'trends.npz'
+    merged.save(path)
+    pd.testing.assert_frame_equal(IncrementalTrends.load(path).summary(), serial.summary(), rtol=1e-9)
+
+
+def test_update_rejects_repeated_names():
+    lcs = generate_survey(NAMES[:3], seed=2)
+    trends = IncrementalTrends().update(NAMES[:2], [lcs.lightcurve(0), lcs.lightcurve(1)])
+    before = trends.summary()
+    with pytest.raises(ValueError, match='src1'):
+        trends.update(['src1', 'src2', 'src1'], [lcs.lightcurve(i) for i in range(3)])
+    assert len(trends) == 2
+    pd.testing.assert_frame_equal(trends.summary(), before)
@@ -0,0 +1,100 @@
+"""
+Tests for the pipelined ZTF analysis, against ztf_stub.
+
+    python -m pytest -q test_ztf_pipeline.py
+"""
+
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from columnar_io import load_table, save_table
+from ztf_analysis import SOURCE_FIELDS, ZTFAnalyzer, source_records
+from ztf_stub import StubServer
+
+LATENCY = 0.01
+
+
+def make_sources(n, spacing=0.01):
+    return [{'Objname': f'S{i}', 'RAdeg': 10 + i * spacing, 'DEdeg': 5.0,
+             'YSO_CLASS': 'ClassII', 'W2magMean': 10.0} for i in range(n)]
+
+
+@pytest.fixture
+def stub():
+    with StubServer(latency=LATENCY) as server:
+        yield server
+
+
+def test_pipelined_matches_analyze_sources(stub, tmp_path):
+    sources = make_sources(50)
+    analyzer = ZTFAnalyzer(output_dir=tmp_path, base_url=stub.url)
+    expected = analyzer.analyze_sources(sources)
+    assert len(expected) == len(sources)
+
+    pipelined = ZTFAnalyzer(output_dir=tmp_path, base_url=stub.url)
+    result = pipelined.analyze_sources_pipelined(sources, chunk_size=8, max_chunks_in_flight=2)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_pipelined_matches_analyze_sources_grouped(tmp_path):
+    # Clustered targets plus field stars, queried with shared cone searches
+    rng = np.random.default_rng(3)
+    ra = np.concatenate([10 + rng.normal(0, 0.002, 30), rng.uniform(20, 30, 10)])
+    dec = np.concatenate([5 + rng.normal(0, 0.002, 30), rng.uniform(-5, 5, 10)])
+    sources = [{'Objname': f'S{i}', 'RAdeg': r, 'DEdeg': d, 'YSO_CLASS': 'ClassII', 'W2magMean': 10.0}
+               for i, (r, d) in enumerate(zip(ra, dec))]
+    with StubServer(latency=LATENCY, catalog=(ra, dec)) as server:
+        expected = ZTFAnalyzer(output_dir=tmp_path, base_url=server.url).analyze_sources(sources)
+        served = server.requests_served
+        grouped = ZTFAnalyzer(output_dir=tmp_path, base_url=server.url, group_radius=0.01)
+        result = grouped.analyze_sources_pipelined(sources, chunk_size=8)
+        assert server.requests_served - served < len(sources)
+    pd.testing.assert_frame_equal(result, expected)
+
+
+def test_source_records_match_the_csv(tmp_path):
+    rng = np.random.default_rng(3)
+    df = pd.DataFrame(make_sources(40)).assign(
+        RAdeg=np.round(rng.uniform(0, 360, 40), 6), DEdeg=np.round(rng.uniform(-30, 60, 40), 6),
+        YSO_CLASS=rng.choice(['ClassI', 'Flat', 'ClassII'], 40), W2magMean=np.round(rng.uniform(6, 14, 40), 3),
+        extra=np.arange(40.0))
+    save_table(df, tmp_path / 'filtered_sources.csv', formats=('csv', 'ycol'))
+    loaded = load_table(tmp_path / 'filtered_sources.csv')
+    assert loaded['YSO_CLASS'].dtype == 'category' and loaded['W2magMean'].dtype == np.float32
+
+    records = source_records(loaded)
+    assert records == pd.read_csv(tmp_path / 'filtered_sources.csv')[list(SOURCE_FIELDS)].to_dict('records')
+    assert all(type(record['YSO_CLASS']) is str for record in records)
+
+
+def test_pipeline_backpressure(stub, tmp_path):
+    """A blocked analysis stage stops the read stage from submitting more requests."""
+    chunk_size, in_flight = 4, 1
+    sources = make_sources(100)
+    release = threading.Event()
+
+    def progress(done, total):
+        if done == 1:
+            release.wait(timeout=30)
+
+    analyzer = ZTFAnalyzer(output_dir=tmp_path, base_url=stub.url)
+    worker = threading.Thread(target=lambda: analyzer.analyze_sources_pipelined(
+        sources, chunk_size=chunk_size, max_chunks_in_flight=in_flight, progress=progress))
+    worker.start()
+    try:
+        # Let the read and decode stages run until the queues are full
+        time.sleep(1.0)
+        served = stub.requests_served
+        # Chunks held: analyzed, queued for analysis, being decoded, queued
+        # for decoding (max_chunks_in_flight) and being submitted
+        assert served <= (in_flight + 4) * chunk_size
+        time.sleep(0.3)
+        assert stub.requests_served == served
+    finally:
+        release.set()
+        worker.join()
+    assert stub.requests_served == len(sources)
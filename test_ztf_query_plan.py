@@ -0,0 +1,98 @@
+"""
+Tests for clustered ZTF query planning, against ztf_stub.
+
+    python -m pytest -q test_ztf_query_plan.py
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from crossmatch import ZTF_MATCH_RADIUS, chord_to_degrees, radec_to_unit
+from ztf_fetch import ZTFFetcher
+from ztf_query_plan import DEFAULT_GROUP_RADIUS, fetch_planned, plan_queries, split_response
+from ztf_stub import StubServer, observation_table, render
+
+LATENCY = 0.005
+
+
+def clustered_targets():
+    """A clump straddling RA 0/360, a clump at RA 50, an isolated target and a missing position."""
+    ra = np.concatenate([(np.arange(5) - 2) * 0.002 % 360, 50 + np.arange(4) * 0.002, [120.0, np.nan]])
+    dec = np.concatenate([np.full(5, 10.0), np.full(4, -20.0), [30.0, 0.0]])
+    return ra, dec
+
+
+def catalog_for(ra, dec):
+    """One object 1 arcsec from each target, plus an unrelated object inside the first clump's cone."""
+    finite = np.isfinite(ra)
+    return (np.append(ra[finite] + 1 / 3600, 0.0005), np.append(dec[finite], 10.003))
+
+
+def separation(ra1, dec1, ra2, dec2):
+    return chord_to_degrees(np.linalg.norm(radec_to_unit(ra1, dec1) - radec_to_unit(ra2, dec2), axis=-1))
+
+
+def test_plan_covers_finite_targets_once():
+    ra, dec = clustered_targets()
+    groups = plan_queries(ra, dec)
+    members = np.concatenate([group.members for group in groups])
+    assert sorted(members.tolist()) == list(range(10))
+    assert [group.members[0] for group in groups] == sorted(group.members[0] for group in groups)
+    for group in groups:
+        offsets = separation(ra[group.members], dec[group.members], [group.ra], [group.dec])
+        assert np.all(offsets + ZTF_MATCH_RADIUS <= group.radius)
+        assert group.radius <= DEFAULT_GROUP_RADIUS + 1e-6
+
+
+def test_plan_groups_cluster_across_ra_wrap():
+    ra, dec = clustered_targets()
+    groups = plan_queries(ra, dec)
+    wrap = next(group for group in groups if 0 in group.members)
+    assert wrap.members.tolist() == [0, 1, 2, 3, 4]
+    assert min(wrap.ra, 360 - wrap.ra) < 0.001
+    assert wrap.radius < 0.006
+
+
+def test_plan_singleton_keeps_its_own_cone():
+    ra, dec = clustered_targets()
+    singleton = next(group for group in plan_queries(ra, dec) if 9 in group.members)
+    assert singleton.members.tolist() == [9]
+    assert (singleton.ra, singleton.dec, singleton.radius) == (120.0, 30.0, ZTF_MATCH_RADIUS)
+    assert all(len(group.members) == 1 for group in plan_queries(ra, dec, max_radius=None))
+
+
+def test_split_response_assigns_objects_by_position():
+    df = pd.concat([observation_table(10.0, 5.0, object_id=0),
+                    observation_table(10.003, 5.0, object_id=1)], ignore_index=True)
+    lcs = split_response(render(df, 'CSV')[1], [10.0, 10.003, 10.006], [5.0, 5.0, 5.0])
+    assert lcs[2] is None
+    for lc, oid in zip(lcs, (1, 3)):
+        own = df[(df['oid'] == oid)]
+        np.testing.assert_array_equal(lc['g'], own['mag'].to_numpy())
+    assert split_response(b'', [10.0], [5.0]) == [None]
+
+
+def assert_same_lightcurves(actual, expected):
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert (a is None) == (e is None)
+        if e is not None:
+            assert a.keys() == e.keys()
+            for key in e:
+                np.testing.assert_array_equal(a[key], e[key], err_msg=key)
+
+
+@pytest.mark.parametrize('fmt', ['CSV', 'IPAC_TABLE', 'JSON'])
+def test_fetch_planned_matches_per_target_queries(fmt):
+    ra, dec = clustered_targets()
+    with StubServer(latency=LATENCY, catalog=catalog_for(ra, dec)) as server:
+        fetcher = ZTFFetcher('token', base_url=server.url, max_workers=4, response_format=fmt)
+        expected, expected_fetched = fetch_planned(fetcher, ra, dec, max_radius=None, progress=None)
+        separate = server.requests_served
+        result, fetched = fetch_planned(fetcher, ra, dec, progress=None)
+        grouped = server.requests_served - separate
+    assert separate == 10 and grouped == 3
+    assert fetched.tolist() == expected_fetched.tolist() == [True] * 10 + [False]
+    assert sum(lc is not None for lc in result) == 10
+    assert_same_lightcurves(result, expected)
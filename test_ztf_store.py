@@ -0,0 +1,131 @@
+"""
+Tests for the persistent light-curve store.
+
+    python -m pytest -q test_ztf_store.py
+"""
+
+import numpy as np
+import pytest
+
+import ztf_store
+from ztf_store import LightCurveStore
+
+DAY = 86400.0
+ENTRY_BYTES = 4 * 10 * 8  # lightcurve(10)
+
+
+def lightcurve(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {'times_g': np.arange(n, dtype=float), 'g': rng.normal(15, 0.1, n),
+            'times_r': np.arange(n, dtype=float), 'r': rng.normal(14, 0.1, n)}
+
+
+class Clock:
+    def __init__(self, now=1.7e9):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(ztf_store.time, 'time', clock)
+    return clock
+
+
+def test_put_many_get_many_round_trip(tmp_path):
+    store = LightCurveStore(tmp_path / 'lc.sqlite')
+    curves = [lightcurve(5, seed) for seed in range(3)]
+    store.put_many([(10.0 + k, 5.0, 0.0014, lc) for k, lc in enumerate(curves)] + [(20.0, 5.0, 0.0014, None)])
+    found = store.get_many([(11.0, 5.0, 0.0014), (30.0, 5.0, 0.0014), (20.0, 5.0, 0.0014), (10.0, 5.0, 0.0014)])
+    np.testing.assert_array_equal(found[0]['r'], curves[1]['r'])
+    assert found[1] is None
+    assert all(len(values) == 0 for values in found[2].values())
+    np.testing.assert_array_equal(found[3]['g'], curves[0]['g'])
+    assert store.get(12.0, 5.0, 0.0014)['g'].tolist() == curves[2]['g'].tolist()
+
+
+def test_buffered_puts_survive_close(tmp_path):
+    path = tmp_path / 'lc.sqlite'
+    store = LightCurveStore(path, commit_every=1000)
+    for k in range(10):
+        store.put(10.0 + k, 5.0, 0.0014, lightcurve(3, k))
+    store.close()
+    reopened = LightCurveStore(path)
+    assert len(reopened) == 10
+    assert reopened.get(19.0, 5.0, 0.0014) is not None
+
+
+def test_eviction_keeps_recently_used(tmp_path):
+    store = LightCurveStore(tmp_path / 'lc.sqlite', max_bytes=3 * ENTRY_BYTES)
+    store.put_many([(10.0 + k, 5.0, 0.0014, lightcurve(10, k)) for k in range(3)])
+    assert store.get(10.0, 5.0, 0.0014) is not None  # most recently used now
+    store.put(20.0, 5.0, 0.0014, lightcurve(10, 9))
+    assert len(store) == 3
+    assert store.get(11.0, 5.0, 0.0014) is None
+    assert store.get(10.0, 5.0, 0.0014) is not None
+    # Replacing an entry does not count its old payload twice
+    store.put(20.0, 5.0, 0.0014, lightcurve(10, 8))
+    assert len(store) == 3
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    store = LightCurveStore(tmp_path / 'lc.sqlite', ttl_days=30)
+    store.put(10.0, 5.0, 0.0014, lightcurve(5))
+    clock.advance(10 * DAY)
+    store.put(11.0, 5.0, 0.0014, lightcurve(5, 1))
+    clock.advance(20 * DAY)
+    assert store.get(10.0, 5.0, 0.0014) is not None  # exactly ttl_days old
+    clock.advance(1)
+    assert store.get_many([(10.0, 5.0, 0.0014), (11.0, 5.0, 0.0014)])[0] is None
+    assert store.get(11.0, 5.0, 0.0014) is not None
+    # Reading does not extend the TTL; refetching does
+    clock.advance(20 * DAY)
+    assert store.get(11.0, 5.0, 0.0014) is None
+    store.put(11.0, 5.0, 0.0014, lightcurve(5, 2))
+    assert store.get(11.0, 5.0, 0.0014)['g'].tolist() == lightcurve(5, 2)['g'].tolist()
+
+
+def test_entries_never_expire_without_ttl(tmp_path, clock):
+    store = LightCurveStore(tmp_path / 'lc.sqlite', ttl_days=None)
+    store.put(10.0, 5.0, 0.0014, lightcurve(5))
+    clock.advance(3650 * DAY)
+    assert store.get(10.0, 5.0, 0.0014) is not None
+
+
+def test_eviction_follows_read_order(tmp_path, clock):
+    store = LightCurveStore(tmp_path / 'lc.sqlite', max_bytes=4 * ENTRY_BYTES, ttl_days=None)
+    for k in range(4):
+        store.put(10.0 + k, 5.0, 0.0014, lightcurve(10, k))
+        clock.advance(1)
+    # Read order, oldest first: 12, 10, 13; 11 is never read after its put
+    for k in (2, 0, 3):
+        assert store.get(10.0 + k, 5.0, 0.0014) is not None
+        clock.advance(1)
+
+    store.put(20.0, 5.0, 0.0014, lightcurve(10, 9))
+    assert sorted(store.positions()[1].tolist()) == [10.0, 12.0, 13.0, 20.0]
+    clock.advance(1)
+    assert store.get(12.0, 5.0, 0.0014) is not None
+    clock.advance(1)
+    store.put_many([(21.0, 5.0, 0.0014, lightcurve(10, 8)), (22.0, 5.0, 0.0014, lightcurve(10, 7))])
+    assert sorted(store.positions()[1].tolist()) == [12.0, 20.0, 21.0, 22.0]
+
+
+def test_eviction_uses_access_times_from_earlier_sessions(tmp_path, clock):
+    path = tmp_path / 'lc.sqlite'
+    store = LightCurveStore(path, max_bytes=3 * ENTRY_BYTES, ttl_days=None, commit_every=1000)
+    store.put_many([(10.0 + k, 5.0, 0.0014, lightcurve(10, k)) for k in range(3)])
+    clock.advance(1)
+    store.get(10.0, 5.0, 0.0014)  # buffered access time, written on close
+    store.close()
+
+    clock.advance(1)
+    reopened = LightCurveStore(path, max_bytes=3 * ENTRY_BYTES, ttl_days=None)
+    reopened.put(20.0, 5.0, 0.0014, lightcurve(10, 9))
+    assert sorted(reopened.positions()[1].tolist()) == [10.0, 12.0, 20.0]
@@ -5,7 +5,7 @@ Comprehensive Data Verification and Analysis Correctness Check
 
 import pandas as pd
 import numpy as np
-from yso_utils import parse_mrt_file, compute_correlation_matrix, categorize_variability
+from yso_utils import load_cached_table, compute_correlation_matrix, categorize_variability
 
 def verify_data_integrity():
     """Verify data loading and completeness"""
@@ -13,7 +13,7 @@ def verify_data_integrity():
     print("1. DATA INTEGRITY VERIFICATION")
     print("="*70)
     
-    df = parse_mrt_file('paper_data_files/apjsadc397t2_mrt.txt')
+    df = load_cached_table('paper_data_files/apjsadc397t2_mrt.txt')
     df['Variability'] = categorize_variability(df, 'delW2mag')
     
     # Check counts
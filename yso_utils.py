@@ -1,46 +1,388 @@
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import warnings
 import pandas as pd
 import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
 from pathlib import Path
-from typing import List
+from typing import Callable, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from columnar_io import MASKED_ARRAYS
+
+class MRTColumn(NamedTuple):
+    """One entry of an MRT "Byte-by-byte Description" block."""
+    start: int          # 0-based, inclusive
+    end: int            # 0-based, exclusive
+    fmt: str            # Fortran-style format, e.g. 'F6.3', 'I10', 'A19'
+    units: str
+    label: str
+    null_value: Optional[str] = None
+
+_MRT_SPEC_LINE = re.compile(
+    r'^\s*(\d+)(?:\s*-\s*(\d+))?\s+([AIFED]\d+(?:\.\d+)?)\s+(\S+)\s+(\S+)\s*(.*)$'
+)
+_MRT_NULL = re.compile(r'^\?=(\S+)')
+
+def read_mrt_header(filepath: str) -> Tuple[List[MRTColumn], int]:
+    """
+    Parse the "Byte-by-byte Description" block of an MRT file.
+
+    Returns:
+        (columns, data_offset) where data_offset is the byte offset of the first
+        data record, i.e. just past the last '-----' separator of the header.
+    """
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    return _parse_mrt_header(raw)
+
+def _parse_mrt_header(raw: bytes) -> Tuple[List[MRTColumn], int]:
+    # Notes may follow the column block; data starts after the last separator
+    # line. Separators are all-dash lines, which a data record can never be.
+    last_separator = raw.rfind(b'\n' + b'-' * 10)
+    data_offset = raw.index(b'\n', last_separator + 1) + 1 if last_separator >= 0 else 0
+
+    columns = []
+    in_block = False
+    for line in raw[:data_offset].decode('latin-1').splitlines():
+        text = line.rstrip()
+        if text.startswith('Byte-by-byte Description'):
+            in_block = True
+            continue
+        if not in_block:
+            continue
+        match = _MRT_SPEC_LINE.match(text)
+        if match:
+            first, last, fmt, units, label, explanation = match.groups()
+            last = last or first
+            null = _MRT_NULL.match(explanation.strip())
+            columns.append(MRTColumn(int(first) - 1, int(last), fmt, units, label,
+                                     null.group(1) if null else None))
+        elif columns and text.startswith('-----'):
+            # First separator after the column specs closes the block
+            break
+
+    if not columns:
+        raise ValueError("No 'Byte-by-byte Description' block found")
+    return columns, data_offset
+
+def fixed_width_records(data: bytes, width: int) -> np.ndarray:
+    """View newline-separated records as an (n_rows, width) uint8 array."""
+    if not data.endswith(b'\n'):
+        data += b'\n'
+    line_length = data.index(b'\n')
+    n_rows, remainder = divmod(len(data), line_length + 1)
+    if (line_length >= width and not remainder
+            and data[line_length::line_length + 1] == b'\n' * n_rows):
+        # Every line has the same length, at least `width` bytes: view the buffer as is
+        return np.frombuffer(data, dtype=np.uint8).reshape(n_rows, line_length + 1)[:, :width]
+
+    # Right-trimmed lines are padded back to the full record width: each
+    # record is copied as a `width`-byte window starting at its line offset
+    # (one row gather), then the bytes past the end of short lines are blanked,
+    # so every column becomes a fixed byte slice of one contiguous buffer.
+    buf = np.frombuffer(data + b' ' * width, dtype=np.uint8)
+    ends = np.flatnonzero(buf == ord('\n'))
+    starts = np.concatenate(([0], ends[:-1] + 1))
+    lengths = ends - starts
+    lengths -= (lengths > 0) & (buf[ends - 1] == ord('\r'))
+
+    # Drop blank lines (no byte above the space character)
+    keep = np.logical_or.reduceat(buf[:len(data)] > ord(' '), starts)
+    starts, lengths = starts[keep], lengths[keep]
+
+    records = sliding_window_view(buf, width)[starts]
+    short = np.flatnonzero(lengths < width)
+    if len(short):
+        padded = records[short]
+        padded[np.arange(width) >= lengths[short, None]] = ord(' ')
+        records[short] = padded
+    return records
+
+# numpy >= 2 strips with a ufunc; np.char also costs a multi-ms import on first use
+_strip = np.strings.strip if hasattr(np, 'strings') else np.char.strip
+
+def decode_column(block: np.ndarray, column: MRTColumn, mask_null_values: bool):
+    """Decode one fixed-width byte slice into a typed array."""
+    width = column.end - column.start
+    raw = np.ascontiguousarray(block).view(f'S{width}').ravel()
+    kind = column.fmt[0]
+
+    if kind == 'A':
+        values = _strip(raw).astype(f'U{width}')
+        if mask_null_values and column.null_value is not None:
+            # A plain array, so batches keep the index their frame is built on
+            values = values.astype(object)
+            values[values == column.null_value] = np.nan
+        return values
+
+    dtype = np.int64 if kind == 'I' else np.float64
+    if not (mask_null_values and column.null_value is not None):
+        try:
+            # Fast path: fully populated column, one C-level conversion
+            return raw.astype(dtype)
+        except ValueError:
+            pass
+
+    missing = (block == ord(' ')).all(axis=1) | (block == ord('?')).any(axis=1)
+    if mask_null_values and column.null_value is not None:
+        missing |= _strip(raw) == column.null_value.encode()
+
+    try:
+        values = np.where(missing, b'nan', raw).astype(np.float64)
+    except ValueError:
+        values = pd.to_numeric(pd.Series(raw.astype(f'U{width}')),
+                               errors='coerce').to_numpy(dtype=np.float64, copy=True)
+        values[missing] = np.nan
+    if kind == 'I':
+        return pd.array(values, dtype='Int64')
+    return values
+
+def read_mrt_table(filepath: str, columns: List[str] = None,
+                   mask_null_values: bool = False) -> pd.DataFrame:
+    """
+    Read an MRT table in one columnar pass using its byte-by-byte header.
+
+    The data section is loaded as a fixed-width byte matrix and every column is
+    decoded with a single vectorized conversion, typed from its Fortran format
+    (A -> str, I -> int64, F/E/D -> float64). Blank or '?' fields become NaN.
+
+    Args:
+        filepath: Path to the MRT text file
+        columns: Labels to decode, in order. Labels absent from the header are
+                 skipped. If None, decodes every column in the header
+        mask_null_values: If True, also map declared '?=<value>' sentinels to NaN
+    """
+    with open(filepath, 'rb') as f:
+        raw = f.read()
+    return _read_mrt_bytes(raw, columns, mask_null_values)
+
+def _read_mrt_bytes(raw: bytes, columns: Optional[List[str]], mask_null_values: bool) -> pd.DataFrame:
+    specs, data_offset = _parse_mrt_header(raw)
+    if columns is not None:
+        by_label = {spec.label: spec for spec in specs}
+        specs = [by_label[label] for label in columns if label in by_label]
+
+    width = max(spec.end for spec in specs)
+    records = fixed_width_records(raw[data_offset:], width)
+    return pd.DataFrame({
+        spec.label: decode_column(records[:, spec.start:spec.end], spec, mask_null_values)
+        for spec in specs
+    })
+
+def _read_mrt_header_stream(f) -> List[MRTColumn]:
+    """
+    Read the header of an open binary MRT file, leaving f at the first data
+    record.
+
+    The header ends at the separator closing the byte-by-byte block or, when
+    "Note (n):" sections follow it, at the separator closing the last note.
+    """
+    header = []
+    in_block = False
+    seen_spec = False
+    while True:
+        line = f.readline()
+        if not line:
+            raise ValueError("MRT file ends before its data section")
+        header.append(line)
+        if line.startswith(b'Byte-by-byte Description'):
+            in_block = True
+        elif in_block and _MRT_SPEC_LINE.match(line.decode('latin-1').rstrip()):
+            seen_spec = True
+        elif seen_spec and line.startswith(b'-' * 10):
+            # First separator after the column specs closes the block
+            break
+
+    while True:
+        position = f.tell()
+        line = f.readline()
+        if not line.startswith(b'Note'):
+            f.seek(position)
+            break
+        header.append(line)
+        while line and not line.startswith(b'-' * 10):
+            line = f.readline()
+            header.append(line)
+
+    columns, _ = _parse_mrt_header(b''.join(header))
+    return columns
+
+def iter_mrt_batches(filepath: str, columns: List[str] = None, batch_size: int = 10000,
+                     mask_null_values: bool = False) -> Iterator[pd.DataFrame]:
+    """
+    Stream an MRT table as DataFrame batches of at most batch_size rows.
+
+    Reads record lines straight from the file handle, so memory is bounded by
+    one batch rather than the file. Columns are typed as in read_mrt_table,
+    and batch indexes continue from one batch to the next, so concatenating
+    the batches gives the same frame as read_mrt_table (an integer column is
+    Int64 in the batches where it has missing values).
+    """
+    with open(filepath, 'rb') as f:
+        specs = _read_mrt_header_stream(f)
+        if columns is not None:
+            by_label = {spec.label: spec for spec in specs}
+            specs = [by_label[label] for label in columns if label in by_label]
+        width = max(spec.end for spec in specs)
+
+        start = 0
+        while True:
+            lines = []
+            for line in f:
+                if line.strip():
+                    lines.append(line)
+                    if len(lines) == batch_size:
+                        break
+            if not lines:
+                return
+            records = fixed_width_records(b''.join(lines), width)
+            yield pd.DataFrame({
+                spec.label: decode_column(records[:, spec.start:spec.end], spec, mask_null_values)
+                for spec in specs
+            }, index=pd.RangeIndex(start, start + len(lines)))
+            start += len(lines)
+
+PAPER_B_COLUMNS = [
+    'Objname', 'RAdeg', 'DEdeg', 'SED_SLOPE', 'YSO_CLASS', 'Number',
+    'W2magMean', 'W2magMed', 'sig_W2Flux', 'err_W2Flux', 'delW2mag',
+    'Period', 'FLP_LSP_BOOT', 'slope', 'e_slope', 'r_value', 'LCType'
+]
 
 def parse_mrt_file(filepath: str) -> pd.DataFrame:
     """
     Parse MRT table format for different paper sources.
-    Handles Papers B & C format (Tab-separated with J/L prefixed objects).
+    Handles Papers B & C format (J/L prefixed objects), returning the Paper B
+    columns that are present in the file's byte-by-byte header.
+    Missing LCType values are reported as 'Unknown'.
     """
-    data = []
-    with open(filepath, 'r') as f:
-        lines = f.readlines()
-    
-    for line in lines:
-        if line.startswith('J') or line.startswith('L'):
-            parts = line.split()
-            if len(parts) >= 16:
-                try:
-                    data.append({
-                        'Objname': parts[0],
-                        'RAdeg': float(parts[1]),
-                        'DEdeg': float(parts[2]),
-                        'SED_SLOPE': float(parts[3]) if parts[3] != '?' else np.nan,
-                        'YSO_CLASS': parts[4],
-                        'Number': int(parts[5]),
-                        'W2magMean': float(parts[6]),
-                        'W2magMed': float(parts[7]),
-                        'sig_W2Flux': float(parts[8]),
-                        'err_W2Flux': float(parts[9]),
-                        'delW2mag': float(parts[10]),
-                        'Period': float(parts[11]),
-                        'FLP_LSP_BOOT': float(parts[12]),
-                        'slope': float(parts[13]),
-                        'e_slope': float(parts[14]),
-                        'r_value': float(parts[15]),
-                        'LCType': parts[-1] if len(parts) > 21 else 'Unknown'
-                    })
-                except (ValueError, IndexError):
-                    continue
-    
+    df = read_mrt_table(filepath, PAPER_B_COLUMNS)
+    if 'LCType' in df.columns:
+        df['LCType'] = df['LCType'].replace('', 'Unknown')
+    else:
+        df['LCType'] = 'Unknown'
+    return df
+
+# Bump when a parser's output changes so stale cache entries are rebuilt
+CACHE_VERSION = 3
+DEFAULT_CACHE_DIR = '.catalog_cache'
+
+def _source_fingerprint(filepath: Path) -> dict:
+    """Size, mtime and content hash identifying one version of a source file."""
+    stat = filepath.stat()
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': digest.hexdigest()}
+
+def _write_cache_entry(entry: Path, df: pd.DataFrame, fingerprint: dict, parser_key: str):
+    """Store a frame as one .npy file per column plus a JSON manifest."""
+    entry.parent.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=entry.parent, prefix=entry.name + '.tmp'))
+    columns = []
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        nulls = None
+        if isinstance(series.array, MASKED_ARRAYS):
+            # Nullable Int64 / Float64 / boolean: values with NA filled, plus the NA mask
+            nulls = series.isna().to_numpy()
+            values = series.to_numpy(dtype=series.dtype.numpy_dtype,
+                                     na_value=False if series.dtype.kind == 'b' else 0)
+        elif pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype):
+            values = series.to_numpy(dtype=np.float64 if series.hasnans else None)
+        elif pd.api.types.is_bool_dtype(series.dtype):
+            values = series.to_numpy(dtype=bool)
+        else:
+            values = series.astype(str).to_numpy(dtype=str)
+        np.save(staging / f'{i}.npy', values, allow_pickle=False)
+        column = {'name': col, 'file': f'{i}.npy', 'dtype': str(series.dtype)}
+        if values.dtype.kind == 'U' and series.hasnans:
+            # astype(str) turns missing strings into 'nan'; keep where they were
+            nulls = series.isna().to_numpy()
+        if nulls is not None:
+            np.save(staging / f'{i}.null.npy', nulls, allow_pickle=False)
+            column['nulls'] = f'{i}.null.npy'
+        columns.append(column)
+
+    manifest = {'version': CACHE_VERSION, 'parser': parser_key,
+                'source': fingerprint, 'columns': columns, 'n_rows': len(df)}
+    with open(staging / 'manifest.json', 'w') as f:
+        json.dump(manifest, f, indent=1)
+
+    if entry.exists():
+        shutil.rmtree(entry)
+    os.replace(staging, entry)
+
+def _read_cache_entry(entry: Path, manifest: dict) -> pd.DataFrame:
+    data = {}
+    for column in manifest['columns']:
+        values = np.load(entry / column['file'], mmap_mode='r', allow_pickle=False)
+        if values.dtype.kind == 'U':
+            series = pd.Series(values)
+            if 'nulls' in column:
+                series = series.mask(np.load(entry / column['nulls'], allow_pickle=False))
+            data[column['name']] = series.astype(column['dtype'])
+        elif 'nulls' in column:
+            dtype = pd.api.types.pandas_dtype(column['dtype'])
+            data[column['name']] = dtype.construct_array_type()(
+                np.array(values), np.load(entry / column['nulls'], allow_pickle=False))
+        else:
+            data[column['name']] = values
     return pd.DataFrame(data)
 
+def _parser_key(parser: Callable) -> str:
+    """Cache key of a parser: its module and qualified name."""
+    module = getattr(parser, '__module__', None)
+    qualname = getattr(parser, '__qualname__', None)
+    # Lambdas, nested functions and partials have no name that tells them apart
+    if not module or not qualname or '<' in qualname:
+        raise ValueError(f"Parser {parser!r} has no stable name to key the cache on; pass cache_key")
+    return f'{module}.{qualname}'
+
+def load_cached_table(filepath: str, parser: Callable[[str], pd.DataFrame] = None,
+                      cache_dir: str = None, cache_key: str = None) -> pd.DataFrame:
+    """
+    Parse a catalog file once and reuse a binary copy on later calls.
+
+    Each parsed table is stored as a directory of typed .npy columns (loaded
+    memory-mapped) alongside a manifest recording the source file's size,
+    mtime and content hash. Any change to the source invalidates the entry.
+    
+    Args:
+        filepath: Path to the source table (e.g. an MRT file)
+        parser: Function turning the file into a DataFrame. Defaults to parse_mrt_file
+        cache_dir: Cache location. Defaults to '.catalog_cache' next to the source
+        cache_key: Name identifying the parser's output. Defaults to the
+                   parser's module and qualified name; required for lambdas,
+                   nested functions and functools.partial objects
+    """
+    parser = parser or parse_mrt_file
+    key = cache_key or _parser_key(parser)
+    source = Path(filepath)
+    cache_root = Path(cache_dir) if cache_dir else source.parent / DEFAULT_CACHE_DIR
+    entry = cache_root / f'{source.name}.{key}'
+    fingerprint = _source_fingerprint(source)
+
+    try:
+        with open(entry / 'manifest.json') as f:
+            manifest = json.load(f)
+        if (manifest['version'] == CACHE_VERSION and manifest['parser'] == key
+                and manifest['source'] == fingerprint):
+            return _read_cache_entry(entry, manifest)
+    except (OSError, ValueError, KeyError):
+        pass
+
+    df = parser(str(source))
+    try:
+        _write_cache_entry(entry, df, fingerprint, key)
+    except OSError as e:
+        print(f"Warning: could not write catalog cache {entry}: {e}")
+    return df
+
 def compute_correlation_matrix(df: pd.DataFrame, columns: List[str] = None, standardize: bool = True) -> pd.DataFrame:
     """
     Compute Pearson correlation matrix for specified columns.
@@ -62,21 +404,156 @@ def compute_correlation_matrix(df: pd.DataFrame, columns: List[str] = None, stan
     
     return subset.corr()
 
-def categorize_variability(df: pd.DataFrame, col: str = 'delW2mag') -> pd.Series:
+class CorrelationAccumulator:
+    """
+    Streaming Pearson correlation over row chunks (Welford/Chan merging).
+
+    For every column pair (i, j) it keeps the number of rows where both are
+    present, the means of i and j over those rows and their co-moments, so
+    chunks can be folded in one at a time and accumulators built on separate
+    shards can be merged. Memory is O(p^2) regardless of the number of rows.
+
+    Args:
+        columns: columns to correlate
+        pairwise: if True, each pair uses every row where both values are
+                  present (pandas .corr() semantics); if False, rows with any
+                  missing value are dropped first (compute_correlation_matrix)
+    """
+
+    def __init__(self, columns: List[str], pairwise: bool = False):
+        self.columns = list(columns)
+        self.pairwise = pairwise
+        p = len(self.columns)
+        self.n = np.zeros((p, p))
+        self.mean = np.zeros((p, p))      # mean[i, j]: mean of column i over rows where i and j are present
+        self.m2 = np.zeros((p, p))        # m2[i, j]: sum of squared deviations of column i over those rows
+        self.comoment = np.zeros((p, p))  # comoment[i, j]: sum of (x_i - mean) (x_j - mean) over those rows
+
+    def update(self, chunk: pd.DataFrame) -> 'CorrelationAccumulator':
+        """Fold one chunk of rows into the accumulator."""
+        values = chunk[self.columns].to_numpy(dtype=np.float64)
+        present = ~np.isnan(values)
+        if not self.pairwise:
+            complete = present.all(axis=1)
+            values, present = values[complete], present[complete]
+        if len(values) == 0:
+            return self
+
+        # Shift by the chunk's column means before summing products
+        with np.errstate(invalid='ignore'), warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            shift = np.nan_to_num(np.nanmean(values, axis=0))
+        centered = np.where(present, values - shift, 0.0)
+        mask = present.astype(np.float64)
+
+        n = mask.T @ mask
+        sums = centered.T @ mask
+        squares = (centered * centered).T @ mask
+        products = centered.T @ centered
+        with np.errstate(invalid='ignore', divide='ignore'):
+            chunk_mean = np.where(n > 0, sums / n, 0.0)
+        chunk = CorrelationAccumulator(self.columns, self.pairwise)
+        chunk.n = n
+        chunk.mean = chunk_mean + shift[:, None]
+        chunk.m2 = squares - chunk_mean * sums
+        chunk.comoment = products - chunk_mean * sums.T
+        return self.merge(chunk)
+
+    def merge(self, other: 'CorrelationAccumulator') -> 'CorrelationAccumulator':
+        """Combine another accumulator over the same columns into this one (Chan et al.)."""
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, self.n * other.n / n, 0.0)
+            frac = np.where(n > 0, other.n / n, 0.0)
+        self.comoment = self.comoment + other.comoment + delta * delta.T * weight
+        self.m2 = self.m2 + other.m2 + delta * delta * weight
+        self.mean = self.mean + delta * frac
+        self.n = n
+        return self
+
+    def correlation(self) -> pd.DataFrame:
+        """Pearson correlation matrix; NaN for pairs with < 2 rows or zero variance."""
+        with np.errstate(invalid='ignore', divide='ignore'):
+            corr = self.comoment / np.sqrt(self.m2 * self.m2.T)
+        corr[self.n < 2] = np.nan
+        return pd.DataFrame(corr, index=self.columns, columns=self.columns)
+
+def streaming_correlation_matrix(chunks: Iterable[pd.DataFrame], columns: List[str],
+                                 pairwise: bool = False) -> pd.DataFrame:
+    """
+    Pearson correlation matrix of a table read as an iterator of row chunks.
+    With pairwise=False it matches compute_correlation_matrix on the full
+    table (z-scoring does not change Pearson r); with pairwise=True it
+    matches DataFrame.corr().
+    """
+    accumulator = CorrelationAccumulator(columns, pairwise)
+    for chunk in chunks:
+        accumulator.update(chunk)
+    return accumulator.correlation()
+
+VARIABILITY_EDGES = (0.2, 0.5)
+VARIABILITY_LABELS = ('Low', 'Medium', 'High')
+
+def bin_values(values, edges, labels, missing_label: str = 'Unknown') -> pd.Categorical:
+    """
+    Bin numeric values into labelled categories with np.digitize.
+
+    Bins are closed on the left: with edges (0.2, 0.5), x < 0.2 is the first
+    label, 0.2 <= x < 0.5 the second and x >= 0.5 the third. NaN gets
+    `missing_label`, which is always the last category.
+
+    Args:
+        values: numeric array-like
+        edges: increasing interior bin edges (len(labels) - 1 of them)
+        labels: one label per bin
+        missing_label: label for NaN values
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if len(edges) != len(labels) - 1:
+        raise ValueError(f"{len(labels)} labels need {len(labels) - 1} edges, got {len(edges)}")
+    codes = np.digitize(values, edges)
+    codes[np.isnan(values)] = len(labels)
+    return pd.Categorical.from_codes(codes, categories=list(labels) + [missing_label])
+
+def quantile_edges(values, n_bins: int) -> np.ndarray:
+    """Interior edges splitting the non-missing values into n_bins equal-count bins."""
+    return np.nanquantile(np.asarray(values, dtype=np.float64), np.linspace(0, 1, n_bins + 1)[1:-1])
+
+def categorize_variability(df: pd.DataFrame, col='delW2mag', edges=VARIABILITY_EDGES,
+                           labels=VARIABILITY_LABELS, by: str = None):
     """
     Categorize sources by variability amplitude.
-    Low: < 0.2 mag, Medium: 0.2-0.5 mag, High: > 0.5 mag
-    """
-    categories = []
-    for val in df[col]:
-        if pd.isna(val):
-            categories.append('Unknown')
-        elif val < 0.2:
-            categories.append('Low')
-        elif val < 0.5:
-            categories.append('Medium')
-        else:
-            categories.append('High')
-    return pd.Series(categories, index=df.index)
+    Low: < 0.2 mag, Medium: 0.2-0.5 mag, High: ≥ 0.5 mag, Unknown: missing
 
+    Args:
+        df: DataFrame with amplitude columns
+        col: column name, or a list of names (e.g. ['DeltaW1', 'DeltaW2', 'DeltaKs'])
+             to bin several columns in one call
+        edges: interior bin edges, or a dict of edges per value of `by`
+               (e.g. per-YSO_CLASS thresholds); sources whose group has no
+               entry are Unknown
+        labels: bin labels
+        by: grouping column used when `edges` is a dict
+
+    Returns:
+        Categorical Series (DataFrame for a list of columns) indexed like df.
+        Categories that never occur are dropped and the rest are sorted by
+        label, so crosstabs, chi-square tests and heatmaps get the same
+        columns in the same order as with plain strings.
+    """
+    if not isinstance(col, str):
+        return pd.DataFrame({c: categorize_variability(df, c, edges, labels, by) for c in col}, index=df.index)
 
+    if isinstance(edges, dict):
+        values = df[col].to_numpy(dtype=np.float64)
+        codes = np.full(len(df), len(labels), dtype=np.int64)
+        groups = df[by].to_numpy()
+        for group, group_edges in edges.items():
+            rows = groups == group
+            codes[rows] = bin_values(values[rows], group_edges, labels).codes
+        categories = pd.Categorical.from_codes(codes, categories=list(labels) + ['Unknown'])
+    else:
+        categories = bin_values(df[col], edges, labels)
+    series = pd.Series(categories, index=df.index, name=col).cat.remove_unused_categories()
+    return series.cat.reorder_categories(sorted(series.cat.categories))
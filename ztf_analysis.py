@@ -11,14 +11,26 @@ Goals:
 
 """
 
-import pandas as pd
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
+import pandas as pd
 from pathlib import Path
 import warnings
 warnings.filterwarnings('ignore')
 
+from ztf_store import LightCurveStore
+from columnar_io import SUFFIX, exact_float64, load_table, save_table
+from ztf_decode import decode_response, to_lightcurve
+from ztf_pipeline import analyze_pipelined
+from ztf_query_plan import fetch_planned
+from ztf_batch import analyze_batch, pack_frame, unpack_frames
+from ztf_synthetic import generate_survey, synthetic_lightcurve
+
 try:
-    import requests
+    # ztf_fetch imports requests, so its ImportError means no live queries
+    from ztf_fetch import ZTFFetcher, ZTF_LIGHTCURVE_URL, print_progress
     HAS_REQUESTS = True
 except ImportError:
     HAS_REQUESTS = False
@@ -30,12 +42,29 @@ class ZTFAnalyzer:
     Produces: brightness rankings, fading sources, color evolution.
     """
     
-    def __init__(self, ztf_token='983a88c736b14408a9127e8830f980e3', output_dir='ztf_analysis', use_synthetic_only=False):
+    def __init__(self, ztf_token='983a88c736b14408a9127e8830f980e3', output_dir='ztf_analysis', use_synthetic_only=False,
+                 max_workers=8, base_url=None, store=None, group_radius=None, requests_per_second=None):
         self.ztf_token = ztf_token
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
         self.use_real_data = False
         self.use_synthetic_only = use_synthetic_only
+        self.max_workers = max_workers
+        self.base_url = base_url
+        self.requests_per_second = requests_per_second  # None = limited by max_workers only
+        self.search_radius = 0.0014  # ~5 arcsec search radius
+        self.store = store
+        self.group_radius = group_radius  # degrees; None = one cone search per source
+        self._fetcher = None
+    
+    @property
+    def fetcher(self):
+        """Pooled ZTF client (rate-limited if requests_per_second is set) shared by all queries of this analyzer."""
+        if self._fetcher is None:
+            self._fetcher = ZTFFetcher(self.ztf_token, base_url=self.base_url or ZTF_LIGHTCURVE_URL,
+                                       max_workers=self.max_workers, radius=self.search_radius,
+                                       requests_per_second=self.requests_per_second)
+        return self._fetcher
         
     def query_ztf_lightcurve(self, ra, dec, object_name):
         """
@@ -55,50 +84,92 @@ class ZTFAnalyzer:
         if not HAS_REQUESTS or self.use_synthetic_only:
             return self._generate_synthetic_lc(object_name, ra, dec)
         
-        try:
-            # Real ZTF API endpoint
-            url = "https://irsa.ipac.caltech.edu/cgi-bin/ZTF/nph_light_curve_search"
-            
-            params = {
-                'RA': ra,
-                'DEC': dec,
-                'RADIUS': 0.0014,  # ~5 arcsec search radius
-                'BANDLIST': 'g,r',  # g and r bands
-                'FORMAT': 'JSON',
-                'APIKEY': self.ztf_token
-            }
-            
-            response = requests.get(url, params=params, timeout=5)
+        stored = self.store.get(ra, dec, self.search_radius) if self.store is not None else None
+        if stored is not None:
+            return self._real_or_synthetic(stored, object_name, ra, dec)
+        
+        return self._finish_query(self.fetcher.fetch(ra, dec), object_name, ra, dec)
+    
+    def query_ztf_lightcurves(self, sources, progress=None):
+        """
+        Query ZTF for many sources at once with bounded concurrency.
+        Sources already in the light-curve store are not re-queried. With a
+        group_radius, nearby sources share one wider cone search whose
+        epochs are split back by position (see ztf_query_plan).
+        
+        Args:
+            sources: list of source dicts with RAdeg, DEdeg and Objname
+            progress: callable(done, total) for fetch progress (default prints every 10)
             
-            if response.status_code == 200:
-                data = response.json()
-                if data and 'result' in data and len(data['result']) > 0:
-                    self.use_real_data = True
-                    return self._parse_ztf_response(data['result'])
-        except (requests.ConnectionError, requests.Timeout, Exception) as e:
-            pass
+        Returns:
+            list of light curve dicts aligned with `sources`
+        """
+        if not HAS_REQUESTS or self.use_synthetic_only:
+            survey = generate_survey([s['Objname'] for s in sources])
+            return [survey.lightcurve(i) for i in range(len(sources))]
+        
+        lightcurves = [None] * len(sources)
+        stored = ([None] * len(sources) if self.store is None else
+                  self.store.get_many([(s['RAdeg'], s['DEdeg'], self.search_radius) for s in sources]))
+        pending = []
+        for i, (s, lc_dict) in enumerate(zip(sources, stored)):
+            if lc_dict is None:
+                pending.append(i)
+            else:
+                lightcurves[i] = self._real_or_synthetic(lc_dict, s['Objname'], s['RAdeg'], s['DEdeg'])
+        if not pending:
+            return lightcurves
+        
+        if self.group_radius:
+            lcs, fetched = fetch_planned(self.fetcher, [sources[i]['RAdeg'] for i in pending],
+                                         [sources[i]['DEdeg'] for i in pending], self.search_radius,
+                                         self.group_radius, progress=progress or print_progress)
+        else:
+            results = self.fetcher.fetch_many([(sources[i]['RAdeg'], sources[i]['DEdeg']) for i in pending],
+                                              progress=progress or print_progress)
+            lcs = [self._parse_ztf_response(result) if result else None for result in results]
+            fetched = [result is not None for result in results]
+        
+        # Failed queries are not stored, so they are retried next run
+        if self.store is not None:
+            self.store.put_many((sources[i]['RAdeg'], sources[i]['DEdeg'], self.search_radius, lc_dict)
+                                for i, lc_dict, ok in zip(pending, lcs, fetched) if ok)
+        for i, lc_dict in zip(pending, lcs):
+            s = sources[i]
+            lightcurves[i] = self._real_or_synthetic(lc_dict, s['Objname'], s['RAdeg'], s['DEdeg'])
+        return lightcurves
+    
+    def _finish_query(self, result, object_name, ra, dec):
+        """
+        Turn a raw ZTF result into a light curve and record it in the store.
+        `result` is the response body (or [] / an empty table when ZTF has no
+        data) and None when the query failed;
+        failed queries are not stored so they are retried next run.
+        """
+        lc_dict = self._parse_ztf_response(result) if result else None
+        return self._finish_lightcurve(lc_dict, result is not None, object_name, ra, dec)
+    
+    def _finish_lightcurve(self, lc_dict, fetched, object_name, ra, dec):
+        """Store a fetched light curve (None = no ZTF data), then apply the synthetic fallback."""
+        if fetched and self.store is not None:
+            self.store.put(ra, dec, self.search_radius, lc_dict)
+        return self._real_or_synthetic(lc_dict, object_name, ra, dec)
+    
+    def _real_or_synthetic(self, lc_dict, object_name, ra, dec):
+        """Use real data when it has any g/r epochs, otherwise fall back to synthetic."""
+        if lc_dict and (len(lc_dict['g']) or len(lc_dict['r'])):
+            self.use_real_data = True
+            return lc_dict
         
         # Fallback to synthetic data if API fails
         return self._generate_synthetic_lc(object_name, ra, dec)
     
     def _parse_ztf_response(self, ztf_data):
-        """Parse ZTF API response into light curve dictionary."""
-        lc_dict = {'g': [], 'r': [], 'times_g': [], 'times_r': []}
-        
-        for observation in ztf_data:
-            band = observation.get('filtercode', 'g').lower()
-            mag = observation.get('mag')
-            mjd = observation.get('mjd')
-            
-            if band in ['g', 'r'] and mag is not None and mjd is not None:
-                if band == 'g':
-                    lc_dict['times_g'].append(mjd)
-                    lc_dict['g'].append(mag)
-                elif band == 'r':
-                    lc_dict['times_r'].append(mjd)
-                    lc_dict['r'].append(mag)
-        
-        return lc_dict if (lc_dict['g'] or lc_dict['r']) else None
+        """
+        Parse a ZTF response (CSV / IPAC table bytes or JSON observations) into
+        a light curve dictionary, dropping flagged and incomplete epochs.
+        """
+        return to_lightcurve(decode_response(ztf_data))
     
     def _generate_synthetic_lc(self, object_name, ra, dec):
         """
@@ -109,41 +180,10 @@ class ZTFAnalyzer:
         - ClassII: Medium amplitude, moderate variability
         - ClassIII: Low amplitude, stable
         - FS: Intermediate properties
-        """
-        np.random.seed(hash(object_name) % 2**32)
-        
-        # 3 years of observations (typical ZTF baseline)
-        n_obs_per_band = np.random.randint(30, 150)
-        times_g = np.sort(np.random.uniform(58000, 59000, n_obs_per_band))
-        times_r = np.sort(np.random.uniform(58000, 59000, n_obs_per_band))
         
-        # Typical YSO optical magnitudes
-        base_r_mag = np.random.uniform(13, 17.5)  # r < 18 for ZTF detection
-        base_g_mag = base_r_mag - np.random.uniform(-0.2, 0.5)  # g typically bluer/brighter
-        
-        # Add realistic variability
-        variability_amp = np.random.uniform(0.1, 1.5)  # magnitude amplitude
-        noise_g = np.random.normal(0, 0.1, n_obs_per_band)
-        noise_r = np.random.normal(0, 0.1, n_obs_per_band)
-        
-        # Some sources fade over time (disk dissipation)
-        fade_trend = np.random.uniform(-0.003, 0.002)  # mag/day
-        fade_g = fade_trend * (times_g - times_g[0])
-        fade_r = fade_trend * (times_r - times_r[0])
-        
-        # Stochastic variability (accretion fluctuations)
-        periodic_component_g = variability_amp * np.sin(2*np.pi * times_g / np.random.uniform(10, 100))
-        periodic_component_r = variability_amp * np.sin(2*np.pi * times_r / np.random.uniform(10, 100))
-        
-        mags_g = base_g_mag + periodic_component_g + fade_g + noise_g
-        mags_r = base_r_mag + periodic_component_r + fade_r + noise_r
-        
-        return {
-            'g': mags_g.tolist(),
-            'r': mags_r.tolist(),
-            'times_g': times_g.tolist(),
-            'times_r': times_r.tolist()
-        }
+        Deterministic per object name (see ztf_synthetic).
+        """
+        return synthetic_lightcurve(object_name)
     
     def analyze_brightness(self, lc_dict):
         """
@@ -309,16 +349,18 @@ class ZTFAnalyzer:
             'baseline_days': max_time - min_time
         }
     
-    def analyze_source(self, source_dict):
+    def analyze_source(self, source_dict, lc_data=None):
         """
         Complete analysis of one source.
+        Queries ZTF unless an already fetched light curve is passed in.
         """
         ra = source_dict['RAdeg']
         dec = source_dict['DEdeg']
         obj_name = source_dict['Objname']
         
         # Query ZTF
-        lc_data = self.query_ztf_lightcurve(ra, dec, obj_name)
+        if lc_data is None:
+            lc_data = self.query_ztf_lightcurve(ra, dec, obj_name)
         
         if not lc_data:
             return None
@@ -350,8 +392,85 @@ class ZTFAnalyzer:
             'color_status': color_evol.get('status') if color_evol else 'UNKNOWN',
             'baseline_days': color_evol.get('baseline_days') if color_evol else np.nan
         }
+    
+    def analyze_sources(self, sources, lightcurves=None):
+        """
+        Analyze many sources in one vectorized pass (see ztf_batch).
+        Same rows as calling analyze_source on each source, as a DataFrame.
+        """
+        if lightcurves is None:
+            if not HAS_REQUESTS or self.use_synthetic_only:
+                # Generate straight into the ragged layout
+                lightcurves = generate_survey([s['Objname'] for s in sources])
+            else:
+                lightcurves = self.query_ztf_lightcurves(sources)
+        return analyze_batch(sources, lightcurves)
+    
+    def analyze_sources_pipelined(self, sources, chunk_size=64, max_chunks_in_flight=4, progress=None):
+        """
+        analyze_sources with fetching, decoding and analysis overlapped in
+        chunks (see ztf_pipeline), so requests stay in flight while earlier
+        chunks are analyzed. Same rows as analyze_sources.
+        """
+        if not HAS_REQUESTS or self.use_synthetic_only:
+            return self.analyze_sources(sources)
+        return analyze_pipelined(self, sources, chunk_size, max_chunks_in_flight, progress)
+    
+    def analyze_sources_parallel(self, sources, workers, lightcurves=None):
+        """
+        analyze_sources sharded across a process pool.
+        
+        Each worker generates (synthetic mode) or receives its shard's light
+        curves, analyzes them and returns packed column arrays; shards are
+        merged back in input order, so the result equals a serial run.
+        Real light curves are fetched here first, since fetching is I/O bound
+        and goes through the shared session and store.
+        """
+        if workers <= 1 or len(sources) < 2:
+            return self.analyze_sources(sources, lightcurves)
+        
+        synthetic = not HAS_REQUESTS or self.use_synthetic_only
+        if lightcurves is None and not synthetic:
+            lightcurves = self.query_ztf_lightcurves(sources)
+        
+        bounds = np.linspace(0, len(sources), min(workers, len(sources)) + 1).astype(int)
+        shards = []
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            shard_lcs = lightcurves[start:stop] if lightcurves is not None else None
+            shards.append((self.ztf_token, str(self.output_dir), sources[start:stop], shard_lcs))
+        
+        with ProcessPoolExecutor(max_workers=len(shards)) as pool:
+            packed = list(pool.map(_analyze_shard, shards))
+        return unpack_frames(packed)
+
+def _analyze_shard(shard):
+    """Process-pool worker: analyze one contiguous slice of the source list."""
+    ztf_token, output_dir, sources, lightcurves = shard
+    analyzer = ZTFAnalyzer(ztf_token=ztf_token, output_dir=output_dir, use_synthetic_only=True)
+    return pack_frame(analyzer.analyze_sources(sources, lightcurves))
 
-def main():
+# The source fields analyze_source reads
+SOURCE_FIELDS = ('Objname', 'RAdeg', 'DEdeg', 'YSO_CLASS', 'W2magMean')
+
+def source_records(sources_df):
+    """
+    Source dicts of SOURCE_FIELDS from a table loaded with load_table's
+    defaults: float32 columns are widened to the exact float64 values that
+    were written, dictionary-encoded columns become plain strings.
+    """
+    columns = {}
+    for name in SOURCE_FIELDS:
+        if name not in sources_df.columns:
+            continue
+        values = sources_df[name]
+        if values.dtype == np.float32:
+            values = exact_float64(values.to_numpy())
+        elif isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.to_numpy(dtype=object)
+        columns[name] = values
+    return pd.DataFrame(columns, index=sources_df.index).to_dict('records')
+
+def main(workers=1, formats=('csv',), base_url=None, group_radius=None, requests_per_second=None):
     print("="*90)
     print("PHASE 2: ZTF OPTICAL ANALYSIS - BRIGHTNESS, FADING, AND COLOR EVOLUTION")
     print("="*90 + "\n")
@@ -359,34 +478,42 @@ def main():
     # Load filtered sources
     filtered_file = Path('/Users/marcus/Desktop/YSO/ztf_candidates/filtered_sources.csv')
     
-    if not filtered_file.exists():
+    if not (filtered_file.exists() or filtered_file.with_suffix(SUFFIX).exists()):
         print("ERROR: filtered_sources.csv not found!")
         print("Run: python3 main.py first\n")
         return
     
     print(f"Loading filtered sources from: {filtered_file}")
-    sources_df = pd.read_csv(filtered_file)
+    sources_df = load_table(filtered_file)
     print(f"Processing {len(sources_df)} sources for ZTF analysis...\n")
     
-    # Initialize analyzer (use_synthetic_only=True for demo when network unavailable)
-    analyzer = ZTFAnalyzer(use_synthetic_only=True)
+    # Initialize analyzer (use_synthetic_only=True for demo when network unavailable,
+    # unless a light-curve service URL, e.g. a local ztf_stub server, is given).
+    # Only fetched light curves are worth storing.
+    store = LightCurveStore(Path('ztf_analysis') / 'lightcurves.sqlite') if base_url is not None else None
+    analyzer = ZTFAnalyzer(use_synthetic_only=base_url is None, base_url=base_url, group_radius=group_radius,
+                           requests_per_second=requests_per_second, store=store)
     
     print("Querying ZTF light curves...")
     print("(Using synthetic data if API unavailable)\n")
     
-    # Analyze each source
-    results = []
-    for idx, (_, source) in enumerate(sources_df.iterrows()):
-        if idx % 10 == 0:
-            print(f"  Progress: {idx}/{len(sources_df)}")
-        
-        analysis = analyzer.analyze_source(source.to_dict())
-        if analysis:
-            results.append(analysis)
-            if idx < 3:
-                print(f"    ✓ {source['Objname']} (RA={source['RAdeg']:.4f}, Dec={source['DEdeg']:.4f})")
-    
-    results_df = pd.DataFrame(results)
+    # Live queries overlap fetching with analysis; synthetic data is analyzed in processes
+    sources = source_records(sources_df)
+    start_time = time.perf_counter()
+    if base_url is not None:
+        results_df = analyzer.analyze_sources_pipelined(
+            sources, progress=lambda done, total: print_progress(done, total, every=5, label='Analyzed chunks'))
+        mode = 'pipelined fetch and analysis'
+    else:
+        results_df = analyzer.analyze_sources_parallel(sources, workers)
+        mode = f"{max(workers, 1)} worker(s)"
+    elapsed = time.perf_counter() - start_time
+    if store is not None:
+        store.close()  # commits buffered store writes
+    print(f"  Throughput: {len(sources) / elapsed:.1f} sources/sec "
+          f"({len(sources)} sources in {elapsed:.2f} s, {mode})")
+    for _, row in results_df.head(3).iterrows():
+        print(f"    ✓ {row['Objname']} (RA={row['RAdeg']:.4f}, Dec={row['DEdeg']:.4f})")
     
     print(f"\n✓ Analyzed {len(results_df)} sources\n")
     
@@ -414,7 +541,7 @@ def main():
     
     # Save spectroscopy candidates
     spectra_file = analyzer.output_dir / 'spectroscopy_candidates.csv'
-    results_df.to_csv(spectra_file, index=False)
+    save_table(results_df, spectra_file, formats)
     print(f"\n✓ Saved all targets: {spectra_file}\n")
     
     # ===========================================================================
@@ -439,7 +566,7 @@ def main():
         print(top_fading.to_string(index=False))
         
         fading_file = analyzer.output_dir / 'fading_sources.csv'
-        fading_sources.to_csv(fading_file, index=False)
+        save_table(fading_sources, fading_file, formats)
         print(f"\n✓ Saved fading sources: {fading_file}")
     
     print(f"\nBrightening Sources: {len(results_df[results_df['is_fading'] == False])} sources")
@@ -470,7 +597,7 @@ def main():
         print(f"    → Color shift to blue = dust clearing or accretion heating\n")
         
         color_file = analyzer.output_dir / 'color_evolution.csv'
-        color_evol.to_csv(color_file, index=False)
+        save_table(color_evol, color_file, formats)
         print(f"✓ Saved color evolution sources: {color_file}\n")
     
     # ===========================================================================
@@ -515,4 +642,23 @@ def main():
         print(f"  • {analyzer.output_dir / 'color_evolution.csv'} (diagnostic targets)\n")
 
 if __name__ == '__main__':
-    main()
+    parser = argparse.ArgumentParser(description='ZTF optical analysis of filtered YSO sources')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='number of worker processes for the synthetic-data analysis '
+                             '(default: 1, serial; not used with --base-url)')
+    parser.add_argument('--binary', action='store_true',
+                        help='also write each output table in the columnar .ycol format')
+    parser.add_argument('--base-url', default=None,
+                        help='query this light-curve service (e.g. a ztf_stub server) instead of '
+                             'using synthetic data; fetching and analysis are pipelined')
+    parser.add_argument('--group-radius', type=float, default=None, metavar='ARCSEC',
+                        help='with --base-url, share one cone search of up to this radius between '
+                             'nearby sources (e.g. 36); default: one search per source')
+    parser.add_argument('--rate', type=float, default=None, metavar='REQ_PER_S',
+                        help='with --base-url, cap requests per second to the service '
+                             '(default: no cap, 8 concurrent requests)')
+    args = parser.parse_args()
+    if args.base_url and args.workers > 1:
+        parser.error('--workers applies to synthetic data; --base-url runs the pipelined fetcher')
+    main(workers=args.workers, formats=('csv', 'ycol') if args.binary else ('csv',), base_url=args.base_url,
+         group_radius=args.group_radius / 3600 if args.group_radius else None, requests_per_second=args.rate)
@@ -0,0 +1,402 @@
+"""
+Batch Light-Curve Analytics
+===========================
+
+Vectorized versions of ZTFAnalyzer.analyze_brightness / analyze_fading /
+analyze_color_evolution that process every source in a handful of NumPy
+passes instead of one Python call per source.
+
+Light curves are held as ragged arrays: for each band, all epochs of all
+sources concatenated, plus an offsets array so that source i owns
+values[offsets[i]:offsets[i+1]]. Per-source statistics are segment
+reductions (np.add.reduceat and friends); linear trends use the closed-form
+least-squares slope on per-source centered times.
+"""
+
+from itertools import chain
+
+import numpy as np
+import pandas as pd
+
+BANDS = ('g', 'r')
+
+# Thresholds shared with ZTFAnalyzer
+FADING_MIN_OBS = 5
+COLOR_MIN_OBS = 3
+COLOR_MIN_BASELINE = 100  # days
+STABLE_SLOPE = 0.0001  # mag/day
+
+
+class RaggedLightCurves:
+    """
+    g/r light curves of many sources as concatenated arrays plus offsets.
+
+    Attributes:
+        times[band], mags[band]: concatenated epochs (float64)
+        offsets[band]: int64 array of length n_sources + 1
+    """
+
+    def __init__(self, times, mags, offsets):
+        self.times = times
+        self.mags = mags
+        self.offsets = offsets
+        self.n_sources = len(offsets['r']) - 1
+
+    @classmethod
+    def from_dicts(cls, lightcurves):
+        """Build from ZTFAnalyzer light-curve dicts (None = no data)."""
+        times, mags, offsets = {}, {}, {}
+        for band in BANDS:
+            time_key = f'times_{band}'
+            counts = np.fromiter((len(lc[band]) if lc else 0 for lc in lightcurves),
+                                 dtype=np.int64, count=len(lightcurves))
+            offsets[band] = np.concatenate(([0], np.cumsum(counts)))
+            total = int(offsets[band][-1])
+            # One flat conversion per band rather than one array per source
+            mags[band] = np.fromiter(chain.from_iterable(lc[band] for lc in lightcurves if lc),
+                                     dtype=np.float64, count=total)
+            times[band] = np.fromiter(chain.from_iterable(lc[time_key] for lc in lightcurves if lc),
+                                      dtype=np.float64, count=total)
+        return cls(times, mags, offsets)
+
+    def lightcurve(self, i):
+        """Light-curve dict of source i (array views, no copy)."""
+        lc = {}
+        for band in BANDS:
+            start, stop = self.offsets[band][i], self.offsets[band][i + 1]
+            lc[band] = self.mags[band][start:stop]
+            lc[f'times_{band}'] = self.times[band][start:stop]
+        return lc
+
+    def counts(self, band):
+        return np.diff(self.offsets[band])
+
+    def segment_ids(self, band):
+        """Source index of every epoch in a band."""
+        return np.repeat(np.arange(self.n_sources), self.counts(band))
+
+
+def segment_sum(values, offsets):
+    """Per-segment sums; empty segments give 0."""
+    counts = np.diff(offsets)
+    sums = np.zeros(len(counts))
+    nonempty = counts > 0
+    if nonempty.any():
+        sums[nonempty] = np.add.reduceat(values, offsets[:-1][nonempty])
+    return sums
+
+
+def segment_reduce(ufunc, values, offsets, empty=np.nan):
+    """Per-segment ufunc reduction (e.g. np.minimum); empty segments give `empty`."""
+    counts = np.diff(offsets)
+    out = np.full(len(counts), empty, dtype=np.float64)
+    nonempty = counts > 0
+    if nonempty.any():
+        out[nonempty] = ufunc.reduceat(values, offsets[:-1][nonempty])
+    return out
+
+
+def segment_mean(values, offsets):
+    counts = np.diff(offsets)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return segment_sum(values, offsets) / counts
+
+
+def segment_slope(x, y, offsets):
+    """
+    Least-squares slope of y on x for every segment, in closed form.
+    x is centered per segment first so large MJD values do not cancel.
+    """
+    ids = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    xc = x - segment_mean(x, offsets)[ids]
+    yc = y - segment_mean(y, offsets)[ids]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return segment_sum(xc * yc, offsets) / segment_sum(xc * xc, offsets)
+
+
+def batch_brightness(lcs):
+    """Vectorized analyze_brightness: r/g mean and min, r std, priority."""
+    r, g = lcs.mags['r'], lcs.mags['g']
+    r_off, g_off = lcs.offsets['r'], lcs.offsets['g']
+    r_mean = segment_mean(r, r_off)
+    r_dev = r - np.nan_to_num(r_mean)[lcs.segment_ids('r')]
+    r_std = np.sqrt(segment_mean(r_dev * r_dev, r_off))
+
+    priority = np.select(
+        [np.isnan(r_mean), r_mean < 15.5, r_mean < 16.5, r_mean < 17.0],
+        ['UNKNOWN', 'HIGH', 'MEDIUM', 'LOW'], default='TOO_FAINT')
+
+    return pd.DataFrame({
+        'r_mean': r_mean,
+        'r_min': segment_reduce(np.minimum, r, r_off),
+        'r_std': r_std,
+        'g_mean': segment_mean(g, g_off),
+        'g_min': segment_reduce(np.minimum, g, g_off),
+        'priority': priority
+    })
+
+
+def batch_fading(lcs):
+    """Vectorized analyze_fading. Sources with < 5 r epochs get NaN/UNKNOWN."""
+    slope = segment_slope(lcs.times['r'], lcs.mags['r'], lcs.offsets['r'])
+    return fading_from_slope(slope, lcs.counts('r'))
+
+
+def fading_from_slope(slope, n_obs):
+    """analyze_fading's columns from r-band trend slopes (mag/day) and epoch counts."""
+    valid = n_obs >= FADING_MIN_OBS
+    slope = np.where(valid, slope, np.nan)
+    mag_change_1yr = slope * 365
+
+    status = np.select(
+        [~valid, np.abs(slope) < STABLE_SLOPE, slope > STABLE_SLOPE],
+        ['UNKNOWN', 'STABLE', 'FADING (brightening in mag = getting dimmer)'],
+        default='BRIGHTENING (dimming in mag = getting brighter)')
+
+    return pd.DataFrame({
+        'slope_mag_per_day': slope,
+        'mag_change_1yr': mag_change_1yr,
+        'is_fading': valid & (mag_change_1yr > 0.2),
+        'status': status,
+        'n_observations': n_obs,
+        'valid': valid
+    })
+
+
+def _sort_segments(times, values, offsets, span):
+    """Sort epochs by time within each segment (interp1d does not assume order)."""
+    ids = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    shifted = times + ids * span
+    if len(shifted) > 1 and not (np.diff(shifted) >= 0).all():
+        order = np.argsort(shifted, kind='stable')
+        return times[order], values[order], shifted[order]
+    return times, values, shifted
+
+
+def _segment_interp(query, query_ids, times, shifted, values, offsets, span):
+    """
+    Linear interpolation of many ragged series at once.
+    `shifted` holds each segment's times offset by k * span so the whole
+    array is monotonic and one searchsorted call serves every source; the
+    weights themselves use the unshifted times to keep full precision.
+    """
+    q = query + query_ids * span
+    lo_bound = offsets[query_ids]
+    hi_bound = offsets[query_ids + 1] - 1
+    upper = np.clip(np.searchsorted(shifted, q, side='left'), lo_bound + 1, hi_bound)
+    lower = upper - 1
+    t0, t1 = times[lower], times[upper]
+    v0, v1 = values[lower], values[upper]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        frac = (query - t0) / (t1 - t0)
+    return v0 + frac * (v1 - v0)
+
+
+def batch_color_evolution(lcs):
+    """
+    Vectorized analyze_color_evolution: interpolate g and r onto a common
+    grid of min(n_g, n_r) points over the overlapping baseline, then fit the
+    g-r trend. Sources failing the epoch/baseline cuts get NaN/UNKNOWN.
+    """
+    n_g, n_r = lcs.counts('g'), lcs.counts('r')
+    all_times = np.concatenate((lcs.times['g'], lcs.times['r']))
+    span = (all_times.max() - all_times.min() + 1.0) if len(all_times) else 1.0
+    t_g, m_g, shifted_g = _sort_segments(lcs.times['g'], lcs.mags['g'], lcs.offsets['g'], span)
+    t_r, m_r, shifted_r = _sort_segments(lcs.times['r'], lcs.mags['r'], lcs.offsets['r'], span)
+
+    min_time = np.fmax(segment_reduce(np.minimum, t_g, lcs.offsets['g']),
+                       segment_reduce(np.minimum, t_r, lcs.offsets['r']))
+    max_time = np.fmin(segment_reduce(np.maximum, t_g, lcs.offsets['g']),
+                       segment_reduce(np.maximum, t_r, lcs.offsets['r']))
+    baseline = max_time - min_time
+    with np.errstate(invalid='ignore'):
+        valid = (n_g >= COLOR_MIN_OBS) & (n_r >= COLOR_MIN_OBS) & (baseline >= COLOR_MIN_BASELINE)
+
+    # Common time grid (np.linspace per source, built as one ragged array)
+    sources = np.flatnonzero(valid)
+    n_grid = np.minimum(n_g, n_r)[sources]
+    grid_offsets = np.concatenate(([0], np.cumsum(n_grid)))
+    grid_ids = np.repeat(sources, n_grid)
+    position = np.arange(grid_offsets[-1]) - np.repeat(grid_offsets[:-1], n_grid)
+    step = (baseline[sources] / (n_grid - 1))
+    grid = np.repeat(min_time[sources], n_grid) + position * np.repeat(step, n_grid)
+    last = grid_offsets[1:] - 1
+    grid[last] = max_time[sources]
+
+    g_interp = _segment_interp(grid, grid_ids, t_g, shifted_g, m_g, lcs.offsets['g'], span)
+    r_interp = _segment_interp(grid, grid_ids, t_r, shifted_r, m_r, lcs.offsets['r'], span)
+    color = g_interp - r_interp
+
+    mean_color = np.full(lcs.n_sources, np.nan)
+    color_slope = np.full(lcs.n_sources, np.nan)
+    mean_color[sources] = segment_mean(color, grid_offsets)
+    color_slope[sources] = segment_slope(grid, color, grid_offsets)
+
+    return color_from_slope(color_slope, mean_color, baseline, valid)
+
+
+def _nightly_means(lcs, band):
+    """
+    Per-(source, night) epoch counts and time/magnitude sums of one band,
+    sorted by source then night. Nights are integer MJDs, which at Palomar
+    begin in the local afternoon, so one observing night never spans two.
+    """
+    night = np.floor(lcs.times[band]).astype(np.int64)
+    keys, inverse, counts = np.unique((lcs.segment_ids(band) << 32) + night,
+                                      return_inverse=True, return_counts=True)
+    inverse = inverse.ravel()
+    t_sum = np.bincount(inverse, weights=lcs.times[band], minlength=len(keys))
+    m_sum = np.bincount(inverse, weights=lcs.mags[band], minlength=len(keys))
+    return keys, counts, t_sum, m_sum
+
+
+def nightly_colors(lcs):
+    """
+    g-r color of every night observed in both bands, as a ragged series:
+    the mean g minus the mean r magnitude of the night, at the mean time of
+    all that night's epochs.
+
+    Returns:
+        (times, colors, offsets) with offsets of length n_sources + 1
+    """
+    keys_g, n_g, t_g, m_g = _nightly_means(lcs, 'g')
+    keys_r, n_r, t_r, m_r = _nightly_means(lcs, 'r')
+    keys, in_g, in_r = np.intersect1d(keys_g, keys_r, assume_unique=True, return_indices=True)
+    times = (t_g[in_g] + t_r[in_r]) / (n_g[in_g] + n_r[in_r])
+    colors = m_g[in_g] / n_g[in_g] - m_r[in_r] / n_r[in_r]
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(keys >> 32, minlength=lcs.n_sources))))
+    return times, colors, offsets
+
+
+def batch_paired_color_evolution(lcs):
+    """
+    g-r trend fitted to same-night color pairs (nightly_colors) rather than
+    to a common interpolated grid. Unlike batch_color_evolution it is a plain
+    least-squares fit, so it can be accumulated incrementally
+    (ztf_incremental.IncrementalTrends). Sources with fewer than 3 paired
+    nights or a paired baseline under 100 days get NaN/UNKNOWN.
+    """
+    times, colors, offsets = nightly_colors(lcs)
+    n_pairs = np.diff(offsets)
+    baseline = segment_reduce(np.maximum, times, offsets) - segment_reduce(np.minimum, times, offsets)
+    with np.errstate(invalid='ignore'):
+        valid = (n_pairs >= COLOR_MIN_OBS) & (baseline >= COLOR_MIN_BASELINE)
+    return color_from_slope(segment_slope(times, colors, offsets), segment_mean(colors, offsets),
+                            baseline, valid)
+
+
+def _format_distinct(template, values):
+    """template.format(v) for every value, formatting each distinct value once."""
+    distinct, inverse = np.unique(values, return_inverse=True)
+    return np.array([template.format(v) for v in distinct.tolist()], dtype=object)[inverse.ravel()]
+
+
+def color_from_slope(color_slope, mean_color, baseline, valid):
+    """analyze_color_evolution's columns from g-r trend slopes (mag/day)."""
+    color_change_1yr = color_slope * 365
+    trend = np.select(
+        [~valid, np.abs(color_slope) < STABLE_SLOPE, color_slope > STABLE_SLOPE],
+        [0, 1, 2], default=3)
+    status = np.array(['UNKNOWN', 'STABLE', None, None], dtype=object)[trend]
+    reddening, blueing = trend == 2, trend == 3
+    status[reddening] = _format_distinct('REDDENING (Δ(g-r) = +{:.2f} mag/yr)',
+                                         np.abs(color_change_1yr[reddening]))
+    status[blueing] = _format_distinct('BLUEING (Δ(g-r) = {:.2f} mag/yr)', color_change_1yr[blueing])
+
+    return pd.DataFrame({
+        'mean_color_gr': np.where(valid, mean_color, np.nan),
+        'color_slope_per_day': np.where(valid, color_slope, np.nan),
+        'color_change_1yr': np.where(valid, color_change_1yr, np.nan),
+        'is_significant_evolution': valid & (np.abs(np.nan_to_num(color_change_1yr)) > 0.1),
+        'status': status,
+        'baseline_days': np.where(valid, baseline, np.nan),
+        'valid': valid
+    })
+
+
+def analyze_batch(sources, lightcurves):
+    """
+    Batch equivalent of calling ZTFAnalyzer.analyze_source on every source.
+
+    Args:
+        sources: list of source dicts (RAdeg, DEdeg, Objname, ...)
+        lightcurves: light-curve dicts aligned with `sources` (None = no data),
+                     or a RaggedLightCurves covering every source
+
+    Returns:
+        DataFrame with the spectroscopy_candidates.csv columns; sources
+        without a light curve are dropped, as in the per-source loop
+    """
+    if isinstance(lightcurves, RaggedLightCurves):
+        lcs = lightcurves
+    else:
+        sources = [s for s, lc in zip(sources, lightcurves) if lc]
+        lcs = RaggedLightCurves.from_dicts([lc for lc in lightcurves if lc])
+
+    brightness = batch_brightness(lcs)
+    fading = batch_fading(lcs)
+    color = batch_color_evolution(lcs)
+    source_df = pd.DataFrame(sources)
+
+    def source_column(name, default):
+        if name in source_df.columns:
+            return source_df[name].to_numpy()
+        return np.full(len(source_df), default, dtype=object)
+
+    return pd.DataFrame({
+        'Objname': source_column('Objname', ''),
+        'RAdeg': source_column('RAdeg', np.nan),
+        'DEdeg': source_column('DEdeg', np.nan),
+        'YSO_CLASS': source_column('YSO_CLASS', ''),
+        'W2magMean': source_column('W2magMean', np.nan),
+
+        # Optical brightness
+        'r_mean': brightness['r_mean'],
+        'r_priority': brightness['priority'],
+
+        # Fading behavior
+        'fading_mag_per_year': fading['mag_change_1yr'],
+        'is_fading': fading['is_fading'],
+        'fading_status': fading['status'],
+
+        # Color evolution
+        'color_change_1yr': color['color_change_1yr'],
+        'is_reddening_bluing': color['is_significant_evolution'],
+        'color_status': color['status'],
+        'baseline_days': color['baseline_days']
+    })
+
+
+def pack_frame(df):
+    """
+    Compact column-array form of a result frame for sending between processes:
+    numeric columns as plain arrays, string columns as small integer codes
+    plus their categories, instead of a pickled list of row dicts.
+    """
+    columns = {}
+    for name in df.columns:
+        values = df[name].to_numpy()
+        if values.dtype.kind in 'biuf':
+            columns[name] = values
+        else:
+            codes, categories = pd.factorize(values, use_na_sentinel=False)
+            columns[name] = (codes.astype(np.int32), np.asarray(categories, dtype=object))
+    return columns
+
+
+def unpack_frames(packed):
+    """Concatenate packed frames, in the order given, back into one DataFrame."""
+    if not packed:
+        return pd.DataFrame()
+    columns = list(packed[0])
+    data = {}
+    for name in columns:
+        parts = []
+        for frame in packed:
+            values = frame[name]
+            if isinstance(values, tuple):
+                codes, categories = values
+                values = categories[codes]
+            parts.append(values)
+        data[name] = np.concatenate(parts)
+    return pd.DataFrame(data, columns=columns)
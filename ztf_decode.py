@@ -0,0 +1,298 @@
+"""
+ZTF Light-Curve Response Decoding
+=================================
+
+Turns IRSA light-curve service output into typed NumPy columns (mjd, mag,
+magerr, filtercode, catflags) without a Python loop over observations:
+1. CSV is read by pandas' C parser, restricted to the needed columns
+2. IPAC tables are typed from their '|' header lines and decoded as a
+   fixed-width byte matrix, one vectorized conversion per column (the same
+   machinery as yso_utils.read_mrt_table)
+3. JSON is accepted as raw text, as the parsed {'result': [...]} document,
+   as a list of observation dicts or as a dict of columns
+4. Quality masking (flagged epochs, non-finite values, large errors) and
+   the split into g / r light curves are array operations
+
+Object ids and positions (oid, ra, dec) are decoded on request, for
+splitting multi-target cone searches (ztf_query_plan).
+
+ZTF filter codes are 'zg', 'zr' and 'zi'; plain 'g' / 'r' are accepted too.
+"""
+
+import io
+import json
+from typing import NamedTuple, Optional
+
+import numpy as np
+import pandas as pd
+
+from yso_utils import MRTColumn, decode_column, fixed_width_records
+
+FIELDS = ('mjd', 'mag', 'magerr', 'filtercode', 'catflags')
+POSITION_FIELDS = ('oid', 'ra', 'dec')
+FORMATS = ('json', 'csv', 'ipac')
+
+# Any set catflags bit marks a problem epoch (IRSA recommends catflags == 0)
+BAD_CATFLAGS = 0xFFFF
+
+_IPAC_TYPES = {
+    'char': 'A', 'c': 'A', 'date': 'A',
+    'int': 'I', 'i': 'I', 'long': 'I', 'l': 'I', 'short': 'I',
+    'double': 'F', 'd': 'F', 'float': 'F', 'f': 'F', 'real': 'F', 'r': 'F',
+}
+
+
+class ZTFObservations(NamedTuple):
+    """Decoded epochs of one response, one array per field."""
+    mjd: np.ndarray         # float64
+    mag: np.ndarray         # float64, NaN where missing
+    magerr: np.ndarray      # float64, NaN where missing
+    filtercode: np.ndarray  # str, e.g. 'zg'
+    catflags: np.ndarray    # int64, 0 where missing
+    oid: Optional[np.ndarray] = None  # int64, -1 where missing (positions=True only)
+    ra: Optional[np.ndarray] = None   # float64 degrees (positions=True only)
+    dec: Optional[np.ndarray] = None
+
+    @property
+    def n_epochs(self) -> int:
+        return len(self.mjd)
+
+    def take(self, index) -> 'ZTFObservations':
+        """The epochs selected by an integer or boolean index."""
+        return ZTFObservations(*(None if values is None else values[index] for values in self))
+
+
+def _as_float(values) -> np.ndarray:
+    try:
+        return np.asarray(values, dtype=np.float64)
+    except (TypeError, ValueError):
+        return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(dtype=np.float64)
+
+
+def _as_int(values, fill) -> np.ndarray:
+    if isinstance(values, pd.api.extensions.ExtensionArray):
+        return values.to_numpy(dtype=np.int64, na_value=fill)
+    values = np.asarray(values)
+    if values.dtype.kind in 'iub':
+        return values.astype(np.int64)
+    return np.nan_to_num(_as_float(values), nan=fill).astype(np.int64)
+
+
+def _observations(columns, n) -> ZTFObservations:
+    """
+    Typed ZTFObservations from a mapping of field -> sequence; absent FIELDS
+    are filled, absent POSITION_FIELDS stay None.
+    """
+    def field(name, fill):
+        values = columns.get(name)
+        return np.full(n, fill) if values is None else values
+
+    filtercode = field('filtercode', '')
+    if not (isinstance(filtercode, np.ndarray) and filtercode.dtype.kind == 'U'):
+        filtercode = pd.Series(filtercode, dtype=object).fillna('').to_numpy(dtype=str)
+    return ZTFObservations(
+        mjd=_as_float(field('mjd', np.nan)),
+        mag=_as_float(field('mag', np.nan)),
+        magerr=_as_float(field('magerr', np.nan)),
+        filtercode=filtercode,
+        catflags=_as_int(field('catflags', 0), 0),
+        oid=_as_int(columns['oid'], -1) if 'oid' in columns else None,
+        ra=_as_float(columns['ra']) if 'ra' in columns else None,
+        dec=_as_float(columns['dec']) if 'dec' in columns else None,
+    )
+
+
+def decode_json(payload, fields=FIELDS) -> ZTFObservations:
+    """
+    Decode a JSON response: raw text/bytes, the parsed document (observations
+    under 'result'), a list of observation dicts, or a dict of columns.
+    """
+    if isinstance(payload, (bytes, bytearray, str)):
+        payload = json.loads(payload) if payload.strip() else []
+    if isinstance(payload, dict) and 'result' in payload:
+        payload = payload['result'] or []
+    if isinstance(payload, dict):
+        n = len(next(iter(payload.values()), []))
+        return _observations({name: payload[name] for name in fields if name in payload}, n)
+    rows = list(payload)
+    columns = {name: [row.get(name) for row in rows] for name in fields
+               if any(name in row for row in rows)}
+    return _observations(columns, len(rows))
+
+
+def _field_block(buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """(n_rows, width) byte matrix of the fields buffer[starts:ends], space padded."""
+    width = max(int((ends - starts).max()), 1) if len(starts) else 1
+    index = starts[:, None] + np.arange(width)
+    inside = index < ends[:, None]
+    block = np.where(inside, buffer[np.minimum(index, len(buffer) - 1)], ord(' ')).astype(np.uint8)
+    block[block == ord('\r')] = ord(' ')
+    return block
+
+
+def _decode_fields(blocks) -> ZTFObservations:
+    """ZTFObservations from {field: byte matrix}, typed like the IPAC columns."""
+    n = len(next(iter(blocks.values()))) if blocks else 0
+    kinds = {'filtercode': 'A', 'catflags': 'I', 'oid': 'I'}
+    return _observations({name: decode_column(block, MRTColumn(0, block.shape[1], kinds.get(name, 'F'), '', name),
+                                                 mask_null_values=False)
+                          for name, block in blocks.items()}, n)
+
+
+def decode_csv(payload, fields=FIELDS) -> ZTFObservations:
+    """
+    Decode a CSV response (header row with IRSA column names).
+
+    IRSA writes unquoted fields, so every row has the same number of commas:
+    the separator positions of all rows come from one scan of the buffer and
+    only the wanted fields are cut out and converted. Anything irregular
+    (quotes, blank lines, ragged rows) goes through pandas.read_csv instead.
+    """
+    if isinstance(payload, str):
+        payload = payload.encode()
+    if not payload.strip():
+        return _observations({}, 0)
+    if not payload.endswith(b'\n'):
+        payload += b'\n'
+    header_end = payload.index(b'\n')
+    names = [name.strip() for name in payload[:header_end].decode().split(',')]
+    body = np.frombuffer(payload, dtype=np.uint8, offset=header_end + 1)
+
+    separators = np.flatnonzero((body == ord(',')) | (body == ord('\n')))
+    regular = b'"' not in payload and len(separators) % len(names) == 0
+    if regular:
+        separators = separators.reshape(-1, len(names))
+        regular = bool((body[separators[:, -1]] == ord('\n')).all())
+    if not regular:
+        df = pd.read_csv(io.BytesIO(payload), usecols=lambda name: name.strip() in fields,
+                         dtype={'filtercode': str}, skipinitialspace=True)
+        df.columns = df.columns.str.strip()
+        return _observations({name: df[name].to_numpy() for name in df.columns}, len(df))
+
+    if not len(separators):
+        return _observations({}, 0)
+    row_starts = np.concatenate(([0], separators[:-1, -1] + 1))
+    blocks = {}
+    for j, name in enumerate(names):
+        if name in fields:
+            starts = row_starts if j == 0 else separators[:, j - 1] + 1
+            blocks[name] = _field_block(body, starts, separators[:, j])
+    return _decode_fields(blocks) if blocks else _observations({}, len(separators))
+
+
+def _ipac_columns(header_lines):
+    """MRTColumn per IPAC table column from its '|' header lines."""
+    names_line = header_lines[0]
+    pipes = [i for i, char in enumerate(names_line) if char == '|']
+    fields = [[line[a + 1:b].strip() for a, b in zip(pipes, pipes[1:])] for line in header_lines]
+    names = fields[0]
+    types = fields[1] if len(fields) > 1 else ['char'] * len(names)
+    nulls = fields[3] if len(fields) > 3 else ['null'] * len(names)
+    # A value may end under its closing '|', so each column runs up to and
+    # including that position
+    return [MRTColumn(start=a + 1, end=b + 1, fmt=_IPAC_TYPES.get(kind.lower(), 'A'), units='',
+                      label=name, null_value=null or None)
+            for a, b, name, kind, null in zip(pipes, pipes[1:], names, types, nulls)]
+
+
+def decode_ipac(payload, fields=FIELDS) -> ZTFObservations:
+    """Decode an IPAC table response ('\\' keyword lines, '|' header lines, fixed-width rows)."""
+    if isinstance(payload, str):
+        payload = payload.encode()
+    header = []
+    pos = 0
+    while payload[pos:pos + 1] in (b'\\', b'|'):
+        end = payload.find(b'\n', pos)
+        end = len(payload) if end < 0 else end
+        if payload[pos:pos + 1] == b'|':
+            header.append(payload[pos:end].rstrip(b'\r').decode())
+        pos = end + 1
+    if not header:
+        raise ValueError("IPAC table has no '|' header lines")
+
+    columns = [column for column in _ipac_columns(header) if column.label in fields]
+    width = max(len(header[0]), 1)
+    data = payload[pos:]
+    block = fixed_width_records(data.replace(b'\r', b'') if b'\r' in data else data, width)
+    decoded = {}
+    for column in columns:
+        values = decode_column(block[:, column.start:column.end], column,
+                                mask_null_values=column.fmt != 'A')
+        if column.fmt == 'A' and column.null_value is not None:
+            values = np.where(values == column.null_value, '', values)
+        decoded[column.label] = values
+    return _observations(decoded, len(block))
+
+
+def detect_format(payload) -> str:
+    """'json', 'csv' or 'ipac', from the payload's type and first character."""
+    if not isinstance(payload, (bytes, bytearray, str)):
+        return 'json'
+    text = payload.lstrip()[:1]
+    if isinstance(text, (bytes, bytearray)):
+        text = text.decode('ascii', 'replace')
+    if text in ('{', '['):
+        return 'json'
+    if text in ('\\', '|'):
+        return 'ipac'
+    if text == '<':
+        raise ValueError("VOTable / HTML responses are not supported; request CSV, IPAC_TABLE or JSON")
+    return 'csv'
+
+
+def decode_response(payload, fmt: Optional[str] = None, positions: bool = False) -> ZTFObservations:
+    """
+    Decode one light-curve service response.
+
+    Args:
+        payload: response body (bytes / str) or already-parsed JSON
+        fmt: 'json', 'csv' or 'ipac' (default: detected from the payload)
+        positions: also decode oid, ra and dec
+    """
+    fmt = (fmt or detect_format(payload)).lower()
+    fields = FIELDS + POSITION_FIELDS if positions else FIELDS
+    if fmt in ('ipac', 'ipac_table'):
+        return decode_ipac(payload, fields)
+    if fmt == 'csv':
+        return decode_csv(payload, fields)
+    if fmt == 'json':
+        return decode_json(payload, fields)
+    raise ValueError(f"Unknown response format {fmt!r}; expected one of {FORMATS}")
+
+
+def quality_mask(obs: ZTFObservations, bad_flags: int = BAD_CATFLAGS,
+                 max_magerr: Optional[float] = None) -> np.ndarray:
+    """
+    Boolean mask of usable epochs: finite mjd and mag, none of the
+    `bad_flags` catflags bits set, and magerr <= max_magerr when given.
+    """
+    good = np.isfinite(obs.mjd) & np.isfinite(obs.mag) & ((obs.catflags & bad_flags) == 0)
+    if max_magerr is not None:
+        with np.errstate(invalid='ignore'):
+            good &= obs.magerr <= max_magerr
+    return good
+
+
+def band_codes(filtercode: np.ndarray) -> np.ndarray:
+    """Filter codes as plain band letters ('zg' -> 'g', 'R' -> 'r')."""
+    codes, uniques = pd.factorize(filtercode)
+    lowered = [str(code).strip().lower() for code in uniques]
+    bands = np.array([code[1:] if code.startswith('z') else code for code in lowered] + [''], dtype=str)
+    return bands[codes]
+
+
+def to_lightcurve(obs: ZTFObservations, bad_flags: int = BAD_CATFLAGS,
+                  max_magerr: Optional[float] = None):
+    """
+    Light-curve dict (times_g, g, times_r, r) of the usable epochs, each band
+    sorted by time; None if neither band has any.
+    """
+    good = quality_mask(obs, bad_flags, max_magerr)
+    bands = band_codes(obs.filtercode)
+    lc_dict = {}
+    for band in ('g', 'r'):
+        selected = np.flatnonzero(good & (bands == band))
+        selected = selected[np.argsort(obs.mjd[selected], kind='stable')]
+        lc_dict[f'times_{band}'] = obs.mjd[selected]
+        lc_dict[band] = obs.mag[selected]
+    return lc_dict if (len(lc_dict['g']) or len(lc_dict['r'])) else None
@@ -0,0 +1,186 @@
+"""
+Concurrent ZTF Light-Curve Fetching
+===================================
+
+Batched access to the IRSA ZTF light-curve service:
+1. One pooled HTTP session shared by all worker threads
+2. Bounded concurrency (thread pool)
+3. Optional per-host rate limiting (off by default: the worker count bounds
+   the load, and a cap below workers / latency would serialize them)
+4. Retry with exponential backoff on timeouts, 429 and 5xx responses,
+   waiting as long as a Retry-After header asks when the server sends one
+5. Progress reporting
+
+Responses are requested as CSV by default and returned as raw bytes for
+ztf_decode, which parses them column-wise; FORMAT=JSON responses are
+returned as the parsed 'result' list.
+
+The endpoint is configurable so the fetcher can be pointed at a local stub
+server that imitates nph_light_curve_search.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ZTF_LIGHTCURVE_URL = "https://irsa.ipac.caltech.edu/cgi-bin/ZTF/nph_light_curve_search"
+ZTF_SEARCH_RADIUS = 0.0014  # degrees, ~5 arcsec
+ZTF_RESPONSE_FORMAT = 'CSV'  # or 'IPAC_TABLE' / 'JSON'
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class RateLimiter:
+    """
+    Thread-safe per-host request spacing.
+    Each host gets at most `requests_per_second` request starts per second.
+    """
+
+    def __init__(self, requests_per_second=5.0):
+        self.interval = 1.0 / requests_per_second if requests_per_second else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url):
+        """Block until a request to this URL's host may start."""
+        if self.interval <= 0:
+            return
+        host = urlparse(url).netloc
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            time.sleep(delay)
+
+
+def print_progress(done, total, every=10, label='Fetched'):
+    """Default progress reporter, in the style of the per-source loop output."""
+    if done % every == 0 or done == total:
+        print(f"  {label}: {done}/{total}")
+
+
+class ZTFFetcher:
+    """
+    Fetch raw ZTF light curves for many sky positions concurrently.
+    Returns the response body (or JSON 'result' list) for each position, or
+    None on failure.
+
+    requests_per_second caps request starts per host (None = no cap, only
+    max_workers requests in flight). A Retry-After header on a 429 or 5xx
+    response replaces the backoff delay, up to max_retry_after seconds.
+    """
+
+    def __init__(self, ztf_token, base_url=ZTF_LIGHTCURVE_URL, max_workers=8,
+                 requests_per_second=None, max_retries=3, backoff=0.5, timeout=5,
+                 radius=ZTF_SEARCH_RADIUS, response_format=ZTF_RESPONSE_FORMAT,
+                 max_retry_after=60.0):
+        self.ztf_token = ztf_token
+        self.base_url = base_url
+        self.max_workers = max_workers
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_retry_after = max_retry_after
+        self.timeout = timeout
+        self.radius = radius
+        self.response_format = response_format.upper()
+        self.rate_limiter = RateLimiter(requests_per_second)
+
+        # One connection pool sized to the worker count, reused for every request
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def _params(self, ra, dec, radius=None):
+        return {
+            'RA': ra,
+            'DEC': dec,
+            'RADIUS': self.radius if radius is None else radius,
+            'BANDLIST': 'g,r',
+            'FORMAT': self.response_format,
+            'APIKEY': self.ztf_token
+        }
+
+    def _retry_delay(self, attempt, response=None):
+        """Seconds to wait before retry number attempt + 1."""
+        delay = self.backoff * 2 ** attempt
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after:
+            try:
+                requested = float(retry_after)
+            except ValueError:
+                # HTTP-date form
+                try:
+                    requested = parsedate_to_datetime(retry_after).timestamp() - time.time()
+                except (TypeError, ValueError):
+                    return delay
+            delay = min(max(requested, 0.0), self.max_retry_after)
+        return delay
+
+    def fetch(self, ra, dec, radius=None):
+        """
+        Fetch one light curve with rate limiting and retry.
+
+        Returns:
+            the response body as bytes for CSV / IPAC_TABLE, the list of
+            observation dicts for JSON ([] if ZTF has no data for the
+            position), or None if every attempt failed
+        """
+        params = self._params(ra, dec, radius)
+        delay = 0.0
+        for attempt in range(self.max_retries + 1):
+            if attempt:
+                time.sleep(delay)
+            self.rate_limiter.wait(self.base_url)
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+            except requests.RequestException:
+                delay = self._retry_delay(attempt)
+                continue
+
+            if response.status_code == 200:
+                if self.response_format != 'JSON':
+                    return response.content
+                try:
+                    data = response.json()
+                except ValueError:
+                    return None
+                if data and 'result' in data:
+                    return data['result']
+                return []
+            if response.status_code not in RETRY_STATUS_CODES:
+                return None
+            delay = self._retry_delay(attempt, response)
+        return None
+
+    def fetch_many(self, positions, progress=print_progress):
+        """
+        Fetch light curves for many (ra, dec) positions concurrently.
+
+        Args:
+            positions: sequence of (ra, dec) pairs, or (ra, dec, radius) for
+                       cones wider than the fetcher's radius
+            progress: callable(done, total) invoked as requests finish, or None
+
+        Returns:
+            list of results aligned with `positions`
+        """
+        positions = list(positions)
+        results = [None] * len(positions)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {pool.submit(self.fetch, *position): i for i, position in enumerate(positions)}
+            for done, future in enumerate(as_completed(futures), start=1):
+                results[futures[future]] = future.result()
+                if progress:
+                    progress(done, len(positions))
+        return results
+
+    def close(self):
+        self.session.close()
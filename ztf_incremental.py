@@ -0,0 +1,185 @@
+"""
+Incremental Light-Curve Trends
+==============================
+
+Keeps per-source running statistics so nightly ZTF epochs can be folded in
+without refitting the whole history:
+1. For each source and band, and for the series of same-night g-r colors
+   (ztf_batch.nightly_colors): point count, mean time, mean value, the
+   time second moment sum((t - mean_t)^2), the time-value co-moment and
+   the first/last time. These are the sufficient statistics of the
+   least-squares trend, stored in centered form (Welford/Chan, as in
+   yso_utils.CorrelationAccumulator) so large MJDs lose no precision
+2. update() computes the statistics of the new epochs only, with segment
+   reductions over a RaggedLightCurves, and merges them in O(new points)
+3. Trend slopes, 1-year changes and statuses are then O(1) per source
+
+The fading columns match ztf_batch.batch_fading on the full history, and
+the color columns ztf_batch.batch_paired_color_evolution, to floating-point
+tolerance, provided each night's g and r epochs arrive in the same update.
+The interpolated common-grid fit of analyze_color_evolution depends on
+every epoch through its grid and cannot be updated incrementally, so the
+color trend here is the paired-night fit instead.
+"""
+
+from collections import Counter
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+from ztf_batch import (
+    BANDS, COLOR_MIN_BASELINE, COLOR_MIN_OBS, RaggedLightCurves,
+    color_from_slope, fading_from_slope, nightly_colors, segment_mean, segment_reduce, segment_sum
+)
+
+_STATS = ('n', 'mean_t', 'mean_m', 'm2_t', 'comoment', 't_min', 't_max')
+# Trend series: the two bands plus the same-night g-r color
+_SERIES = BANDS + ('gr',)
+
+
+def _segment_stats(t, m, offsets):
+    """Sufficient statistics of every segment of a ragged (time, value) series."""
+    ids = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    mean_t = np.nan_to_num(segment_mean(t, offsets))
+    mean_m = np.nan_to_num(segment_mean(m, offsets))
+    dt = t - mean_t[ids]
+    dm = m - mean_m[ids]
+    return {
+        'n': np.diff(offsets).astype(np.float64),
+        'mean_t': mean_t,
+        'mean_m': mean_m,
+        'm2_t': segment_sum(dt * dt, offsets),
+        'comoment': segment_sum(dt * dm, offsets),
+        't_min': segment_reduce(np.minimum, t, offsets, empty=np.inf),
+        't_max': segment_reduce(np.maximum, t, offsets, empty=-np.inf),
+    }
+
+
+class IncrementalTrends:
+    """
+    Running trend statistics of many sources, keyed by source name.
+    """
+
+    def __init__(self):
+        self.names: List[str] = []
+        self._index: Dict[str, int] = {}
+        self.stats = {series: {key: np.zeros(0) for key in _STATS} for series in _SERIES}
+
+    def __len__(self):
+        return len(self.names)
+
+    def _rows(self, names) -> np.ndarray:
+        """Row of each name, adding rows for names not seen before."""
+        new = [name for name in dict.fromkeys(names) if name not in self._index]
+        if new:
+            for name in new:
+                self._index[name] = len(self.names)
+                self.names.append(name)
+            for series in _SERIES:
+                for key in _STATS:
+                    fill = {'t_min': np.inf, 't_max': -np.inf}.get(key, 0.0)
+                    self.stats[series][key] = np.concatenate((self.stats[series][key], np.full(len(new), fill)))
+        return np.fromiter((self._index[name] for name in names), dtype=np.int64, count=len(names))
+
+    def update(self, names, lightcurves) -> 'IncrementalTrends':
+        """
+        Fold new epochs into the running statistics.
+
+        Args:
+            names: source names, aligned with lightcurves (each at most once)
+            lightcurves: RaggedLightCurves or light-curve dicts holding only
+                         epochs not seen before (None = nothing new); a
+                         night's g and r epochs must arrive together for
+                         their color pair to count
+        """
+        names = list(names)
+        if len(set(names)) < len(names):
+            # Repeated rows would be merged only once by the fancy-indexed updates
+            repeated = sorted(name for name, count in Counter(names).items() if count > 1)
+            raise ValueError(f"Source names repeated in one update: {repeated[:5]}; "
+                             "combine their epochs into one light curve first")
+        if not isinstance(lightcurves, RaggedLightCurves):
+            lightcurves = RaggedLightCurves.from_dicts(lightcurves)
+        rows = self._rows(names)
+
+        for band in BANDS:
+            self._merge_rows(band, rows, _segment_stats(lightcurves.times[band], lightcurves.mags[band],
+                                                        lightcurves.offsets[band]))
+        self._merge_rows('gr', rows, _segment_stats(*nightly_colors(lightcurves)))
+        return self
+
+    def _merge_rows(self, series, rows, batch):
+        """Chan et al. merge of per-row batch statistics into the given rows."""
+        state = self.stats[series]
+        n_a, n_b = state['n'][rows], batch['n']
+        n = n_a + n_b
+        with np.errstate(invalid='ignore', divide='ignore'):
+            weight = np.where(n > 0, n_a * n_b / n, 0.0)
+            frac = np.where(n > 0, n_b / n, 0.0)
+        delta_t = batch['mean_t'] - state['mean_t'][rows]
+        delta_m = batch['mean_m'] - state['mean_m'][rows]
+
+        state['comoment'][rows] += batch['comoment'] + delta_t * delta_m * weight
+        state['m2_t'][rows] += batch['m2_t'] + delta_t * delta_t * weight
+        state['mean_t'][rows] += delta_t * frac
+        state['mean_m'][rows] += delta_m * frac
+        state['n'][rows] = n
+        state['t_min'][rows] = np.minimum(state['t_min'][rows], batch['t_min'])
+        state['t_max'][rows] = np.maximum(state['t_max'][rows], batch['t_max'])
+
+    def merge(self, other: 'IncrementalTrends') -> 'IncrementalTrends':
+        """Combine statistics accumulated separately (e.g. on another shard or night)."""
+        rows = self._rows(other.names)
+        for series in _SERIES:
+            self._merge_rows(series, rows, {key: other.stats[series][key] for key in _STATS})
+        return self
+
+    def slope(self, series) -> np.ndarray:
+        """Least-squares trend of a band or of 'gr' vs. time (mag/day); NaN below 2 points."""
+        state = self.stats[series]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(state['n'] >= 2, state['comoment'] / state['m2_t'], np.nan)
+
+    def fading(self) -> pd.DataFrame:
+        """batch_fading columns (r band), one row per source."""
+        return fading_from_slope(self.slope('r'), self.stats['r']['n'].astype(np.int64))
+
+    def color_evolution(self) -> pd.DataFrame:
+        """batch_paired_color_evolution columns, one row per source."""
+        color = self.stats['gr']
+        baseline = color['t_max'] - color['t_min']
+        with np.errstate(invalid='ignore'):
+            valid = (color['n'] >= COLOR_MIN_OBS) & (baseline >= COLOR_MIN_BASELINE)
+        return color_from_slope(self.slope('gr'), color['mean_m'], baseline, valid)
+
+    def summary(self) -> pd.DataFrame:
+        """Fading and color trend columns of every source, indexed by name."""
+        fading = self.fading()
+        color = self.color_evolution()
+        return pd.DataFrame({
+            'n_r': fading['n_observations'].to_numpy(),
+            'n_g': self.stats['g']['n'].astype(np.int64),
+            'fading_mag_per_year': fading['mag_change_1yr'].to_numpy(),
+            'is_fading': fading['is_fading'].to_numpy(),
+            'fading_status': fading['status'].to_numpy(),
+            'color_change_1yr': color['color_change_1yr'].to_numpy(),
+            'is_reddening_bluing': color['is_significant_evolution'].to_numpy(),
+            'color_status': color['status'].to_numpy(),
+            'baseline_days': color['baseline_days'].to_numpy(),
+        }, index=pd.Index(self.names, name='Objname'))
+
+    def save(self, path):
+        """Store the statistics as one .npz file."""
+        arrays = {f'{series}_{key}': self.stats[series][key] for series in _SERIES for key in _STATS}
+        np.savez(path, names=np.array(self.names, dtype=str), **arrays)
+
+    @classmethod
+    def load(cls, path) -> 'IncrementalTrends':
+        trends = cls()
+        with np.load(path, allow_pickle=False) as data:
+            trends.names = data['names'].tolist()
+            trends._index = {name: i for i, name in enumerate(trends.names)}
+            trends.stats = {series: {key: data[f'{series}_{key}'].copy() for key in _STATS}
+                            for series in _SERIES}
+        return trends
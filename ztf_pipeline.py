@@ -0,0 +1,218 @@
+"""
+Pipelined ZTF Fetch and Analysis
+================================
+
+Overlaps network waits with decoding and analysis, so a run takes roughly
+max(network, compute) instead of their sum:
+1. Read stage: sources are taken in chunks of whole query groups (one
+   source per group, or nearby sources sharing a cone search when the
+   analyzer has a group_radius, see ztf_query_plan); each chunk's cached
+   light curves come from the store, its misses are submitted to the
+   fetcher's thread pool
+2. Decode stage: waits for a chunk's responses, decodes them (splitting
+   group responses by position), records them in the store and falls back
+   to synthetic curves where ZTF had no data
+3. Analysis stage (calling thread): brightness, fading and color evolution
+   of each complete chunk via ztf_batch.analyze_batch
+
+The stages are joined by bounded queues. When analysis falls behind, the
+decode stage blocks, then the read stage stops submitting fetches once
+`max_chunks_in_flight` chunks are waiting to be decoded, which bounds both
+memory and the number of queued requests.
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from ztf_batch import analyze_batch
+from ztf_query_plan import QueryGroup, enclosing_cone, plan_queries, split_response
+
+DEFAULT_CHUNK_SIZE = 64
+DEFAULT_CHUNKS_IN_FLIGHT = 4
+
+_DONE = object()
+
+
+class _Stage(threading.Thread):
+    """Worker thread that records its exception and always signals the next stage."""
+
+    def __init__(self, name, target, output, stop):
+        super().__init__(name=name, daemon=True)
+        self._target_func = target
+        self.output = output
+        self.stop = stop
+        self.error = None
+
+    def run(self):
+        try:
+            self._target_func()
+        except BaseException as exc:  # re-raised by the calling thread
+            self.error = exc
+            self.stop.set()
+        finally:
+            _put(self.output, _DONE, self.stop, force=True)
+
+
+def _put(q, item, stop, force=False):
+    """Blocking put that gives up once `stop` is set (unless forced)."""
+    while True:
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            if stop.is_set():
+                if not force:
+                    return False
+                # Make room for the end marker: the consumer is gone or stopping
+                try:
+                    q.get_nowait()
+                except queue.Empty:
+                    pass
+
+
+def _get(q, stop):
+    """Blocking get that returns _DONE once `stop` is set."""
+    while True:
+        try:
+            return q.get(timeout=0.1)
+        except queue.Empty:
+            if stop.is_set():
+                return _DONE
+
+
+def analyze_pipelined(analyzer, sources, chunk_size=DEFAULT_CHUNK_SIZE,
+                      max_chunks_in_flight=DEFAULT_CHUNKS_IN_FLIGHT, progress=None):
+    """
+    Fetch and analyze sources in overlapping stages.
+
+    Args:
+        analyzer: ZTFAnalyzer (its fetcher, store and search radius are used)
+        sources: list of source dicts with RAdeg, DEdeg and Objname
+        chunk_size: sources per analysis batch
+        max_chunks_in_flight: chunks fetched ahead of the analysis
+        progress: callable(done, total) invoked as chunks are analyzed, or None
+
+    Returns:
+        DataFrame with the same rows as analyzer.analyze_sources(sources)
+    """
+    fetcher = analyzer.fetcher
+    store = analyzer.store
+    radius = analyzer.search_radius
+    ra = np.array([s['RAdeg'] for s in sources], dtype=np.float64)
+    dec = np.array([s['DEdeg'] for s in sources], dtype=np.float64)
+    groups = plan_queries(ra, dec, radius, analyzer.group_radius)
+    # Sources without a position are queried alone, as by query_ztf_lightcurves
+    planned = np.zeros(len(sources), dtype=bool)
+    for group in groups:
+        planned[group.members] = True
+    groups += [QueryGroup(np.array([i]), ra[i], dec[i], radius) for i in np.flatnonzero(~planned)]
+
+    chunks, current, size = [], [], 0
+    for group in groups:
+        current.append(group)
+        size += len(group.members)
+        if size >= chunk_size:
+            chunks.append(current)
+            current, size = [], 0
+    if current:
+        chunks.append(current)
+
+    stop = threading.Event()
+    fetching = queue.Queue(maxsize=max_chunks_in_flight)
+    decoded = queue.Queue(maxsize=1)
+
+    with ThreadPoolExecutor(max_workers=fetcher.max_workers, thread_name_prefix='ztf-fetch') as pool:
+        def read():
+            for chunk in chunks:
+                if stop.is_set():
+                    return
+                stored = {}
+                if store is not None:
+                    rows = np.concatenate([group.members for group in chunk])
+                    lookups = store.get_many([(ra[i], dec[i], radius) for i in rows])
+                    stored = {i: lc for i, lc in zip(rows, lookups) if lc is not None}
+                queries = []
+                for group in chunk:
+                    cached = {i: stored[i] for i in group.members if i in stored}
+                    missing = [i for i in group.members if i not in cached]
+                    future = None
+                    if len(missing) == 1:
+                        future = pool.submit(fetcher.fetch, ra[missing[0]], dec[missing[0]])
+                    elif missing:
+                        cone = enclosing_cone(ra[missing], dec[missing], radius, centre=(group.ra, group.dec))
+                        future = pool.submit(fetcher.fetch, *cone)
+                    queries.append((group.members, cached, missing, future))
+                if not _put(fetching, queries, stop):
+                    return
+
+        def decode():
+            while True:
+                queries = _get(fetching, stop)
+                if queries is _DONE:
+                    return
+                rows, lightcurves, fetched_lcs = [], [], []
+                for members, cached, missing, future in queries:
+                    # (light curve, fetched) of each source that was queried
+                    found = {}
+                    if future is not None:
+                        result = future.result()
+                        if len(missing) == 1:
+                            lc_dict = analyzer._parse_ztf_response(result) if result else None
+                            found[missing[0]] = (lc_dict, result is not None)
+                        elif result is None:
+                            found = {i: (None, False) for i in missing}
+                        else:
+                            split = split_response(result, ra[missing], dec[missing], radius)
+                            found = {i: (lc_dict, True) for i, lc_dict in zip(missing, split)}
+                    for i in members:
+                        s = sources[i]
+                        if i in cached:
+                            lc_dict = cached[i]
+                        else:
+                            lc_dict, fetched = found[i]
+                            if fetched:
+                                fetched_lcs.append((ra[i], dec[i], radius, lc_dict))
+                        rows.append(i)
+                        lightcurves.append(analyzer._real_or_synthetic(lc_dict, s['Objname'], s['RAdeg'], s['DEdeg']))
+                # One store transaction per chunk; failed queries are not stored
+                if store is not None:
+                    store.put_many(fetched_lcs)
+                if not _put(decoded, (rows, lightcurves), stop):
+                    return
+
+        stages = [_Stage('ztf-read', read, fetching, stop), _Stage('ztf-decode', decode, decoded, stop)]
+        for stage in stages:
+            stage.start()
+
+        frames, order = [], []
+        try:
+            while True:
+                item = _get(decoded, stop)
+                if item is _DONE:
+                    break
+                rows, lightcurves = item
+                frames.append(analyze_batch([sources[i] for i in rows], lightcurves))
+                # analyze_batch drops sources without a light curve
+                order.extend(i for i, lc in zip(rows, lightcurves) if lc)
+                if progress:
+                    progress(len(frames), len(chunks))
+        finally:
+            if len(frames) < len(chunks):
+                stop.set()
+            for stage in stages:
+                stage.join()
+            if stop.is_set():
+                pool.shutdown(wait=True, cancel_futures=True)
+
+    for stage in stages:
+        if stage.error is not None:
+            raise stage.error
+    if not frames:
+        return analyze_batch([], [])
+    # Chunks follow the query plan; restore the input order
+    result = pd.concat(frames, ignore_index=True)
+    return result.take(np.argsort(order, kind='stable')).reset_index(drop=True)
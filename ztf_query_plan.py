@@ -0,0 +1,189 @@
+"""
+Spatially Clustered ZTF Query Planning
+======================================
+
+Targets in the same star-forming region share one cone search instead of
+issuing one per source:
+1. Targets are grouped greedily: the target with the most ungrouped
+   neighbours within max_radius - match_radius seeds a group with all of
+   them (KD-tree ball queries on unit vectors, as in crossmatch)
+2. Each group is covered by one cone whose radius is its largest member
+   offset plus match_radius, so it contains every object that a separate
+   match_radius search around any member would return
+3. The group's response is decoded with object ids and positions, and each
+   object (oid) goes to every member within match_radius of it, which is
+   what the separate searches would have returned
+4. A target without close neighbours keeps its own match_radius cone, i.e.
+   exactly the separate query
+
+Object positions are the mean of their epoch positions; objects lying
+within a fraction of an arcsec of a target's match-radius boundary can
+therefore fall on the other side of it than in the service's own match.
+"""
+
+from typing import List, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from scipy.spatial import cKDTree
+
+from crossmatch import ZTF_MATCH_RADIUS, SkyIndex, chord_length, chord_to_degrees, radec_to_unit
+from ztf_decode import decode_response, to_lightcurve
+
+DEFAULT_GROUP_RADIUS = 0.01  # degrees (36 arcsec); largest cone a group may use
+_RADIUS_MARGIN = 1e-7        # degrees, keeps members' cone edges inside the group cone
+
+
+class QueryGroup(NamedTuple):
+    """One planned cone search."""
+    members: np.ndarray  # target rows served by this query
+    ra: float
+    dec: float
+    radius: float        # degrees
+
+
+def _unit_to_radec(vector) -> Tuple[float, float]:
+    x, y, z = vector / np.linalg.norm(vector)
+    return float(np.degrees(np.arctan2(y, x)) % 360), float(np.degrees(np.arcsin(np.clip(z, -1, 1))))
+
+
+def enclosing_cone(ra, dec, match_radius=ZTF_MATCH_RADIUS, centre: Optional[Tuple[float, float]] = None):
+    """
+    (ra, dec, radius) of a cone containing the match_radius cone of every
+    target, centred on the targets' mean direction or on `centre` when that
+    gives the smaller cone.
+    """
+    ra = np.atleast_1d(np.asarray(ra, dtype=np.float64))
+    dec = np.atleast_1d(np.asarray(dec, dtype=np.float64))
+    if len(ra) == 1:
+        return float(ra[0]), float(dec[0]), match_radius
+    unit = radec_to_unit(ra, dec)
+    candidates = [_unit_to_radec(unit.mean(axis=0))]
+    if centre is not None:
+        candidates.append((float(centre[0]), float(centre[1])))
+    best = None
+    for c_ra, c_dec in candidates:
+        offset = chord_to_degrees(np.linalg.norm(unit - radec_to_unit([c_ra], [c_dec]), axis=1)).max()
+        if best is None or offset < best[2]:
+            best = (c_ra, c_dec, offset)
+    return best[0], best[1], best[2] + match_radius + _RADIUS_MARGIN
+
+
+def plan_queries(ra, dec, match_radius=ZTF_MATCH_RADIUS,
+                 max_radius: Optional[float] = DEFAULT_GROUP_RADIUS) -> List[QueryGroup]:
+    """
+    Group targets into cone searches of at most max_radius degrees.
+
+    Args:
+        ra, dec: target positions in degrees
+        match_radius: per-target search radius
+        max_radius: largest group cone (None = one query per target)
+
+    Returns:
+        QueryGroups covering every target with a finite position exactly
+        once, ordered by their first member
+    """
+    ra = np.asarray(ra, dtype=np.float64)
+    dec = np.asarray(dec, dtype=np.float64)
+    valid = np.flatnonzero(np.isfinite(ra) & np.isfinite(dec))
+    if max_radius is None or max_radius <= match_radius or len(valid) < 2:
+        return [QueryGroup(np.array([i]), float(ra[i]), float(dec[i]), match_radius) for i in valid]
+
+    unit = radec_to_unit(ra[valid], dec[valid])
+    neighbours = cKDTree(unit).query_ball_point(unit, chord_length(max_radius - match_radius))
+    counts = np.fromiter((len(n) for n in neighbours), dtype=np.int64, count=len(valid))
+
+    grouped = np.zeros(len(valid), dtype=bool)
+    groups = []
+    # Densest targets seed first, so clumps are not split by stray members
+    for seed in np.argsort(-counts, kind='stable'):
+        if grouped[seed]:
+            continue
+        members = np.array(sorted(j for j in neighbours[seed] if not grouped[j]))
+        grouped[members] = True
+        rows = valid[members]
+        c_ra, c_dec, radius = enclosing_cone(ra[rows], dec[rows], match_radius,
+                                             centre=(ra[valid[seed]], dec[valid[seed]]))
+        groups.append(QueryGroup(rows, c_ra, c_dec, radius))
+    groups.sort(key=lambda group: group.members[0])
+    return groups
+
+
+def split_response(payload, ra, dec, match_radius=ZTF_MATCH_RADIUS):
+    """
+    Per-target light curves from one group cone search.
+
+    Args:
+        payload: the group's response (any format ztf_decode reads)
+        ra, dec: positions of the targets the cone was planned for
+
+    Returns:
+        light-curve dicts aligned with the targets (None = no usable epochs)
+    """
+    ra = np.atleast_1d(np.asarray(ra, dtype=np.float64))
+    dec = np.atleast_1d(np.asarray(dec, dtype=np.float64))
+    obs = decode_response(payload, positions=True) if payload else None
+    if obs is None or obs.n_epochs == 0:
+        return [None] * len(ra)
+    if obs.ra is None or obs.dec is None:
+        raise ValueError("Group responses need ra/dec columns to assign epochs to targets")
+
+    object_ids = obs.oid if obs.oid is not None else np.arange(obs.n_epochs)
+    codes, _ = pd.factorize(object_ids)
+    n_objects = codes.max() + 1
+    unit = radec_to_unit(obs.ra, obs.dec)
+    # Mean direction of each object's epochs
+    centres = np.column_stack([np.bincount(codes, weights=unit[:, k], minlength=n_objects) for k in range(3)])
+    centres /= np.linalg.norm(centres, axis=1, keepdims=True)
+    object_ra = np.degrees(np.arctan2(centres[:, 1], centres[:, 0])) % 360
+    object_dec = np.degrees(np.arcsin(np.clip(centres[:, 2], -1, 1)))
+
+    objects, targets, _ = SkyIndex(ra, dec).query_radius(object_ra, object_dec, match_radius)
+    epoch_order = np.argsort(codes, kind='stable')
+    offsets = np.concatenate(([0], np.cumsum(np.bincount(codes, minlength=n_objects))))
+
+    lightcurves = []
+    for target in range(len(ra)):
+        mine = objects[targets == target]
+        if len(mine) == 0:
+            lightcurves.append(None)
+            continue
+        epochs = np.concatenate([epoch_order[offsets[k]:offsets[k + 1]] for k in mine])
+        lightcurves.append(to_lightcurve(obs.take(np.sort(epochs))))
+    return lightcurves
+
+
+def fetch_planned(fetcher, ra, dec, match_radius=ZTF_MATCH_RADIUS,
+                  max_radius=DEFAULT_GROUP_RADIUS, progress=None):
+    """
+    Fetch light curves for many targets with clustered cone searches.
+
+    Args:
+        fetcher: ZTFFetcher
+        ra, dec: target positions in degrees
+        match_radius, max_radius: as for plan_queries
+        progress: callable(done, total) over queries, or None
+
+    Returns:
+        (lightcurves, fetched): light-curve dicts aligned with the targets
+        (None = no usable epochs) and a boolean array, False where the query
+        failed (or the position is missing)
+    """
+    ra = np.asarray(ra, dtype=np.float64)
+    dec = np.asarray(dec, dtype=np.float64)
+    groups = plan_queries(ra, dec, match_radius, max_radius)
+    results = fetcher.fetch_many([(g.ra, g.dec, g.radius) for g in groups], progress=progress)
+
+    lightcurves = [None] * len(ra)
+    fetched = np.zeros(len(ra), dtype=bool)
+    for group, result in zip(groups, results):
+        if result is None:
+            continue
+        fetched[group.members] = True
+        if len(group.members) == 1:
+            lcs = [to_lightcurve(decode_response(result)) if result else None]
+        else:
+            lcs = split_response(result, ra[group.members], dec[group.members], match_radius)
+        for row, lc in zip(group.members, lcs):
+            lightcurves[row] = lc
+    return lightcurves, fetched
@@ -0,0 +1,202 @@
+"""
+Persistent ZTF Light-Curve Store
+================================
+
+Local cache of fetched light curves so repeated analysis runs do not
+re-query ZTF:
+1. Keyed by rounded RA/Dec and search radius
+2. g/r times and magnitudes packed into one float64 blob per source
+3. TTL-based refresh (stale entries count as misses)
+4. Size cap with least-recently-used eviction
+5. Batched lookups and writes (get_many / put_many) with deferred commits
+
+Sources that ZTF returned no data for are stored too (as empty curves), so a
+re-run on an unchanged target list makes no network calls at all.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+
+KEY_DECIMALS = 5  # 1e-5 deg ~ 0.04 arcsec
+
+LC_FIELDS = ('times_g', 'g', 'times_r', 'r')
+
+
+def position_key(ra, dec, radius):
+    """Stable cache key for a cone search."""
+    return f"{round(ra, KEY_DECIMALS):.{KEY_DECIMALS}f}{round(dec, KEY_DECIMALS):+.{KEY_DECIMALS}f}r{round(radius, KEY_DECIMALS):.{KEY_DECIMALS}f}"
+
+
+class LightCurveStore:
+    """
+    SQLite-backed light-curve store.
+
+    Writes and LRU access times are committed in batches: put_many() commits
+    once per call, single put() and get() calls every `commit_every`
+    operations and on flush() / close().
+
+    Args:
+        path: database file
+        ttl_days: entries older than this are refetched (None = never expire)
+        max_bytes: cap on stored light-curve payload; least recently used
+                   entries are evicted beyond it (None = unbounded)
+        commit_every: single operations buffered before a commit
+    """
+
+    def __init__(self, path, ttl_days=30, max_bytes=256 * 2**20, commit_every=256):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_days * 86400 if ttl_days is not None else None
+        self.max_bytes = max_bytes
+        self.commit_every = commit_every
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS lightcurves (
+                key TEXT PRIMARY KEY,
+                ra REAL, dec REAL, radius REAL,
+                fetched_at REAL, last_access REAL,
+                n_g INTEGER, n_r INTEGER,
+                nbytes INTEGER,
+                data BLOB
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS lru ON lightcurves (last_access)")
+        self._conn.commit()
+        # Running payload total, so puts need not re-sum the table
+        self._total_bytes = self._conn.execute("SELECT COALESCE(SUM(nbytes), 0) FROM lightcurves").fetchone()[0]
+        self._touched = {}  # key -> access time not yet written
+        self._pending = 0   # uncommitted single puts
+
+    def get(self, ra, dec, radius):
+        """
+        Return the stored light curve for a cone search.
+
+        Returns:
+            dict of numpy arrays (times_g, g, times_r, r), which may all be
+            empty for sources with no ZTF data, or None on a miss/expired entry
+        """
+        return self.get_many([(ra, dec, radius)])[0]
+
+    def get_many(self, positions):
+        """
+        Stored light curves for many (ra, dec, radius) cone searches, with one
+        query per 500 positions.
+
+        Returns:
+            list aligned with `positions`, as for get()
+        """
+        keys = [position_key(ra, dec, radius) for ra, dec, radius in positions]
+        now = time.time()
+        rows = {}
+        with self._lock:
+            unique = list(dict.fromkeys(keys))
+            for start in range(0, len(unique), 500):
+                chunk = unique[start:start + 500]
+                rows.update((row[0], row[1:]) for row in self._conn.execute(
+                    "SELECT key, fetched_at, data, n_g, n_r FROM lightcurves WHERE key IN "
+                    f"({','.join('?' * len(chunk))})", chunk))
+            if self.ttl_seconds is not None:
+                rows = {key: row for key, row in rows.items() if now - row[0] <= self.ttl_seconds}
+            self._touched.update((key, now) for key in rows)
+            if len(self._touched) >= self.commit_every:
+                self._flush()
+        return [_unpack(*rows[key][1:]) if key in rows else None for key in keys]
+
+    def put(self, ra, dec, radius, lc_dict):
+        """Store (or refresh) a light curve; None stores an empty curve."""
+        self.put_many([(ra, dec, radius, lc_dict)], commit=False)
+
+    def put_many(self, items, commit=True):
+        """
+        Store many (ra, dec, radius, lc_dict) entries in one transaction.
+
+        Args:
+            items: iterable of (ra, dec, radius, lc_dict); lc_dict None stores
+                   an empty curve
+            commit: commit now (False = with the next batch, flush() or close())
+        """
+        now = time.time()
+        rows = {}
+        for ra, dec, radius, lc_dict in items:
+            data, n_g, n_r = _pack(lc_dict)
+            key = position_key(ra, dec, radius)
+            rows[key] = (key, ra, dec, radius, now, now, n_g, n_r, len(data), data)
+        if not rows:
+            return
+        with self._lock:
+            keys = list(rows)
+            for start in range(0, len(keys), 500):
+                chunk = keys[start:start + 500]
+                self._total_bytes -= self._conn.execute(
+                    f"SELECT COALESCE(SUM(nbytes), 0) FROM lightcurves WHERE key IN ({','.join('?' * len(chunk))})",
+                    chunk).fetchone()[0]
+            self._conn.executemany("INSERT OR REPLACE INTO lightcurves VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                                   rows.values())
+            self._total_bytes += sum(row[8] for row in rows.values())
+            for key in rows:
+                self._touched.pop(key, None)
+            self._evict()
+            self._pending += len(rows)
+            if commit or self._pending >= self.commit_every:
+                self._flush()
+
+    def _evict(self):
+        if self.max_bytes is None or self._total_bytes <= self.max_bytes:
+            return
+        # Eviction order needs the buffered access times
+        self._write_touched()
+        for key, nbytes in self._conn.execute(
+                "SELECT key, nbytes FROM lightcurves ORDER BY last_access").fetchall():
+            self._conn.execute("DELETE FROM lightcurves WHERE key = ?", (key,))
+            self._total_bytes -= nbytes
+            if self._total_bytes <= self.max_bytes:
+                break
+
+    def _write_touched(self):
+        if self._touched:
+            self._conn.executemany("UPDATE lightcurves SET last_access = ? WHERE key = ?",
+                                   [(when, key) for key, when in self._touched.items()])
+            self._touched.clear()
+
+    def _flush(self):
+        self._write_touched()
+        self._conn.commit()
+        self._pending = 0
+
+    def flush(self):
+        """Commit buffered writes and access times."""
+        with self._lock:
+            self._flush()
+
+    def positions(self):
+        """(keys, ra, dec, radius) arrays of every stored cone search, e.g. for crossmatching."""
+        with self._lock:
+            rows = self._conn.execute("SELECT key, ra, dec, radius FROM lightcurves").fetchall()
+        keys = np.array([row[0] for row in rows], dtype=object)
+        values = np.array([row[1:] for row in rows], dtype=np.float64).reshape(-1, 3)
+        return keys, values[:, 0], values[:, 1], values[:, 2]
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM lightcurves").fetchone()[0]
+
+    def close(self):
+        self.flush()
+        self._conn.close()
+
+
+def _pack(lc_dict):
+    if not lc_dict:
+        return b'', 0, 0
+    arrays = [np.asarray(lc_dict.get(field, []), dtype=np.float64) for field in LC_FIELDS]
+    return np.concatenate(arrays).tobytes(), len(arrays[1]), len(arrays[3])
+
+
+def _unpack(data, n_g, n_r):
+    values = np.frombuffer(data, dtype=np.float64)
+    bounds = np.cumsum([0, n_g, n_g, n_r, n_r])
+    return {field: values[bounds[i]:bounds[i + 1]] for i, field in enumerate(LC_FIELDS)}
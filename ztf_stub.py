@@ -0,0 +1,216 @@
+"""
+Local ZTF Light-Curve Stub Server
+=================================
+
+Imitates IRSA's nph_light_curve_search for offline runs and benchmarks of
+the fetch pipeline:
+1. Answers RA/DEC/RADIUS queries with deterministic synthetic light curves
+   (ztf_synthetic), as zg/zr epochs: with a catalog, of every catalog object
+   inside the cone (one oid per object and band, as IRSA splits them);
+   without one, of a single object at the queried position
+2. Replies in the FORMAT asked for: CSV (default), IPAC_TABLE or JSON
+3. Injects a fixed latency, plus optional uniform jitter, per request
+4. Serves each request on its own thread, so concurrent clients overlap
+   as they would against the real service
+5. Optionally answers the first requests with error statuses (e.g. 503,
+   429), with or without a Retry-After header, to exercise client retries
+6. Records the peak number of requests in flight, to check client
+   concurrency bounds
+
+    with StubServer(latency=0.2) as server:
+        ZTFFetcher(token, base_url=server.url).fetch(ra, dec)
+"""
+
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+from crossmatch import SkyIndex
+from ztf_synthetic import synthetic_lightcurve
+
+STUB_PATH = '/cgi-bin/ZTF/nph_light_curve_search'
+_IPAC_TYPES = {'i': 'long', 'u': 'long', 'f': 'double', 'O': 'char'}
+
+
+def position_name(ra, dec):
+    """Synthetic object name of a sky position (the light curve's seed)."""
+    return f"ZTF{ra:.5f}{dec:+.5f}"
+
+
+def observation_table(ra, dec, object_id=0) -> pd.DataFrame:
+    """IRSA-style epoch rows (oid, ra, dec, mjd, mag, magerr, filtercode, catflags) of one object."""
+    lc = synthetic_lightcurve(position_name(ra, dec))
+    frames = []
+    for k, band in enumerate(('g', 'r')):
+        n = len(lc[band])
+        frames.append(pd.DataFrame({
+            'oid': np.full(n, 2 * object_id + k + 1, dtype=np.int64),
+            'ra': np.full(n, ra), 'dec': np.full(n, dec),
+            'mjd': np.round(lc[f'times_{band}'], 7),
+            'mag': np.round(lc[band], 5),
+            'magerr': np.full(n, 0.02),
+            'filtercode': f'z{band}',
+            'catflags': np.zeros(n, dtype=np.int64),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def render_ipac(df: pd.DataFrame) -> str:
+    """df as an IPAC table: '|' name / type / unit / null header lines, right-aligned rows, NaN as null."""
+    cells = {name: df[name].astype(object).where(df[name].notna(), 'null').map(str).to_numpy()
+             for name in df.columns}
+    widths = {name: max([len(name), 6] + [len(v) for v in values]) + 1 for name, values in cells.items()}
+    types = [_IPAC_TYPES.get(df[name].dtype.kind, 'char') for name in df.columns]
+
+    def line(values, fill=' '):
+        return fill + fill.join(str(v).rjust(widths[name]) for name, v in zip(df.columns, values)) + fill
+
+    lines = ['\\fixlen = T', f'\\RowsRetrieved = {len(df)}',
+             line(df.columns, '|'), line(types, '|'), line([''] * len(types), '|'), line(['null'] * len(types), '|')]
+    lines.extend(line(row) for row in zip(*cells.values()))
+    return '\n'.join(lines) + '\n'
+
+
+def render(df: pd.DataFrame, fmt: str) -> tuple:
+    """(content type, body bytes) of df in an IRSA response format."""
+    fmt = fmt.upper()
+    if fmt == 'JSON':
+        return 'application/json', json.dumps({'result': df.to_dict('records')}).encode()
+    if fmt == 'IPAC_TABLE':
+        return 'text/plain', render_ipac(df).encode()
+    return 'text/csv', df.to_csv(index=False).encode()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        stub = self.server.stub
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+        error = stub.record_request()
+        try:
+            time.sleep(stub.delay())
+        finally:
+            stub.finish_request()
+        if error is not None:
+            self.send_response(error)
+            if stub.retry_after is not None:
+                self.send_header('Retry-After', str(stub.retry_after))
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if url.path != STUB_PATH or 'RA' not in params or 'DEC' not in params:
+            self.send_error(400, 'expected RA and DEC')
+            return
+        table = stub.cone(float(params['RA']), float(params['DEC']), float(params.get('RADIUS', 0.0014)))
+        content_type, body = render(table, params.get('FORMAT', 'CSV'))
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer:
+    """
+    Light-curve stub on a background thread.
+
+    Args:
+        latency: seconds added to every response
+        jitter: extra uniform random delay in [0, jitter) seconds
+        host, port: bind address (port 0 = any free port)
+        catalog: (ra, dec) arrays of the objects to serve (None = one object
+                 at every queried position)
+        errors: HTTP status codes returned, in order, to the first requests
+                before normal responses begin
+        retry_after: Retry-After header value sent with those errors (None = no header)
+    """
+
+    def __init__(self, latency=0.1, jitter=0.0, host='127.0.0.1', port=0, seed=0, catalog=None, errors=(),
+                 retry_after=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.catalog = None if catalog is None else tuple(np.asarray(c, dtype=np.float64) for c in catalog)
+        self._catalog_index = None if catalog is None else SkyIndex(*self.catalog)
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._errors = list(errors)
+        self.retry_after = retry_after
+        self.requests_served = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._server = ThreadingHTTPServer((host, port), _Handler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}{STUB_PATH}"
+
+    def cone(self, ra, dec, radius) -> pd.DataFrame:
+        """Epoch rows of every object within `radius` degrees of (ra, dec)."""
+        if self.catalog is None:
+            return observation_table(ra, dec)
+        _, objects, _ = self._catalog_index.query_radius(np.atleast_1d(ra), np.atleast_1d(dec), radius)
+        catalog_ra, catalog_dec = self.catalog
+        frames = [observation_table(catalog_ra[i], catalog_dec[i], object_id=i) for i in objects]
+        if not frames:
+            return observation_table(ra, dec).iloc[:0]
+        return pd.concat(frames, ignore_index=True)
+
+    def delay(self):
+        with self._lock:
+            return self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+
+    def record_request(self):
+        """Count a request; returns the error status to answer it with, or None."""
+        with self._lock:
+            self.requests_served += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            return self._errors.pop(0) if self._errors else None
+
+    def finish_request(self):
+        with self._lock:
+            self.in_flight -= 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Serve synthetic ZTF light curves locally')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency', type=float, default=0.1, help='seconds added to every response')
+    parser.add_argument('--jitter', type=float, default=0.0, help='extra uniform random delay (s)')
+    args = parser.parse_args()
+    server = StubServer(args.latency, args.jitter, port=args.port).start()
+    print(f"Serving synthetic ZTF light curves at {server.url} (Ctrl-C to stop)")
+    try:
+        server._thread.join()
+    except KeyboardInterrupt:
+        server.stop()
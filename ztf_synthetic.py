@@ -0,0 +1,158 @@
+"""
+Synthetic ZTF Survey Generator
+==============================
+
+Deterministic, vectorized stand-in for ZTF light curves, used when the API
+is unavailable and for load-testing the analysis at survey scale.
+
+Every source's light curve depends only on its name (and the survey seed),
+never on which other sources are generated alongside it or in which
+process, so sharded and serial runs see the same data:
+1. Per-source keys come from a stable hash (blake2b) of the name
+2. Random draws are counter-based: draw j of stream s for source i is a
+   SplitMix64 mix of (key_i, s, j), so all epochs of all sources are
+   produced in a few array operations with no per-source RNG state
+3. Output is a RaggedLightCurves, the layout ztf_batch analyzes directly
+
+The variability model is the one ZTFAnalyzer has always used: 30-149 epochs
+per band over MJD 58000-59000, r = 13-17.5 mag, a linear fade and a
+sinusoidal term plus 0.1 mag Gaussian noise.
+"""
+
+import hashlib
+
+import numpy as np
+
+from ztf_batch import BANDS, RaggedLightCurves
+
+MJD_START = 58000.0
+MJD_STOP = 59000.0
+N_OBS_RANGE = (30, 150)  # epochs per band, upper bound exclusive
+NOISE_SIGMA = 0.1  # mag
+
+# Independent draw streams
+(_N_OBS, _BASE_R, _COLOR, _AMPLITUDE, _FADE, _PERIOD_G, _PERIOD_R,
+ _SPACING_G, _SPACING_R, _NOISE_U1_G, _NOISE_U2_G, _NOISE_U1_R, _NOISE_U2_R) = range(13)
+
+_UINT64 = np.uint64
+
+
+def stable_seed(name, seed=0):
+    """64-bit key for a source name, identical across processes and runs."""
+    digest = hashlib.blake2b(f'{seed}:{name}'.encode('utf-8'), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+def _mix64(x):
+    """SplitMix64 finalizer on a uint64 array (wrapping arithmetic)."""
+    x = x + _UINT64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> _UINT64(30))) * _UINT64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> _UINT64(27))) * _UINT64(0x94D049BB133111EB)
+    return x ^ (x >> _UINT64(31))
+
+
+def _uniform(keys, stream, counters=None):
+    """
+    Uniform draws in (0, 1), one per element of `keys`.
+
+    Args:
+        keys: uint64 source keys (repeated per epoch for per-epoch draws)
+        stream: which independent stream to draw from
+        counters: epoch index within the source (None = 0)
+    """
+    counters = np.zeros(len(keys), dtype=_UINT64) if counters is None else counters.astype(_UINT64)
+    bits = _mix64(keys ^ _mix64((_UINT64(stream) << _UINT64(48)) | counters))
+    # Top 53 bits -> double, shifted by half a step so 0 and 1 never occur
+    return ((bits >> _UINT64(11)).astype(np.float64) + 0.5) * 2.0**-53
+
+
+def _uniform_range(keys, stream, low, high, counters=None):
+    return low + (high - low) * _uniform(keys, stream, counters)
+
+
+def _normal(keys, stream_u1, stream_u2, counters, sigma):
+    """Box-Muller normal draws."""
+    u1 = _uniform(keys, stream_u1, counters)
+    u2 = _uniform(keys, stream_u2, counters)
+    return sigma * np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+
+def _sorted_uniform_times(keys, n_obs, stream, t_start, t_stop):
+    """
+    Sorted uniform epochs for every source without a sort: the k-th order
+    statistic of n uniforms is the normalized cumulative sum of n + 1
+    exponential spacings. Sums run along the rows of a padded
+    (source, epoch) matrix so no source's rounding depends on another's.
+    """
+    n_sources = len(n_obs)
+    width = int(n_obs.max()) + 1 if n_sources else 1
+    column = np.arange(width)
+    filled = column[None, :] <= n_obs[:, None]
+    rows, counters = np.nonzero(filled)
+
+    spacings = np.zeros((n_sources, width))
+    spacings[rows, counters] = -np.log(_uniform(keys[rows], stream, counters))
+    running = np.cumsum(spacings, axis=1)
+    fraction = running / running[np.arange(n_sources), n_obs][:, None]
+
+    # The (n+1)-th partial sum of each source is always 1 and is dropped
+    epochs = column[None, :] < n_obs[:, None]
+    return t_start + (t_stop - t_start) * fraction[epochs]
+
+
+def generate_survey(names, seed=0, t_start=MJD_START, t_stop=MJD_STOP, n_obs_range=N_OBS_RANGE):
+    """
+    Generate g/r light curves for many sources in one vectorized pass.
+
+    Args:
+        names: source names; each name always yields the same light curve
+        seed: survey seed mixed into every source key
+        t_start, t_stop: MJD range of the epochs
+        n_obs_range: (min, max) epochs per band, max exclusive
+
+    Returns:
+        RaggedLightCurves aligned with `names`
+    """
+    keys = np.fromiter((stable_seed(name, seed) for name in names), dtype=_UINT64)
+    n_sources = len(keys)
+
+    low, high = n_obs_range
+    n_obs = (low + np.floor(_uniform(keys, _N_OBS) * (high - low))).astype(np.int64)
+    base_r = _uniform_range(keys, _BASE_R, 13, 17.5)  # r < 18 for ZTF detection
+    base_g = base_r - _uniform_range(keys, _COLOR, -0.2, 0.5)  # g typically bluer/brighter
+    amplitude = _uniform_range(keys, _AMPLITUDE, 0.1, 1.5)
+    fade = _uniform_range(keys, _FADE, -0.003, 0.002)  # mag/day
+    periods = {'g': _uniform_range(keys, _PERIOD_G, 10, 100), 'r': _uniform_range(keys, _PERIOD_R, 10, 100)}
+    base = {'g': base_g, 'r': base_r}
+    spacing_stream = {'g': _SPACING_G, 'r': _SPACING_R}
+    noise_streams = {'g': (_NOISE_U1_G, _NOISE_U2_G), 'r': (_NOISE_U1_R, _NOISE_U2_R)}
+
+    offsets = np.concatenate(([0], np.cumsum(n_obs)))
+    ids = np.repeat(np.arange(n_sources), n_obs)
+    counters = np.arange(offsets[-1]) - offsets[ids]
+    epoch_keys = keys[ids]
+
+    times, mags = {}, {}
+    for band in BANDS:
+        t = _sorted_uniform_times(keys, n_obs, spacing_stream[band], t_start, t_stop)
+        first_time = np.zeros(n_sources)
+        first_time[n_obs > 0] = t[offsets[:-1][n_obs > 0]]
+        noise = _normal(epoch_keys, *noise_streams[band], counters, NOISE_SIGMA)
+        times[band] = t
+        mags[band] = (base[band][ids]
+                      + amplitude[ids] * np.sin(2 * np.pi * t / periods[band][ids])
+                      + fade[ids] * (t - first_time[ids])
+                      + noise)
+
+    return RaggedLightCurves(times, mags, {band: offsets for band in BANDS})
+
+
+def survey_periods(names, seed=0):
+    """Injected sinusoid period (days) of each source, per band, as generate_survey draws them."""
+    keys = np.fromiter((stable_seed(name, seed) for name in names), dtype=_UINT64)
+    return {'g': _uniform_range(keys, _PERIOD_G, 10, 100), 'r': _uniform_range(keys, _PERIOD_R, 10, 100)}
+
+
+def synthetic_lightcurve(name, seed=0):
+    """Light-curve dict (times_g, g, times_r, r) for a single source."""
+    return generate_survey([name], seed).lightcurve(0)